@@ -1,8 +1,10 @@
 from flask import redirect
 from flask_cors import CORS
 from flask_openapi3 import OpenAPI, Info
-from config import engine, BaseModel
+from config import engine, init_query_instrumentation, FEEDBACK_BUFFER_ENABLED
+from config.migrations import run_migrations
 from routes import feedback_bp, feedback_analysis_bp, campaign_bp, dashboard_bp
+from services import campaign_purger, feedback_buffer
 
 # Swagger Info
 info = Info(title="Feedback API", version="1.0.0", description="Feedback API for Collecting User Feedback and Analyzing Sentiments")
@@ -13,8 +15,18 @@ app = OpenAPI(__name__, info=info)
 # Enable CORS
 CORS(app)
 
-# Create the tables in the database
-BaseModel.metadata.create_all(bind=engine)
+# Count queries and database time per request
+init_query_instrumentation(app)
+
+# Apply pending schema migrations (no schema reflection on an up-to-date database)
+run_migrations(engine)
+
+# Finish purging campaigns deleted before the last shutdown
+campaign_purger.resume()
+
+# Start the feedback write-behind buffer, after replaying what this process's log slot holds
+if FEEDBACK_BUFFER_ENABLED:
+    feedback_buffer.start()
 
 # Register the Blueprint with OpenAPI
 app.register_api(campaign_bp, url_prefix="/api")
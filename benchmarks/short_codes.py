@@ -0,0 +1,92 @@
+"""
+Benchmark of campaign short codes at scale.
+
+Allocates the short codes of N campaigns (1M by default), checks that they are
+unique, bulk-inserts the campaigns into a scratch SQLite database created from
+the current models, and compares resolving random codes by decoding them to the
+campaign ID (primary key lookup) with a lookup on the short code index.
+
+Usage:
+    python benchmarks/short_codes.py [--count 1000000] [--lookups 10000] [--database path]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from model import BaseModel, Campaign  # noqa: E402
+from utils import generate_short_code, decode_short_code  # noqa: E402
+
+# Campaigns inserted per transaction
+INSERT_BATCH_SIZE = 10000
+
+
+def _report(label: str, seconds: float, operations: int):
+    """Print the total time and the time per operation of a phase."""
+    print(f"{label:<32} {seconds:8.2f} s  {seconds / operations * 1e6:8.2f} us/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark campaign short code allocation and resolution")
+    parser.add_argument("--count", type=int, default=1_000_000, help="Number of campaigns to create (default: 1000000)")
+    parser.add_argument("--lookups", type=int, default=10_000, help="Number of random codes to resolve (default: 10000)")
+    parser.add_argument("--database", help="SQLite file to create (default: a temporary file, removed afterwards)")
+    args = parser.parse_args()
+
+    # Allocation: one code per campaign ID, checked for collisions
+    start = time.perf_counter()
+    codes = [generate_short_code(campaign_id) for campaign_id in range(1, args.count + 1)]
+    _report("Allocate codes", time.perf_counter() - start, args.count)
+    collisions = args.count - len(set(codes))
+    print(f"Collisions: {collisions}")
+
+    directory = None
+    path = args.database
+    if path is None:
+        directory = tempfile.TemporaryDirectory()
+        path = os.path.join(directory.name, "short_codes.sqlite")
+    engine = create_engine(f"sqlite:///{path}")
+    BaseModel.metadata.create_all(engine)
+
+    # Creation: bulk inserts of campaigns carrying their precomputed codes
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        for offset in range(0, args.count, INSERT_BATCH_SIZE):
+            rows = [
+                {"id": campaign_id, "name": f"Campaign {campaign_id}", "short_code": codes[campaign_id - 1]}
+                for campaign_id in range(offset + 1, min(offset + INSERT_BATCH_SIZE, args.count) + 1)
+            ]
+            connection.execute(insert(Campaign), rows)
+    _report("Insert campaigns", time.perf_counter() - start, args.count)
+
+    # Resolution: decoded primary key lookups against short code index lookups
+    sample = random.sample(codes, min(args.lookups, args.count))
+    with engine.connect() as connection:
+        start = time.perf_counter()
+        for code in sample:
+            campaign_id = decode_short_code(code)
+            connection.execute(select(Campaign.id).where(Campaign.id == campaign_id)).scalar_one()
+        _report("Resolve by decoded ID", time.perf_counter() - start, len(sample))
+
+        start = time.perf_counter()
+        for code in sample:
+            connection.execute(select(Campaign.id).where(Campaign.short_code == code)).scalar_one()
+        _report("Resolve by short code index", time.perf_counter() - start, len(sample))
+
+        start = time.perf_counter()
+        for code in sample:
+            decode_short_code(code)
+        _report("Decode only (no database)", time.perf_counter() - start, len(sample))
+
+    engine.dispose()
+    if directory:
+        directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
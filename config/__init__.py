@@ -1,5 +1,14 @@
-from .db import SessionLocal, BaseModel, engine, DB_URL
+from model import BaseModel
+from .db import SessionLocal, ReadSessionLocal, engine, read_engine, session_for, DB_URL
+from .instrumentation import track_queries, init_query_instrumentation
 from .settings import (
     SHORT_SENTENCE_BOOST, SHORT_SENTENCE_THRESHOLD,
-    NEUTRAL_PENALTY_THRESHOLD, NEUTRAL_PENALTY_FACTOR
+    NEUTRAL_PENALTY_THRESHOLD, NEUTRAL_PENALTY_FACTOR,
+    BULK_INGEST_CHUNK_SIZE, BULK_INGEST_MAX_ITEMS,
+    COUNT_CACHE_TTL, COUNT_CACHE_SIZE, EXPORT_BATCH_SIZE,
+    FEEDBACK_BUFFER_ENABLED, FEEDBACK_BUFFER_BATCH_SIZE, FEEDBACK_BUFFER_MAX_LATENCY_MS,
+    FEEDBACK_BUFFER_LOG_PATH, FEEDBACK_BUFFER_FSYNC, FEEDBACK_BUFFER_STATUS_TTL,
+    CAMPAIGN_CACHE_TTL, CAMPAIGN_CACHE_SIZE, SHORT_CODE_KEY,
+    CAMPAIGN_PURGE_CHUNK_SIZE, CAMPAIGN_ARCHIVE_DIR, COMPONENT_CACHE_TTL, COMPONENT_CACHE_SIZE,
+    WORD_CLOUD_DEFAULT_LIMIT, WORD_CLOUD_MAX_LIMIT, DASHBOARD_DATA_WORKERS
 )
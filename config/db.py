@@ -2,8 +2,8 @@ import os
 import sys
 from dotenv import load_dotenv
 from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy import create_engine
-from model import BaseModel
+from sqlalchemy import create_engine, event
+from .settings import READ_DB_URL, READ_ROUTED_BLUEPRINTS, SQLITE_WAL_MODE
 
 # Load environment variables but DO NOT override existing ones
 load_dotenv(override=False)
@@ -22,11 +22,39 @@ if not os.path.exists(DB_PATH):
 # Database URL
 DB_URL = f"sqlite:///{DB_PATH}{DB_NAME}"
 
+# Read database URL: an explicit replica, or the same SQLite file opened read-only
+READ_URL = READ_DB_URL or f"sqlite:///file:{DB_PATH}{DB_NAME}?mode=ro&uri=true"
+
 # Create the engine
 engine = create_engine(DB_URL, echo=False)
 
+# Create the read engine used by read-only analytics endpoints
+read_engine = create_engine(READ_URL, echo=False)
+
+# Switch the primary SQLite database to WAL mode so readers do not block writers
+if SQLITE_WAL_MODE:
+    @event.listens_for(engine, "connect")
+    def _enable_wal(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
 # Create a session factory
 SessionLocal = scoped_session(sessionmaker(bind=engine))
 
-# Ensure all tables are created
-BaseModel.metadata.create_all(engine)
\ No newline at end of file
+# Create a session factory for the read engine
+ReadSessionLocal = scoped_session(sessionmaker(bind=read_engine))
+
+
+def session_for(blueprint: str):
+    """
+    Return the session factory that the read-only endpoints of a blueprint should use.
+
+    Args:
+        blueprint (str): The name of the blueprint.
+
+    Returns:
+        scoped_session: `ReadSessionLocal` when the blueprint is listed in
+        READ_ROUTED_BLUEPRINTS, otherwise the primary `SessionLocal`.
+    """
+    return ReadSessionLocal if blueprint in READ_ROUTED_BLUEPRINTS else SessionLocal
@@ -0,0 +1,103 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .settings import SLOW_QUERY_THRESHOLD_MS, N_PLUS_ONE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Number of statements and total database time collected inside a tracking scope."""
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+
+    def record(self, statement: str, duration: float):
+        """Record an executed statement in this scope and every enclosing one."""
+        self.count += 1
+        self.duration += duration
+        self.statements.append(statement)
+        if self.parent is not None:
+            self.parent.record(statement, duration)
+
+    def repeated_statements(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> dict:
+        """Return the statements executed at least `threshold` times (likely N+1 patterns)."""
+        return {statement: count for statement, count in Counter(self.statements).items() if count >= threshold}
+
+
+# Stats of the innermost tracking scope for the current thread or request
+_current_stats = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        logger.warning("Slow query (%.1f ms): %s", duration * 1000, statement)
+
+
+@contextmanager
+def track_queries():
+    """
+    Count the statements executed inside the block.
+
+    Yields:
+        QueryStats: The stats collected for the block. Nested scopes also report to the enclosing ones.
+    """
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def init_query_instrumentation(app):
+    """
+    Register request hooks that count queries and database time per request.
+
+    Each response gets a `Server-Timing` header with the query count and total
+    database time, and repeated identical statements are logged as possible N+1 queries.
+
+    Args:
+        app: The Flask application.
+    """
+    @app.before_request
+    def _start_query_tracking():
+        g.query_tracking = track_queries()
+        g.query_stats = g.query_tracking.__enter__()
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats = g.pop("query_stats", None)
+        if stats is None:
+            return response
+
+        response.headers["Server-Timing"] = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+        for statement, count in stats.repeated_statements().items():
+            logger.warning("Possible N+1 query on %s (%d executions): %s", request.endpoint, count, statement)
+        return response
+
+    @app.teardown_request
+    def _stop_query_tracking(exception=None):
+        tracking = g.pop("query_tracking", None)
+        if tracking is not None:
+            tracking.__exit__(None, None, None)
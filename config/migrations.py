@@ -0,0 +1,829 @@
+from sqlalchemy import inspect, text
+from model import BaseModel
+
+# Name of the table that records which migrations have been applied
+SCHEMA_VERSION_TABLE = "schema_version"
+
+
+def _add_hot_path_indexes(connection):
+    """Add the composite indexes used by the duplicate-answer check, trends and pagination."""
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_feedbacks_campaign_user_ip ON feedbacks (campaign_id, user_ip)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_feedbacks_campaign_created_at ON feedbacks (campaign_id, created_at)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_feedbacks_campaign_id_id ON feedbacks (campaign_id, id)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_feedback_analysis_sentiment_category ON feedback_analysis (sentiment_category)"
+    ))
+
+
+def _add_campaign_feedback_count(connection):
+    """Add the campaign.feedback_count counter, backfill it and keep it in sync with triggers."""
+    connection.execute(text(
+        "ALTER TABLE campaign ADD COLUMN feedback_count INTEGER NOT NULL DEFAULT 0"
+    ))
+    connection.execute(text(
+        "UPDATE campaign SET feedback_count = (SELECT COUNT(*) FROM feedbacks WHERE feedbacks.campaign_id = campaign.id)"
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_count_insert AFTER INSERT ON feedbacks
+        BEGIN
+            UPDATE campaign SET feedback_count = feedback_count + 1 WHERE id = NEW.campaign_id;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_count_delete AFTER DELETE ON feedbacks
+        BEGIN
+            UPDATE campaign SET feedback_count = feedback_count - 1 WHERE id = OLD.campaign_id;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_count_update AFTER UPDATE OF campaign_id ON feedbacks
+        WHEN OLD.campaign_id != NEW.campaign_id
+        BEGIN
+            UPDATE campaign SET feedback_count = feedback_count - 1 WHERE id = OLD.campaign_id;
+            UPDATE campaign SET feedback_count = feedback_count + 1 WHERE id = NEW.campaign_id;
+        END"""
+    ))
+
+
+def _add_single_answer_constraints(connection):
+    """Enforce max_answers and the one-answer-per-IP rule in the database."""
+    connection.execute(text(
+        "ALTER TABLE feedbacks ADD COLUMN single_answer BOOLEAN NOT NULL DEFAULT 0"
+    ))
+    # Flag the first answer of each IP in single-answer campaigns; later duplicates stay unflagged
+    connection.execute(text(
+        """UPDATE feedbacks SET single_answer = 1 WHERE id IN (
+            SELECT MIN(feedbacks.id) FROM feedbacks
+            JOIN campaign ON campaign.id = feedbacks.campaign_id
+            WHERE NOT COALESCE(campaign.multiple_answers_from_user, 0) AND feedbacks.user_ip IS NOT NULL
+            GROUP BY feedbacks.campaign_id, feedbacks.user_ip
+        )"""
+    ))
+    connection.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_feedbacks_single_answer_ip ON feedbacks (campaign_id, user_ip) "
+        "WHERE single_answer = 1"
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_max_answers BEFORE INSERT ON feedbacks
+        WHEN EXISTS (
+            SELECT 1 FROM campaign
+            WHERE id = NEW.campaign_id AND max_answers > 0 AND feedback_count >= max_answers
+        )
+        BEGIN
+            SELECT RAISE(ABORT, 'Campaign has reached the maximum number of answers');
+        END"""
+    ))
+
+
+def _add_pagination_indexes(connection):
+    """Add the created_at indexes backing keyset pagination of feedbacks and campaigns."""
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_feedbacks_created_at ON feedbacks (created_at)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_campaign_created_at ON campaign (created_at)"
+    ))
+
+
+def _add_feedback_search_index(connection):
+    """Add the FTS5 index over feedback messages, its sync triggers, and index existing messages."""
+    connection.execute(text(
+        """CREATE VIRTUAL TABLE IF NOT EXISTS feedbacks_fts USING fts5(
+            message, content='feedbacks', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_fts_insert AFTER INSERT ON feedbacks
+        BEGIN
+            INSERT INTO feedbacks_fts (rowid, message) VALUES (NEW.id, NEW.message);
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_fts_delete AFTER DELETE ON feedbacks
+        BEGIN
+            INSERT INTO feedbacks_fts (feedbacks_fts, rowid, message) VALUES ('delete', OLD.id, OLD.message);
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_fts_update AFTER UPDATE OF message ON feedbacks
+        BEGIN
+            INSERT INTO feedbacks_fts (feedbacks_fts, rowid, message) VALUES ('delete', OLD.id, OLD.message);
+            INSERT INTO feedbacks_fts (rowid, message) VALUES (NEW.id, NEW.message);
+        END"""
+    ))
+    connection.execute(text("INSERT INTO feedbacks_fts (feedbacks_fts) VALUES ('rebuild')"))
+
+
+def _add_analysis_sort_indexes(connection):
+    """Add the indexes backing feedback listings sorted by sentiment or star rating."""
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_feedback_analysis_sentiment ON feedback_analysis (sentiment, feedback_id)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_feedback_analysis_star_rating ON feedback_analysis (star_rating, feedback_id)"
+    ))
+
+
+def _add_ingestion_checkpoint(connection):
+    """Add the table recording how far each write-behind ingestion log was flushed."""
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS ingestion_checkpoint ("
+        "name VARCHAR(255) NOT NULL PRIMARY KEY, sequence INTEGER NOT NULL, created_at DATETIME DEFAULT (CURRENT_TIMESTAMP))"
+    ))
+
+
+def _add_campaign_stats(connection):
+    """Add the campaign_stats table, the triggers maintaining it, and fill it from the existing analyses."""
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS campaign_stats ("
+        "campaign_id INTEGER NOT NULL PRIMARY KEY REFERENCES campaign (id) ON DELETE CASCADE, "
+        "analyzed_count INTEGER DEFAULT '0' NOT NULL, sentiment_sum FLOAT DEFAULT '0' NOT NULL, "
+        "star_rating_sum INTEGER DEFAULT '0' NOT NULL, positive_count INTEGER DEFAULT '0' NOT NULL, "
+        "neutral_count INTEGER DEFAULT '0' NOT NULL, negative_count INTEGER DEFAULT '0' NOT NULL, "
+        "star_1_count INTEGER DEFAULT '0' NOT NULL, star_2_count INTEGER DEFAULT '0' NOT NULL, "
+        "star_3_count INTEGER DEFAULT '0' NOT NULL, star_4_count INTEGER DEFAULT '0' NOT NULL, "
+        "star_5_count INTEGER DEFAULT '0' NOT NULL, created_at DATETIME DEFAULT (CURRENT_TIMESTAMP))"
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_stats_insert AFTER INSERT ON feedback_analysis
+        BEGIN
+            INSERT OR IGNORE INTO campaign_stats (campaign_id) SELECT campaign_id FROM feedbacks WHERE id = NEW.feedback_id;
+            UPDATE campaign_stats SET
+                analyzed_count = analyzed_count + 1,
+                sentiment_sum = sentiment_sum + NEW.sentiment,
+                star_rating_sum = star_rating_sum + NEW.star_rating,
+                positive_count = positive_count + (NEW.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count + (NEW.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count + (NEW.sentiment_category = 'NEGATIVE'),
+                star_1_count = star_1_count + (NEW.star_rating = 1),
+                star_2_count = star_2_count + (NEW.star_rating = 2),
+                star_3_count = star_3_count + (NEW.star_rating = 3),
+                star_4_count = star_4_count + (NEW.star_rating = 4),
+                star_5_count = star_5_count + (NEW.star_rating = 5)
+            FROM feedbacks AS f WHERE f.id = NEW.feedback_id AND campaign_stats.campaign_id = f.campaign_id;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_stats_delete AFTER DELETE ON feedback_analysis
+        BEGIN
+            UPDATE campaign_stats SET
+                analyzed_count = analyzed_count - 1,
+                sentiment_sum = sentiment_sum - OLD.sentiment,
+                star_rating_sum = star_rating_sum - OLD.star_rating,
+                positive_count = positive_count - (OLD.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count - (OLD.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count - (OLD.sentiment_category = 'NEGATIVE'),
+                star_1_count = star_1_count - (OLD.star_rating = 1),
+                star_2_count = star_2_count - (OLD.star_rating = 2),
+                star_3_count = star_3_count - (OLD.star_rating = 3),
+                star_4_count = star_4_count - (OLD.star_rating = 4),
+                star_5_count = star_5_count - (OLD.star_rating = 5)
+            FROM feedbacks AS f WHERE f.id = OLD.feedback_id AND campaign_stats.campaign_id = f.campaign_id;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_stats_update
+        AFTER UPDATE OF feedback_id, sentiment, sentiment_category, star_rating ON feedback_analysis
+        BEGIN
+            UPDATE campaign_stats SET
+                analyzed_count = analyzed_count - 1,
+                sentiment_sum = sentiment_sum - OLD.sentiment,
+                star_rating_sum = star_rating_sum - OLD.star_rating,
+                positive_count = positive_count - (OLD.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count - (OLD.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count - (OLD.sentiment_category = 'NEGATIVE'),
+                star_1_count = star_1_count - (OLD.star_rating = 1),
+                star_2_count = star_2_count - (OLD.star_rating = 2),
+                star_3_count = star_3_count - (OLD.star_rating = 3),
+                star_4_count = star_4_count - (OLD.star_rating = 4),
+                star_5_count = star_5_count - (OLD.star_rating = 5)
+            FROM feedbacks AS f WHERE f.id = OLD.feedback_id AND campaign_stats.campaign_id = f.campaign_id;
+            INSERT OR IGNORE INTO campaign_stats (campaign_id) SELECT campaign_id FROM feedbacks WHERE id = NEW.feedback_id;
+            UPDATE campaign_stats SET
+                analyzed_count = analyzed_count + 1,
+                sentiment_sum = sentiment_sum + NEW.sentiment,
+                star_rating_sum = star_rating_sum + NEW.star_rating,
+                positive_count = positive_count + (NEW.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count + (NEW.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count + (NEW.sentiment_category = 'NEGATIVE'),
+                star_1_count = star_1_count + (NEW.star_rating = 1),
+                star_2_count = star_2_count + (NEW.star_rating = 2),
+                star_3_count = star_3_count + (NEW.star_rating = 3),
+                star_4_count = star_4_count + (NEW.star_rating = 4),
+                star_5_count = star_5_count + (NEW.star_rating = 5)
+            FROM feedbacks AS f WHERE f.id = NEW.feedback_id AND campaign_stats.campaign_id = f.campaign_id;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_stats_delete AFTER DELETE ON feedbacks
+        BEGIN
+            UPDATE campaign_stats SET
+                analyzed_count = analyzed_count - 1,
+                sentiment_sum = sentiment_sum - a.sentiment,
+                star_rating_sum = star_rating_sum - a.star_rating,
+                positive_count = positive_count - (a.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count - (a.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count - (a.sentiment_category = 'NEGATIVE'),
+                star_1_count = star_1_count - (a.star_rating = 1),
+                star_2_count = star_2_count - (a.star_rating = 2),
+                star_3_count = star_3_count - (a.star_rating = 3),
+                star_4_count = star_4_count - (a.star_rating = 4),
+                star_5_count = star_5_count - (a.star_rating = 5)
+            FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id AND campaign_stats.campaign_id = OLD.campaign_id;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_stats_update AFTER UPDATE OF campaign_id ON feedbacks
+        WHEN OLD.campaign_id != NEW.campaign_id
+        BEGIN
+            UPDATE campaign_stats SET
+                analyzed_count = analyzed_count - 1,
+                sentiment_sum = sentiment_sum - a.sentiment,
+                star_rating_sum = star_rating_sum - a.star_rating,
+                positive_count = positive_count - (a.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count - (a.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count - (a.sentiment_category = 'NEGATIVE'),
+                star_1_count = star_1_count - (a.star_rating = 1),
+                star_2_count = star_2_count - (a.star_rating = 2),
+                star_3_count = star_3_count - (a.star_rating = 3),
+                star_4_count = star_4_count - (a.star_rating = 4),
+                star_5_count = star_5_count - (a.star_rating = 5)
+            FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id AND campaign_stats.campaign_id = OLD.campaign_id;
+            INSERT OR IGNORE INTO campaign_stats (campaign_id)
+                SELECT NEW.campaign_id WHERE EXISTS (SELECT 1 FROM feedback_analysis WHERE feedback_id = NEW.id);
+            UPDATE campaign_stats SET
+                analyzed_count = analyzed_count + 1,
+                sentiment_sum = sentiment_sum + a.sentiment,
+                star_rating_sum = star_rating_sum + a.star_rating,
+                positive_count = positive_count + (a.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count + (a.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count + (a.sentiment_category = 'NEGATIVE'),
+                star_1_count = star_1_count + (a.star_rating = 1),
+                star_2_count = star_2_count + (a.star_rating = 2),
+                star_3_count = star_3_count + (a.star_rating = 3),
+                star_4_count = star_4_count + (a.star_rating = 4),
+                star_5_count = star_5_count + (a.star_rating = 5)
+            FROM feedback_analysis AS a WHERE a.feedback_id = NEW.id AND campaign_stats.campaign_id = NEW.campaign_id;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_campaign_stats_delete AFTER DELETE ON campaign
+        BEGIN
+            DELETE FROM campaign_stats WHERE campaign_id = OLD.id;
+        END"""
+    ))
+    connection.execute(text(
+        """INSERT INTO campaign_stats (
+            campaign_id, analyzed_count, sentiment_sum, star_rating_sum, positive_count, neutral_count, negative_count,
+            star_1_count, star_2_count, star_3_count, star_4_count, star_5_count
+        )
+        SELECT f.campaign_id, COUNT(*), SUM(a.sentiment), SUM(a.star_rating),
+            SUM(a.sentiment_category = 'POSITIVE'), SUM(a.sentiment_category = 'NEUTRAL'), SUM(a.sentiment_category = 'NEGATIVE'),
+            SUM(a.star_rating = 1), SUM(a.star_rating = 2), SUM(a.star_rating = 3), SUM(a.star_rating = 4), SUM(a.star_rating = 5)
+        FROM feedback_analysis AS a JOIN feedbacks AS f ON f.id = a.feedback_id
+        GROUP BY f.campaign_id"""
+    ))
+
+
+def _add_campaign_soft_delete(connection):
+    """Add campaign.deleted_at, set while a deleted campaign's feedbacks are purged in the background."""
+    connection.execute(text("ALTER TABLE campaign ADD COLUMN deleted_at DATETIME"))
+
+
+def _add_campaign_archive(connection):
+    """Add campaign.archived_at, set while a campaign's feedbacks are in cold storage."""
+    connection.execute(text("ALTER TABLE campaign ADD COLUMN archived_at DATETIME"))
+
+
+def _add_analytics_cube(connection):
+    """Add the analytics_cube rollup, the triggers maintaining it, and fill it from the existing analyses."""
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS analytics_cube (campaign_id INTEGER NOT NULL, day DATE NOT NULL, "
+        "sentiment_category VARCHAR(8) NOT NULL, star_rating INTEGER NOT NULL, gender VARCHAR(17) NOT NULL, "
+        "age_range VARCHAR(11) NOT NULL, education_level VARCHAR(10) NOT NULL, country VARCHAR(14) NOT NULL, "
+        "state VARCHAR(5) NOT NULL, language VARCHAR(5) NOT NULL, "
+        "analysis_count INTEGER DEFAULT '0' NOT NULL, sentiment_sum FLOAT DEFAULT '0' NOT NULL, "
+        "star_rating_sum INTEGER DEFAULT '0' NOT NULL, word_count_sum INTEGER DEFAULT '0' NOT NULL, "
+        "feedback_length_sum INTEGER DEFAULT '0' NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP, "
+        "PRIMARY KEY (campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, "
+        "country, state, language), FOREIGN KEY(campaign_id) REFERENCES campaign (id) ON DELETE CASCADE)"
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_cube_insert AFTER INSERT ON feedback_analysis
+        BEGIN
+            INSERT INTO analytics_cube (
+                campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state,
+                language, analysis_count, sentiment_sum, star_rating_sum, word_count_sum, feedback_length_sum
+            )
+            SELECT f.campaign_id, date(f.created_at), NEW.sentiment_category, NEW.star_rating, f.gender, f.age_range,
+                f.education_level, f.country, f.state, NEW.detected_language, 1, NEW.sentiment, NEW.star_rating,
+                NEW.word_count, NEW.feedback_length
+            FROM feedbacks AS f WHERE f.id = NEW.feedback_id
+            ON CONFLICT DO UPDATE SET
+                analysis_count = analysis_count + 1,
+                sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+                star_rating_sum = star_rating_sum + excluded.star_rating_sum,
+                word_count_sum = word_count_sum + excluded.word_count_sum,
+                feedback_length_sum = feedback_length_sum + excluded.feedback_length_sum;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_cube_delete AFTER DELETE ON feedback_analysis
+        BEGIN
+            UPDATE analytics_cube SET
+                analysis_count = analysis_count - 1,
+                sentiment_sum = sentiment_sum - OLD.sentiment,
+                star_rating_sum = star_rating_sum - OLD.star_rating,
+                word_count_sum = word_count_sum - OLD.word_count,
+                feedback_length_sum = feedback_length_sum - OLD.feedback_length
+            FROM feedbacks AS f
+            WHERE f.id = OLD.feedback_id AND analytics_cube.campaign_id = f.campaign_id
+                AND analytics_cube.day = date(f.created_at) AND analytics_cube.sentiment_category = OLD.sentiment_category
+                AND analytics_cube.star_rating = OLD.star_rating AND analytics_cube.gender = f.gender
+                AND analytics_cube.age_range = f.age_range AND analytics_cube.education_level = f.education_level
+                AND analytics_cube.country = f.country AND analytics_cube.state = f.state
+                AND analytics_cube.language = OLD.detected_language;
+            DELETE FROM analytics_cube WHERE analysis_count = 0 AND (
+                campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state, language
+            ) = (
+                SELECT f.campaign_id, date(f.created_at), OLD.sentiment_category, OLD.star_rating, f.gender, f.age_range,
+                    f.education_level, f.country, f.state, OLD.detected_language
+                FROM feedbacks AS f WHERE f.id = OLD.feedback_id
+            );
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_cube_update
+        AFTER UPDATE OF feedback_id, detected_language, word_count, feedback_length, sentiment, sentiment_category, star_rating
+        ON feedback_analysis
+        BEGIN
+            UPDATE analytics_cube SET
+                analysis_count = analysis_count - 1,
+                sentiment_sum = sentiment_sum - OLD.sentiment,
+                star_rating_sum = star_rating_sum - OLD.star_rating,
+                word_count_sum = word_count_sum - OLD.word_count,
+                feedback_length_sum = feedback_length_sum - OLD.feedback_length
+            FROM feedbacks AS f
+            WHERE f.id = OLD.feedback_id AND analytics_cube.campaign_id = f.campaign_id
+                AND analytics_cube.day = date(f.created_at) AND analytics_cube.sentiment_category = OLD.sentiment_category
+                AND analytics_cube.star_rating = OLD.star_rating AND analytics_cube.gender = f.gender
+                AND analytics_cube.age_range = f.age_range AND analytics_cube.education_level = f.education_level
+                AND analytics_cube.country = f.country AND analytics_cube.state = f.state
+                AND analytics_cube.language = OLD.detected_language;
+            DELETE FROM analytics_cube WHERE analysis_count = 0 AND (
+                campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state, language
+            ) = (
+                SELECT f.campaign_id, date(f.created_at), OLD.sentiment_category, OLD.star_rating, f.gender, f.age_range,
+                    f.education_level, f.country, f.state, OLD.detected_language
+                FROM feedbacks AS f WHERE f.id = OLD.feedback_id
+            );
+            INSERT INTO analytics_cube (
+                campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state,
+                language, analysis_count, sentiment_sum, star_rating_sum, word_count_sum, feedback_length_sum
+            )
+            SELECT f.campaign_id, date(f.created_at), NEW.sentiment_category, NEW.star_rating, f.gender, f.age_range,
+                f.education_level, f.country, f.state, NEW.detected_language, 1, NEW.sentiment, NEW.star_rating,
+                NEW.word_count, NEW.feedback_length
+            FROM feedbacks AS f WHERE f.id = NEW.feedback_id
+            ON CONFLICT DO UPDATE SET
+                analysis_count = analysis_count + 1,
+                sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+                star_rating_sum = star_rating_sum + excluded.star_rating_sum,
+                word_count_sum = word_count_sum + excluded.word_count_sum,
+                feedback_length_sum = feedback_length_sum + excluded.feedback_length_sum;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_cube_delete AFTER DELETE ON feedbacks
+        BEGIN
+            UPDATE analytics_cube SET
+                analysis_count = analysis_count - 1,
+                sentiment_sum = sentiment_sum - a.sentiment,
+                star_rating_sum = star_rating_sum - a.star_rating,
+                word_count_sum = word_count_sum - a.word_count,
+                feedback_length_sum = feedback_length_sum - a.feedback_length
+            FROM feedback_analysis AS a
+            WHERE a.feedback_id = OLD.id AND analytics_cube.campaign_id = OLD.campaign_id
+                AND analytics_cube.day = date(OLD.created_at) AND analytics_cube.sentiment_category = a.sentiment_category
+                AND analytics_cube.star_rating = a.star_rating AND analytics_cube.gender = OLD.gender
+                AND analytics_cube.age_range = OLD.age_range AND analytics_cube.education_level = OLD.education_level
+                AND analytics_cube.country = OLD.country AND analytics_cube.state = OLD.state
+                AND analytics_cube.language = a.detected_language;
+            DELETE FROM analytics_cube WHERE analysis_count = 0 AND (
+                campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state, language
+            ) = (
+                SELECT OLD.campaign_id, date(OLD.created_at), a.sentiment_category, a.star_rating, OLD.gender,
+                    OLD.age_range, OLD.education_level, OLD.country, OLD.state, a.detected_language
+                FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id
+            );
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_cube_update
+        AFTER UPDATE OF campaign_id, created_at, gender, age_range, education_level, country, state ON feedbacks
+        BEGIN
+            UPDATE analytics_cube SET
+                analysis_count = analysis_count - 1,
+                sentiment_sum = sentiment_sum - a.sentiment,
+                star_rating_sum = star_rating_sum - a.star_rating,
+                word_count_sum = word_count_sum - a.word_count,
+                feedback_length_sum = feedback_length_sum - a.feedback_length
+            FROM feedback_analysis AS a
+            WHERE a.feedback_id = OLD.id AND analytics_cube.campaign_id = OLD.campaign_id
+                AND analytics_cube.day = date(OLD.created_at) AND analytics_cube.sentiment_category = a.sentiment_category
+                AND analytics_cube.star_rating = a.star_rating AND analytics_cube.gender = OLD.gender
+                AND analytics_cube.age_range = OLD.age_range AND analytics_cube.education_level = OLD.education_level
+                AND analytics_cube.country = OLD.country AND analytics_cube.state = OLD.state
+                AND analytics_cube.language = a.detected_language;
+            DELETE FROM analytics_cube WHERE analysis_count = 0 AND (
+                campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state, language
+            ) = (
+                SELECT OLD.campaign_id, date(OLD.created_at), a.sentiment_category, a.star_rating, OLD.gender,
+                    OLD.age_range, OLD.education_level, OLD.country, OLD.state, a.detected_language
+                FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id
+            );
+            INSERT INTO analytics_cube (
+                campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state,
+                language, analysis_count, sentiment_sum, star_rating_sum, word_count_sum, feedback_length_sum
+            )
+            SELECT NEW.campaign_id, date(NEW.created_at), a.sentiment_category, a.star_rating, NEW.gender, NEW.age_range,
+                NEW.education_level, NEW.country, NEW.state, a.detected_language, 1, a.sentiment, a.star_rating,
+                a.word_count, a.feedback_length
+            FROM feedback_analysis AS a WHERE a.feedback_id = NEW.id
+            ON CONFLICT DO UPDATE SET
+                analysis_count = analysis_count + 1,
+                sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+                star_rating_sum = star_rating_sum + excluded.star_rating_sum,
+                word_count_sum = word_count_sum + excluded.word_count_sum,
+                feedback_length_sum = feedback_length_sum + excluded.feedback_length_sum;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_campaign_cube_delete AFTER DELETE ON campaign
+        BEGIN
+            DELETE FROM analytics_cube WHERE campaign_id = OLD.id;
+        END"""
+    ))
+    connection.execute(text(
+        """INSERT INTO analytics_cube (
+            campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state,
+            language, analysis_count, sentiment_sum, star_rating_sum, word_count_sum, feedback_length_sum
+        )
+        SELECT f.campaign_id, date(f.created_at), a.sentiment_category, a.star_rating, f.gender, f.age_range,
+            f.education_level, f.country, f.state, a.detected_language, COUNT(*), SUM(a.sentiment), SUM(a.star_rating),
+            SUM(a.word_count), SUM(a.feedback_length)
+        FROM feedback_analysis AS a JOIN feedbacks AS f ON f.id = a.feedback_id
+        GROUP BY f.campaign_id, date(f.created_at), a.sentiment_category, a.star_rating, f.gender, f.age_range,
+            f.education_level, f.country, f.state, a.detected_language"""
+    ))
+
+
+def _add_campaign_data_version(connection):
+    """Add campaign.data_version, bumped by triggers on analysis writes and feedback changes."""
+    connection.execute(text("ALTER TABLE campaign ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0"))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_version_insert AFTER INSERT ON feedback_analysis
+        BEGIN
+            UPDATE campaign SET data_version = data_version + 1
+            WHERE id = (SELECT campaign_id FROM feedbacks WHERE id = NEW.feedback_id);
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_version_delete AFTER DELETE ON feedback_analysis
+        BEGIN
+            UPDATE campaign SET data_version = data_version + 1
+            WHERE id = (SELECT campaign_id FROM feedbacks WHERE id = OLD.feedback_id);
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_version_update AFTER UPDATE ON feedback_analysis
+        BEGIN
+            UPDATE campaign SET data_version = data_version + 1
+            WHERE id IN (SELECT campaign_id FROM feedbacks WHERE id IN (OLD.feedback_id, NEW.feedback_id));
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_version_delete AFTER DELETE ON feedbacks
+        BEGIN
+            UPDATE campaign SET data_version = data_version + 1 WHERE id = OLD.campaign_id;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_version_update
+        AFTER UPDATE OF campaign_id, created_at, message, gender, age_range, education_level, country, state ON feedbacks
+        BEGIN
+            UPDATE campaign SET data_version = data_version + 1 WHERE id IN (OLD.campaign_id, NEW.campaign_id);
+        END"""
+    ))
+
+
+def _add_word_frequency(connection):
+    """Add the word_frequency table and fill it from the existing analyzed feedbacks."""
+    # Tokenizing is done in Python, with a frozen copy of the tokenizer of the release that adds
+    # the table (utils.text.count_words may change; this backfill must not)
+    import re
+    import unicodedata
+    from collections import Counter
+
+    stopword_lists = {
+        "pt": {
+            "a", "o", "as", "os", "e", "de", "do", "da", "das", "dos", "em", "um", "uma", "uns", "umas", "para", "pra",
+            "por", "com", "no", "na", "nos", "nas", "ao", "à", "aos", "às", "que", "se", "é", "não", "sim", "mas", "ou",
+            "como", "eu", "ele", "ela", "eles", "elas", "me", "meu", "minha", "seu", "sua", "isso", "isto", "esse",
+            "essa", "este", "esta", "foi", "ser", "são", "está", "estava", "muito", "mais", "já", "também", "lhe", "ter",
+            "tem", "tinha", "pelo", "pela", "num", "numa",
+        },
+        "en": {
+            "a", "an", "the", "and", "of", "to", "in", "for", "on", "with", "at", "by", "be", "is", "are", "was", "were",
+            "it", "its", "it's", "this", "that", "from", "as", "or", "if", "so", "do", "does", "did", "not", "i", "me",
+            "my", "we", "our", "you", "your", "he", "she", "they", "them", "their", "have", "has", "had", "but", "very",
+            "too", "also", "just", "all", "there", "been", "will", "would", "can", "could", "about",
+        },
+        "es": {
+            "a", "el", "la", "los", "las", "lo", "un", "una", "unos", "unas", "y", "o", "de", "del", "en", "para", "por",
+            "con", "que", "se", "es", "no", "sí", "pero", "como", "al", "me", "mi", "su", "sus", "yo", "fue", "muy",
+            "más", "ya", "también", "este", "esta", "esto", "ese", "esa", "eso", "hay", "ha", "era", "son", "está",
+        },
+        "fr": {
+            "a", "à", "le", "la", "les", "l", "un", "une", "des", "du", "de", "d", "et", "ou", "en", "dans", "pour", "par",
+            "avec", "que", "qui", "se", "ce", "c", "est", "ne", "pas", "mais", "comme", "au", "aux", "je", "j", "il",
+            "elle", "nous", "vous", "ils", "mon", "ma", "mes", "son", "sa", "ses", "été", "très", "plus", "sur", "était",
+        },
+        "de": {
+            "der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einem", "und", "oder", "zu", "in", "im",
+            "für", "mit", "auf", "von", "vom", "an", "am", "ist", "war", "sind", "nicht", "aber", "wie", "ich", "es",
+            "er", "sie", "wir", "ihr", "mein", "sehr", "auch", "so", "dass", "hat", "habe", "zum", "zur",
+        },
+    }
+    all_stopwords = set().union(*stopword_lists.values())
+    word_pattern = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+
+    def count_words(message, language):
+        """Count the words of a message, as utils.text.count_words did in this release."""
+        stopwords = stopword_lists.get(language, all_stopwords)
+        normalized = unicodedata.normalize("NFKC", message).casefold().replace("’", "'")
+        return Counter(
+            word for word in word_pattern.findall(normalized)
+            if 1 < len(word) <= 64 and word not in stopwords
+        )
+
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS word_frequency (campaign_id INTEGER NOT NULL, word VARCHAR(64) NOT NULL, "
+        "day DATE NOT NULL, count INTEGER DEFAULT '0' NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP, "
+        "PRIMARY KEY (campaign_id, word, day), FOREIGN KEY(campaign_id) REFERENCES campaign (id) ON DELETE CASCADE)"
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_campaign_word_frequency_delete AFTER DELETE ON campaign
+        BEGIN
+            DELETE FROM word_frequency WHERE campaign_id = OLD.id;
+        END"""
+    ))
+    last_id = 0
+    while True:
+        rows = connection.execute(text(
+            "SELECT f.id, f.campaign_id, date(f.created_at), f.message, a.detected_language "
+            "FROM feedbacks AS f JOIN feedback_analysis AS a ON a.feedback_id = f.id "
+            "WHERE f.id > :last_id ORDER BY f.id LIMIT 1000"
+        ), {"last_id": last_id}).all()
+        if not rows:
+            break
+        counts = Counter()
+        for _, campaign_id, day, message, language in rows:
+            for word, count in count_words(message, language).items():
+                counts[(campaign_id, word, day)] += count
+        if counts:
+            connection.execute(
+                text(
+                    "INSERT INTO word_frequency (campaign_id, word, day, count) VALUES (:campaign_id, :word, :day, :count) "
+                    "ON CONFLICT (campaign_id, word, day) DO UPDATE SET count = count + excluded.count"
+                ),
+                [{"campaign_id": c, "word": w, "day": d, "count": n} for (c, w, d), n in counts.items()],
+            )
+        last_id = rows[-1][0]
+
+
+def _add_campaign_hourly_stats(connection):
+    """Add the campaign_hourly_stats rollup, the triggers maintaining it, and fill it from the existing analyses."""
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS campaign_hourly_stats (campaign_id INTEGER NOT NULL, hour DATETIME NOT NULL, "
+        "analysis_count INTEGER DEFAULT '0' NOT NULL, sentiment_sum FLOAT DEFAULT '0' NOT NULL, "
+        "positive_count INTEGER DEFAULT '0' NOT NULL, neutral_count INTEGER DEFAULT '0' NOT NULL, "
+        "negative_count INTEGER DEFAULT '0' NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP, "
+        "PRIMARY KEY (campaign_id, hour), FOREIGN KEY(campaign_id) REFERENCES campaign (id) ON DELETE CASCADE)"
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_hourly_insert AFTER INSERT ON feedback_analysis
+        BEGIN
+            INSERT INTO campaign_hourly_stats (
+                campaign_id, hour, analysis_count, sentiment_sum, positive_count, neutral_count, negative_count
+            )
+            SELECT f.campaign_id, strftime('%Y-%m-%d %H:00:00', f.created_at), 1, NEW.sentiment,
+                NEW.sentiment_category = 'POSITIVE', NEW.sentiment_category = 'NEUTRAL', NEW.sentiment_category = 'NEGATIVE'
+            FROM feedbacks AS f WHERE f.id = NEW.feedback_id
+            ON CONFLICT DO UPDATE SET
+                analysis_count = analysis_count + 1,
+                sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+                positive_count = positive_count + excluded.positive_count,
+                neutral_count = neutral_count + excluded.neutral_count,
+                negative_count = negative_count + excluded.negative_count;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_hourly_delete AFTER DELETE ON feedback_analysis
+        BEGIN
+            UPDATE campaign_hourly_stats SET
+                analysis_count = analysis_count - 1,
+                sentiment_sum = sentiment_sum - OLD.sentiment,
+                positive_count = positive_count - (OLD.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count - (OLD.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count - (OLD.sentiment_category = 'NEGATIVE')
+            FROM feedbacks AS f
+            WHERE f.id = OLD.feedback_id AND campaign_hourly_stats.campaign_id = f.campaign_id
+                AND campaign_hourly_stats.hour = strftime('%Y-%m-%d %H:00:00', f.created_at);
+            DELETE FROM campaign_hourly_stats WHERE analysis_count = 0 AND (campaign_id, hour) = (
+                SELECT f.campaign_id, strftime('%Y-%m-%d %H:00:00', f.created_at)
+                FROM feedbacks AS f WHERE f.id = OLD.feedback_id
+            );
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_hourly_update
+        AFTER UPDATE OF feedback_id, sentiment, sentiment_category ON feedback_analysis
+        BEGIN
+            UPDATE campaign_hourly_stats SET
+                analysis_count = analysis_count - 1,
+                sentiment_sum = sentiment_sum - OLD.sentiment,
+                positive_count = positive_count - (OLD.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count - (OLD.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count - (OLD.sentiment_category = 'NEGATIVE')
+            FROM feedbacks AS f
+            WHERE f.id = OLD.feedback_id AND campaign_hourly_stats.campaign_id = f.campaign_id
+                AND campaign_hourly_stats.hour = strftime('%Y-%m-%d %H:00:00', f.created_at);
+            DELETE FROM campaign_hourly_stats WHERE analysis_count = 0 AND (campaign_id, hour) = (
+                SELECT f.campaign_id, strftime('%Y-%m-%d %H:00:00', f.created_at)
+                FROM feedbacks AS f WHERE f.id = OLD.feedback_id
+            );
+            INSERT INTO campaign_hourly_stats (
+                campaign_id, hour, analysis_count, sentiment_sum, positive_count, neutral_count, negative_count
+            )
+            SELECT f.campaign_id, strftime('%Y-%m-%d %H:00:00', f.created_at), 1, NEW.sentiment,
+                NEW.sentiment_category = 'POSITIVE', NEW.sentiment_category = 'NEUTRAL', NEW.sentiment_category = 'NEGATIVE'
+            FROM feedbacks AS f WHERE f.id = NEW.feedback_id
+            ON CONFLICT DO UPDATE SET
+                analysis_count = analysis_count + 1,
+                sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+                positive_count = positive_count + excluded.positive_count,
+                neutral_count = neutral_count + excluded.neutral_count,
+                negative_count = negative_count + excluded.negative_count;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_hourly_delete AFTER DELETE ON feedbacks
+        BEGIN
+            UPDATE campaign_hourly_stats SET
+                analysis_count = analysis_count - 1,
+                sentiment_sum = sentiment_sum - a.sentiment,
+                positive_count = positive_count - (a.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count - (a.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count - (a.sentiment_category = 'NEGATIVE')
+            FROM feedback_analysis AS a
+            WHERE a.feedback_id = OLD.id AND campaign_hourly_stats.campaign_id = OLD.campaign_id
+                AND campaign_hourly_stats.hour = strftime('%Y-%m-%d %H:00:00', OLD.created_at);
+            DELETE FROM campaign_hourly_stats WHERE analysis_count = 0 AND (campaign_id, hour) = (
+                SELECT OLD.campaign_id, strftime('%Y-%m-%d %H:00:00', OLD.created_at)
+                FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id
+            );
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_hourly_update AFTER UPDATE OF campaign_id, created_at ON feedbacks
+        BEGIN
+            UPDATE campaign_hourly_stats SET
+                analysis_count = analysis_count - 1,
+                sentiment_sum = sentiment_sum - a.sentiment,
+                positive_count = positive_count - (a.sentiment_category = 'POSITIVE'),
+                neutral_count = neutral_count - (a.sentiment_category = 'NEUTRAL'),
+                negative_count = negative_count - (a.sentiment_category = 'NEGATIVE')
+            FROM feedback_analysis AS a
+            WHERE a.feedback_id = OLD.id AND campaign_hourly_stats.campaign_id = OLD.campaign_id
+                AND campaign_hourly_stats.hour = strftime('%Y-%m-%d %H:00:00', OLD.created_at);
+            DELETE FROM campaign_hourly_stats WHERE analysis_count = 0 AND (campaign_id, hour) = (
+                SELECT OLD.campaign_id, strftime('%Y-%m-%d %H:00:00', OLD.created_at)
+                FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id
+            );
+            INSERT INTO campaign_hourly_stats (
+                campaign_id, hour, analysis_count, sentiment_sum, positive_count, neutral_count, negative_count
+            )
+            SELECT NEW.campaign_id, strftime('%Y-%m-%d %H:00:00', NEW.created_at), 1, a.sentiment,
+                a.sentiment_category = 'POSITIVE', a.sentiment_category = 'NEUTRAL', a.sentiment_category = 'NEGATIVE'
+            FROM feedback_analysis AS a WHERE a.feedback_id = NEW.id
+            ON CONFLICT DO UPDATE SET
+                analysis_count = analysis_count + 1,
+                sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+                positive_count = positive_count + excluded.positive_count,
+                neutral_count = neutral_count + excluded.neutral_count,
+                negative_count = negative_count + excluded.negative_count;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS trg_campaign_hourly_delete AFTER DELETE ON campaign
+        BEGIN
+            DELETE FROM campaign_hourly_stats WHERE campaign_id = OLD.id;
+        END"""
+    ))
+    connection.execute(text(
+        """INSERT INTO campaign_hourly_stats (
+            campaign_id, hour, analysis_count, sentiment_sum, positive_count, neutral_count, negative_count
+        )
+        SELECT f.campaign_id, strftime('%Y-%m-%d %H:00:00', f.created_at), COUNT(*), SUM(a.sentiment),
+            SUM(a.sentiment_category = 'POSITIVE'), SUM(a.sentiment_category = 'NEUTRAL'),
+            SUM(a.sentiment_category = 'NEGATIVE')
+        FROM feedback_analysis AS a JOIN feedbacks AS f ON f.id = a.feedback_id
+        GROUP BY f.campaign_id, strftime('%Y-%m-%d %H:00:00', f.created_at)"""
+    ))
+
+# Ordered list of migrations as (version, description, function) tuples.
+# Migrations are frozen once released: add a new entry instead of editing an old one.
+MIGRATIONS = [
+    (1, "Add hot-path indexes on feedbacks and feedback_analysis", _add_hot_path_indexes),
+    (2, "Add campaign.feedback_count maintained by triggers", _add_campaign_feedback_count),
+    (3, "Enforce max_answers and single answers per IP in the database", _add_single_answer_constraints),
+    (4, "Add created_at indexes for keyset pagination", _add_pagination_indexes),
+    (5, "Add full-text search index over feedback messages", _add_feedback_search_index),
+    (6, "Add sentiment and star rating indexes for sorted feedback listings", _add_analysis_sort_indexes),
+    (7, "Add ingestion checkpoints for the write-behind feedback buffer", _add_ingestion_checkpoint),
+    (8, "Add campaign_stats maintained by triggers on analyses and feedbacks", _add_campaign_stats),
+    (9, "Add campaign.deleted_at for background campaign deletion", _add_campaign_soft_delete),
+    (10, "Add campaign.archived_at for cold-storage archives", _add_campaign_archive),
+    (11, "Add analytics_cube rollup maintained by triggers for dashboard charts", _add_analytics_cube),
+    (12, "Add campaign.data_version for the dashboard component data cache", _add_campaign_data_version),
+    (13, "Add word_frequency counts for the word_cloud component", _add_word_frequency),
+    (14, "Add campaign_hourly_stats rollup maintained by triggers for trend charts", _add_campaign_hourly_stats),
+]
+
+
+def get_schema_version(connection) -> int | None:
+    """
+    Return the latest applied migration version.
+
+    Args:
+        connection: An open SQLAlchemy connection.
+
+    Returns:
+        int | None: The latest applied version, or None if no migration was ever recorded.
+    """
+    return connection.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar()
+
+
+def _record_version(connection, version: int, description: str):
+    """Record a migration version as applied."""
+    connection.execute(
+        text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, description, applied_at) VALUES (:version, :description, CURRENT_TIMESTAMP)"),
+        {"version": version, "description": description},
+    )
+
+
+def run_migrations(engine) -> list[int]:
+    """
+    Bring the database schema up to date.
+
+    A database without recorded versions and without tables is created from the
+    current models and stamped with the latest version. A legacy database (tables
+    but no recorded versions) gets every migration applied. Otherwise only the
+    pending migrations run, each one in its own transaction.
+
+    Args:
+        engine: The SQLAlchemy engine of the database to migrate.
+
+    Returns:
+        list[int]: The versions applied by this call.
+    """
+    with engine.begin() as connection:
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, applied_at DATETIME NOT NULL)"
+        ))
+        current_version = get_schema_version(connection)
+
+        if current_version is None and not inspect(connection).has_table("campaign"):
+            # Fresh database: create the current schema and mark every migration as applied
+            BaseModel.metadata.create_all(connection)
+            for version, description, _ in MIGRATIONS:
+                _record_version(connection, version, description)
+            return [version for version, _, _ in MIGRATIONS]
+
+    applied = []
+    for version, description, migration in MIGRATIONS:
+        if current_version is not None and version <= current_version:
+            continue
+        with engine.begin() as connection:
+            migration(connection)
+            _record_version(connection, version, description)
+        applied.append(version)
+    return applied
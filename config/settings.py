@@ -9,3 +9,55 @@ SHORT_SENTENCE_BOOST = float(os.getenv("SHORT_SENTENCE_BOOST", 0.2))
 SHORT_SENTENCE_THRESHOLD = int(os.getenv("SHORT_SENTENCE_THRESHOLD", 5))
 NEUTRAL_PENALTY_THRESHOLD = int(os.getenv("NEUTRAL_PENALTY_THRESHOLD", 50))
 NEUTRAL_PENALTY_FACTOR = float(os.getenv("NEUTRAL_PENALTY_FACTOR", 0.9))
+
+# Settings for read/write session routing
+READ_DB_URL = os.getenv("READ_DB_URL")
+READ_ROUTED_BLUEPRINTS = [name.strip() for name in os.getenv("READ_ROUTED_BLUEPRINTS", "dashboard").split(",") if name.strip()]
+SQLITE_WAL_MODE = os.getenv("SQLITE_WAL_MODE", "true").lower() == "true"
+
+# Settings for query instrumentation
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+
+# Settings for bulk feedback ingestion
+BULK_INGEST_CHUNK_SIZE = int(os.getenv("BULK_INGEST_CHUNK_SIZE", 500))
+BULK_INGEST_MAX_ITEMS = int(os.getenv("BULK_INGEST_MAX_ITEMS", 50000))
+
+# Settings for estimated list totals
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", 60))
+COUNT_CACHE_SIZE = int(os.getenv("COUNT_CACHE_SIZE", 1024))
+
+# Settings for data exports
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+# Settings for the write-behind feedback buffer
+FEEDBACK_BUFFER_ENABLED = os.getenv("FEEDBACK_BUFFER_ENABLED", "false").lower() == "true"
+FEEDBACK_BUFFER_BATCH_SIZE = int(os.getenv("FEEDBACK_BUFFER_BATCH_SIZE", 200))
+FEEDBACK_BUFFER_MAX_LATENCY_MS = float(os.getenv("FEEDBACK_BUFFER_MAX_LATENCY_MS", 50))
+FEEDBACK_BUFFER_LOG_PATH = os.getenv("FEEDBACK_BUFFER_LOG_PATH", "database/feedback_buffer.log")
+FEEDBACK_BUFFER_FSYNC = os.getenv("FEEDBACK_BUFFER_FSYNC", "true").lower() == "true"
+FEEDBACK_BUFFER_STATUS_TTL = float(os.getenv("FEEDBACK_BUFFER_STATUS_TTL", 3600))
+
+# Settings for the in-process campaign cache
+CAMPAIGN_CACHE_TTL = float(os.getenv("CAMPAIGN_CACHE_TTL", 30))
+CAMPAIGN_CACHE_SIZE = int(os.getenv("CAMPAIGN_CACHE_SIZE", 10000))
+
+# Key of the permutation deriving campaign short codes from their IDs (changing it changes every new code)
+SHORT_CODE_KEY = os.getenv("SHORT_CODE_KEY", "wave-short-codes")
+
+# Settings for background campaign deletion
+CAMPAIGN_PURGE_CHUNK_SIZE = int(os.getenv("CAMPAIGN_PURGE_CHUNK_SIZE", 1000))
+
+# Settings for cold-storage campaign archives
+CAMPAIGN_ARCHIVE_DIR = os.getenv("CAMPAIGN_ARCHIVE_DIR", "database/archive")
+
+# Settings for the dashboard component data cache
+COMPONENT_CACHE_TTL = float(os.getenv("COMPONENT_CACHE_TTL", 3600))
+COMPONENT_CACHE_SIZE = int(os.getenv("COMPONENT_CACHE_SIZE", 1024))
+
+# Settings for the word_cloud component
+WORD_CLOUD_DEFAULT_LIMIT = int(os.getenv("WORD_CLOUD_DEFAULT_LIMIT", 100))
+WORD_CLOUD_MAX_LIMIT = int(os.getenv("WORD_CLOUD_MAX_LIMIT", 1000))
+
+# Settings for the whole-dashboard data endpoint
+DASHBOARD_DATA_WORKERS = int(os.getenv("DASHBOARD_DATA_WORKERS", 4))
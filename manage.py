@@ -0,0 +1,134 @@
+import argparse
+import sys
+from datetime import datetime
+from config import engine, SessionLocal
+from config.migrations import run_migrations
+
+
+def migrate(args):
+    """Apply pending schema migrations."""
+    applied = run_migrations(engine)
+    if applied:
+        print(f"Applied migrations: {', '.join(str(version) for version in applied)}")
+    else:
+        print("Database schema is up to date")
+
+
+def reconcile_counts(args):
+    """Repair the per-campaign feedback counters."""
+    from services import reconcile_feedback_counts
+
+    with SessionLocal() as db:
+        corrected = reconcile_feedback_counts(db, args.campaign_ids)
+    print(f"Corrected feedback_count of {corrected} campaign(s)")
+
+
+def rebuild_stats(args):
+    """Recompute the per-campaign analysis statistics, the analytics cube, the hourly statistics and the word counts."""
+    from services import (
+        rebuild_campaign_stats, rebuild_analytics_cube, rebuild_campaign_hourly_stats, rebuild_word_frequencies,
+    )
+
+    with SessionLocal() as db:
+        rebuilt = rebuild_campaign_stats(db, args.campaign_ids)
+        cells = rebuild_analytics_cube(db, args.campaign_ids)
+        hours = rebuild_campaign_hourly_stats(db, args.campaign_ids)
+        words = rebuild_word_frequencies(db, args.campaign_ids)
+    print(
+        f"Rebuilt campaign_stats of {rebuilt} campaign(s), {cells} analytics_cube cell(s), "
+        f"{hours} campaign hour(s) and {words} word count(s)"
+    )
+
+
+def archive_campaigns(args):
+    """Move closed campaigns' feedbacks to cold storage."""
+    from services import archive_campaign
+
+    with SessionLocal() as db:
+        for campaign_id in args.campaign_ids:
+            try:
+                result = archive_campaign(db, campaign_id)
+            except ValueError as e:
+                print(e)
+                continue
+            print(f"Archived campaign {campaign_id}: {result['feedbacks']} feedback(s), "
+                  f"{result['analyses']} analysis(es) in {result['path']}")
+
+
+def restore_campaigns(args):
+    """Bring archived campaigns' feedbacks back into the live tables."""
+    from services import restore_campaign
+
+    with SessionLocal() as db:
+        for campaign_id in args.campaign_ids:
+            try:
+                result = restore_campaign(db, campaign_id)
+            except ValueError as e:
+                print(e)
+                continue
+            print(f"Restored campaign {campaign_id}: {result['feedbacks']} feedback(s), {result['analyses']} analysis(es)")
+
+
+def export_feedbacks(args):
+    """Stream feedbacks and their analyses to a file or stdout."""
+    from services import build_export_query, stream_export
+
+    with SessionLocal() as db:
+        chunks = stream_export(build_export_query(db, args), args.format, args.gzip)
+        if args.output == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            with open(args.output, "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            print(f"Feedbacks exported to: {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feedback API management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Command: apply schema migrations
+    migrate_parser = subparsers.add_parser("migrate", help="Apply pending schema migrations")
+    migrate_parser.set_defaults(func=migrate)
+
+    # Command: repair the per-campaign feedback counters
+    reconcile_parser = subparsers.add_parser("reconcile-counts", help="Repair campaign feedback counters")
+    reconcile_parser.add_argument("campaign_ids", nargs="*", type=int, help="Campaign IDs (default: all)")
+    reconcile_parser.set_defaults(func=reconcile_counts)
+
+    # Command: recompute the per-campaign analysis statistics
+    stats_parser = subparsers.add_parser("rebuild-stats", help="Recompute campaign analysis statistics, the analytics cube, hourly statistics and word counts")
+    stats_parser.add_argument("campaign_ids", nargs="*", type=int, help="Campaign IDs (default: all)")
+    stats_parser.set_defaults(func=rebuild_stats)
+
+    # Command: move closed campaigns to cold storage
+    archive_parser = subparsers.add_parser("archive-campaign", help="Archive closed campaigns' feedbacks")
+    archive_parser.add_argument("campaign_ids", nargs="+", type=int, help="Campaign IDs")
+    archive_parser.set_defaults(func=archive_campaigns)
+
+    # Command: restore archived campaigns
+    restore_parser = subparsers.add_parser("restore-campaign", help="Restore archived campaigns' feedbacks")
+    restore_parser.add_argument("campaign_ids", nargs="+", type=int, help="Campaign IDs")
+    restore_parser.set_defaults(func=restore_campaigns)
+
+    # Command: stream an export of feedbacks and their analyses
+    export_parser = subparsers.add_parser("export-feedbacks", help="Export feedbacks and their analyses")
+    export_parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], default="csv", help="Export format (default: csv)")
+    export_parser.add_argument("--gzip", action="store_true", help="Compress the export with gzip")
+    export_parser.add_argument("--output", default="-", help="Output file (default: stdout)")
+    export_parser.add_argument("--campaign-id", type=int, help="Only feedbacks of this campaign")
+    export_parser.add_argument("--created-from", type=datetime.fromisoformat, help="Only feedbacks created at or after this ISO time")
+    export_parser.add_argument("--created-to", type=datetime.fromisoformat, help="Only feedbacks created before this ISO time")
+    for name in ["age-range", "gender", "education-level", "country", "state"]:
+        export_parser.add_argument(f"--{name}", help=f"Only feedbacks with this {name.replace('-', ' ')}")
+    export_parser.set_defaults(func=export_feedbacks)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,172 @@
+import argparse
+import csv
+import json
+import os
+from datetime import datetime, timezone
 import pandas as pd
-from config import SessionLocal
+from config import SessionLocal, EXPORT_BATCH_SIZE
 from model import Feedback, FeedbackAnalysis
 
+# Full dataset, rewritten by every full export
+DATASET_FILE = "ml_data/feedback_dataset.csv"
+
+# Partitioned dataset, extended by incremental exports
+DATASET_DIR = "ml_data/feedback_dataset"
+
+# High-water mark of the partitioned dataset (last exported analysis id)
+WATERMARK_FILE = "_watermark.json"
+
+# Dataset columns, in order
+DATASET_COLUMNS = [
+    'feedback_id', 'campaign_id', 'gender', 'age_range', 'education_level', 'country', 'state',
+    'message', 'sentiment_category', 'sentiment_score', 'word_count', 'feedback_length', 'detected_language'
+]
+
+
+def _dataset_query(db):
+    """Query feedbacks joined with their analysis, in analysis id order."""
+    return db.query(
+        FeedbackAnalysis.id.label("analysis_id"),
+        Feedback.id,
+        Feedback.campaign_id,
+        Feedback.gender,
+        Feedback.age_range,
+        Feedback.education_level,
+        Feedback.country,
+        Feedback.state,
+        Feedback.message,
+        FeedbackAnalysis.sentiment_category,
+        FeedbackAnalysis.sentiment,  # VADER score (-1 to 1)
+        FeedbackAnalysis.word_count,
+        FeedbackAnalysis.feedback_length,
+        FeedbackAnalysis.detected_language
+    ).join(
+        FeedbackAnalysis, Feedback.id == FeedbackAnalysis.feedback_id
+    ).order_by(FeedbackAnalysis.id)
+
+
+def _dataset_record(record):
+    """Convert a dataset query row into a dataset record."""
+    return {
+        'feedback_id': record.id,
+        'campaign_id': record.campaign_id,
+        'gender': record.gender.value if record.gender else "unknown",
+        'age_range': record.age_range.value if record.age_range else "unknown",
+        'education_level': record.education_level.value if record.education_level else "unknown",
+        'country': record.country.value if record.country else "unknown",
+        'state': record.state.value if record.state else "unknown",
+        'message': record.message,
+        'sentiment_category': record.sentiment_category.value,
+        'sentiment_score': float(record.sentiment),  # VADER score
+        'word_count': record.word_count,
+        'feedback_length': record.feedback_length,
+        'detected_language': record.detected_language
+    }
+
+
+def read_watermark(dataset_dir: str = DATASET_DIR) -> dict:
+    """
+    Read the high-water mark of a partitioned dataset.
+
+    Args:
+        dataset_dir (str, optional): The partitioned dataset directory.
+
+    Returns:
+        dict: The last exported `analysis_id` and the number of exported `rows` (zeros for a new dataset).
+    """
+    path = os.path.join(dataset_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {"analysis_id": 0, "rows": 0}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_watermark(dataset_dir: str, watermark: dict):
+    """Atomically replace the high-water mark of a partitioned dataset."""
+    path = os.path.join(dataset_dir, WATERMARK_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(watermark, f)
+    os.replace(path + ".tmp", path)
+
+
+def export_feedback_dataset_incremental(dataset_dir: str = DATASET_DIR):
+    """
+    Append feedbacks analyzed since the last run to a partitioned dataset.
+
+    Analyses are insert-only and their ids grow, so the last exported analysis id
+    is a high-water mark: each run streams the rows above it into a new
+    `part-<first analysis id>.csv` partition, then moves the mark. A run that
+    fails before moving the mark is simply redone by the next run, which
+    rewrites the same partition.
+
+    Args:
+        dataset_dir (str, optional): The partitioned dataset directory.
+
+    Returns:
+        int: The number of rows appended (0 when the dataset is up to date).
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    watermark = read_watermark(dataset_dir)
+
+    with SessionLocal() as db:
+        rows = _dataset_query(db).filter(
+            FeedbackAnalysis.id > watermark["analysis_id"]
+        ).yield_per(EXPORT_BATCH_SIZE)
+
+        partial_file = os.path.join(dataset_dir, "part.csv.tmp")
+        count = 0
+        first_id = last_id = None
+        with open(partial_file, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=DATASET_COLUMNS)
+            writer.writeheader()
+            for record in rows:
+                writer.writerow(_dataset_record(record))
+                first_id = first_id or record.analysis_id
+                last_id = record.analysis_id
+                count += 1
+
+    if not count:
+        os.remove(partial_file)
+        print(f"Dataset is up to date (watermark: analysis {watermark['analysis_id']})")
+        return 0
+
+    os.replace(partial_file, os.path.join(dataset_dir, f"part-{first_id:010d}.csv"))
+    _write_watermark(dataset_dir, {
+        "analysis_id": last_id,
+        "rows": watermark["rows"] + count,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    })
+    print(f"Appended {count} feedback records to: {dataset_dir} (watermark: analysis {last_id})")
+    return count
+
+
+def load_feedback_dataset(dataset_dir: str = DATASET_DIR, dataset_file: str = DATASET_FILE):
+    """
+    Load the training dataset: the partitioned dataset when it exists, otherwise the full CSV export.
+
+    Args:
+        dataset_dir (str, optional): The partitioned dataset directory.
+        dataset_file (str, optional): The full dataset file.
+
+    Returns:
+        pd.DataFrame | None: The dataset, or None if neither was exported yet.
+    """
+    if os.path.isdir(dataset_dir):
+        parts = sorted(name for name in os.listdir(dataset_dir) if name.startswith("part-") and name.endswith(".csv"))
+        if parts:
+            return pd.concat([pd.read_csv(os.path.join(dataset_dir, name)) for name in parts], ignore_index=True)
+    if os.path.exists(dataset_file):
+        return pd.read_csv(dataset_file)
+    return None
+
+
 def export_feedback_dataset():
     """Export feedback data with demographic info and sentiment scores for training"""
-    
+
     try:
         with SessionLocal() as db:
             # Query with sentiment score included
-            records = db.query(
-                Feedback.id,
-                Feedback.campaign_id,
-                Feedback.gender,
-                Feedback.age_range,
-                Feedback.education_level,
-                Feedback.country,
-                Feedback.state,
-                Feedback.message,
-                FeedbackAnalysis.sentiment_category,
-                FeedbackAnalysis.sentiment,  # VADER score (-1 to 1)
-                FeedbackAnalysis.word_count,
-                FeedbackAnalysis.feedback_length,
-                FeedbackAnalysis.detected_language
-            ).join(
-                FeedbackAnalysis, Feedback.id == FeedbackAnalysis.feedback_id
-            ).all()
+            records = _dataset_query(db).all()
 
             if not records:
                 print("No feedback data found in database!")
@@ -33,50 +175,40 @@ def export_feedback_dataset():
             print(f"Found {len(records)} feedback records")
 
             # Convert to DataFrame with sentiment score
-            data = []
-            for record in records:
-                data.append({
-                    'feedback_id': record.id,
-                    'campaign_id': record.campaign_id,
-                    'gender': record.gender.value if record.gender else "unknown",
-                    'age_range': record.age_range.value if record.age_range else "unknown", 
-                    'education_level': record.education_level.value if record.education_level else "unknown",
-                    'country': record.country.value if record.country else "unknown",
-                    'state': record.state.value if record.state else "unknown",
-                    'message': record.message,
-                    'sentiment_category': record.sentiment_category.value,
-                    'sentiment_score': float(record.sentiment),  # VADER score
-                    'word_count': record.word_count,
-                    'feedback_length': record.feedback_length,
-                    'detected_language': record.detected_language
-                })
-
-            df = pd.DataFrame(data)
-            
+            data = [_dataset_record(record) for record in records]
+
+            df = pd.DataFrame(data, columns=DATASET_COLUMNS)
+
             # Create output directory
-            import os
             os.makedirs("ml_data", exist_ok=True)
-            
+
             # Save enhanced dataset
-            output_file = "ml_data/feedback_dataset.csv"
+            output_file = DATASET_FILE
             df.to_csv(output_file, index=False)
-            
+
             print(f"Dataset exported to: {output_file}")
             print(f"Columns: {list(df.columns)}")
             print(f"Shape: {df.shape}")
-            
+
             # Show sentiment score statistics
             print(f"\nSentiment Score Statistics:")
             print(df['sentiment_score'].describe())
-            
+
             print(f"\nSentiment Distribution:")
             print(df['sentiment_category'].value_counts())
-            
+
             return True
-            
+
     except Exception as e:
         print(f"Error exporting dataset: {e}")
         return False
 
 if __name__ == "__main__":
-    export_feedback_dataset()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export the feedback training dataset")
+    parser.add_argument("--incremental", action="store_true", help=f"Append new rows to {DATASET_DIR}/ instead of rewriting {DATASET_FILE}")
+    args = parser.parse_args()
+
+    if args.incremental:
+        export_feedback_dataset_incremental()
+    else:
+        export_feedback_dataset()
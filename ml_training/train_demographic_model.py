@@ -10,18 +10,17 @@ from sklearn.metrics import accuracy_score, classification_report
 from imblearn.under_sampling import RandomUnderSampler
 from imblearn.over_sampling import SMOTE
 import warnings
+from ml_training.export_feedback_dataset import DATASET_DIR, DATASET_FILE, load_feedback_dataset
 warnings.filterwarnings('ignore')
 
 def train_realistic_models():
     """Train both demographic-only and text-based models with proper evaluation"""
     
-    data_file = "ml_data/feedback_dataset.csv"
-    if not os.path.exists(data_file):
-        print(f"Error: Data file {data_file} not found!")
-        return False
-
     print("Loading dataset...")
-    df = pd.read_csv(data_file)
+    df = load_feedback_dataset()
+    if df is None:
+        print(f"Error: No dataset found in {DATASET_DIR}/ or {DATASET_FILE}!")
+        return False
     print(f"Dataset shape: {df.shape}")
 
     print("\nClass distribution:")
@@ -2,7 +2,13 @@ from .base import BaseModel
 from .enums import SentimentCategory, ComponentType, AgeRange, Gender, EducationLevel, Country, State
 from .feedback_analysis import FeedbackAnalysis
 from .feedback import Feedback
+from .feedback_search import feedbacks_fts
 from .campaign import Campaign
+from .campaign_stats import CampaignStats
+from .analytics_cube import AnalyticsCube
+from .campaign_hourly_stats import CampaignHourlyStats
+from .word_frequency import WordFrequency
 from .dashboard_campaign import dashboard_campaign
 from .dashboard import Dashboard
-from .component import Component
\ No newline at end of file
+from .component import Component
+from .ingestion_checkpoint import IngestionCheckpoint
\ No newline at end of file
@@ -0,0 +1,204 @@
+from sqlalchemy import Column, Integer, Float, String, Date, ForeignKey, DDL, event, Enum as SqlEnum
+from model import BaseModel
+from model.enums import SentimentCategory, AgeRange, Gender, EducationLevel, Country, State
+from model.campaign import Campaign
+from model.feedback import Feedback
+from model.feedback_analysis import FeedbackAnalysis
+
+# Rollup of the analyzed feedbacks over every dashboard chart dimension, maintained by triggers;
+# charts read one row per populated cell instead of scanning analyses
+class AnalyticsCube(BaseModel):
+    __tablename__ = "analytics_cube"  # Table name in the database
+
+    # Cell key: the campaign, the day the feedback was received and its categorical attributes
+    campaign_id = Column(Integer, ForeignKey("campaign.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    sentiment_category = Column(SqlEnum(SentimentCategory), primary_key=True)
+    star_rating = Column(Integer, primary_key=True)
+    gender = Column(SqlEnum(Gender), primary_key=True)
+    age_range = Column(SqlEnum(AgeRange), primary_key=True)
+    education_level = Column(SqlEnum(EducationLevel), primary_key=True)
+    country = Column(SqlEnum(Country), primary_key=True)
+    state = Column(SqlEnum(State), primary_key=True)
+    language = Column(String(5), primary_key=True)
+
+    # Number of analyzed feedbacks in the cell (cells are deleted when it drops to 0)
+    analysis_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Sums of the numeric analysis fields (average = sum / analysis_count)
+    sentiment_sum = Column(Float, nullable=False, default=0, server_default="0")
+    star_rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    word_count_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    feedback_length_sum = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # String representation of the AnalyticsCube object
+    def __repr__(self):
+        return f"<AnalyticsCube {self.campaign_id} {self.day}: {self.analysis_count} analyzed>"
+
+# Triggers adding each analysis to its cell and removing it again, in the same transaction as the
+# write; emptied cells are deleted so the table grows with the cardinality, not the row count
+FEEDBACK_ANALYSIS_CUBE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_cube_insert AFTER INSERT ON feedback_analysis
+    BEGIN
+        INSERT INTO analytics_cube (
+            campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state,
+            language, analysis_count, sentiment_sum, star_rating_sum, word_count_sum, feedback_length_sum
+        )
+        SELECT f.campaign_id, date(f.created_at), NEW.sentiment_category, NEW.star_rating, f.gender, f.age_range,
+            f.education_level, f.country, f.state, NEW.detected_language, 1, NEW.sentiment, NEW.star_rating,
+            NEW.word_count, NEW.feedback_length
+        FROM feedbacks AS f WHERE f.id = NEW.feedback_id
+        ON CONFLICT DO UPDATE SET
+            analysis_count = analysis_count + 1,
+            sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+            star_rating_sum = star_rating_sum + excluded.star_rating_sum,
+            word_count_sum = word_count_sum + excluded.word_count_sum,
+            feedback_length_sum = feedback_length_sum + excluded.feedback_length_sum;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_cube_delete AFTER DELETE ON feedback_analysis
+    BEGIN
+        UPDATE analytics_cube SET
+            analysis_count = analysis_count - 1,
+            sentiment_sum = sentiment_sum - OLD.sentiment,
+            star_rating_sum = star_rating_sum - OLD.star_rating,
+            word_count_sum = word_count_sum - OLD.word_count,
+            feedback_length_sum = feedback_length_sum - OLD.feedback_length
+        FROM feedbacks AS f
+        WHERE f.id = OLD.feedback_id AND analytics_cube.campaign_id = f.campaign_id
+            AND analytics_cube.day = date(f.created_at) AND analytics_cube.sentiment_category = OLD.sentiment_category
+            AND analytics_cube.star_rating = OLD.star_rating AND analytics_cube.gender = f.gender
+            AND analytics_cube.age_range = f.age_range AND analytics_cube.education_level = f.education_level
+            AND analytics_cube.country = f.country AND analytics_cube.state = f.state
+            AND analytics_cube.language = OLD.detected_language;
+        DELETE FROM analytics_cube WHERE analysis_count = 0 AND (
+            campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state, language
+        ) = (
+            SELECT f.campaign_id, date(f.created_at), OLD.sentiment_category, OLD.star_rating, f.gender, f.age_range,
+                f.education_level, f.country, f.state, OLD.detected_language
+            FROM feedbacks AS f WHERE f.id = OLD.feedback_id
+        );
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_cube_update
+    AFTER UPDATE OF feedback_id, detected_language, word_count, feedback_length, sentiment, sentiment_category, star_rating
+    ON feedback_analysis
+    BEGIN
+        UPDATE analytics_cube SET
+            analysis_count = analysis_count - 1,
+            sentiment_sum = sentiment_sum - OLD.sentiment,
+            star_rating_sum = star_rating_sum - OLD.star_rating,
+            word_count_sum = word_count_sum - OLD.word_count,
+            feedback_length_sum = feedback_length_sum - OLD.feedback_length
+        FROM feedbacks AS f
+        WHERE f.id = OLD.feedback_id AND analytics_cube.campaign_id = f.campaign_id
+            AND analytics_cube.day = date(f.created_at) AND analytics_cube.sentiment_category = OLD.sentiment_category
+            AND analytics_cube.star_rating = OLD.star_rating AND analytics_cube.gender = f.gender
+            AND analytics_cube.age_range = f.age_range AND analytics_cube.education_level = f.education_level
+            AND analytics_cube.country = f.country AND analytics_cube.state = f.state
+            AND analytics_cube.language = OLD.detected_language;
+        DELETE FROM analytics_cube WHERE analysis_count = 0 AND (
+            campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state, language
+        ) = (
+            SELECT f.campaign_id, date(f.created_at), OLD.sentiment_category, OLD.star_rating, f.gender, f.age_range,
+                f.education_level, f.country, f.state, OLD.detected_language
+            FROM feedbacks AS f WHERE f.id = OLD.feedback_id
+        );
+        INSERT INTO analytics_cube (
+            campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state,
+            language, analysis_count, sentiment_sum, star_rating_sum, word_count_sum, feedback_length_sum
+        )
+        SELECT f.campaign_id, date(f.created_at), NEW.sentiment_category, NEW.star_rating, f.gender, f.age_range,
+            f.education_level, f.country, f.state, NEW.detected_language, 1, NEW.sentiment, NEW.star_rating,
+            NEW.word_count, NEW.feedback_length
+        FROM feedbacks AS f WHERE f.id = NEW.feedback_id
+        ON CONFLICT DO UPDATE SET
+            analysis_count = analysis_count + 1,
+            sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+            star_rating_sum = star_rating_sum + excluded.star_rating_sum,
+            word_count_sum = word_count_sum + excluded.word_count_sum,
+            feedback_length_sum = feedback_length_sum + excluded.feedback_length_sum;
+    END""",
+]
+
+# Triggers removing the analysis of a deleted feedback from its cell (when the analysis is deleted
+# first, as the ORM cascade does, there is nothing left to remove), and moving it to another cell
+# when the feedback's campaign, date or demographics change
+FEEDBACK_CUBE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_cube_delete AFTER DELETE ON feedbacks
+    BEGIN
+        UPDATE analytics_cube SET
+            analysis_count = analysis_count - 1,
+            sentiment_sum = sentiment_sum - a.sentiment,
+            star_rating_sum = star_rating_sum - a.star_rating,
+            word_count_sum = word_count_sum - a.word_count,
+            feedback_length_sum = feedback_length_sum - a.feedback_length
+        FROM feedback_analysis AS a
+        WHERE a.feedback_id = OLD.id AND analytics_cube.campaign_id = OLD.campaign_id
+            AND analytics_cube.day = date(OLD.created_at) AND analytics_cube.sentiment_category = a.sentiment_category
+            AND analytics_cube.star_rating = a.star_rating AND analytics_cube.gender = OLD.gender
+            AND analytics_cube.age_range = OLD.age_range AND analytics_cube.education_level = OLD.education_level
+            AND analytics_cube.country = OLD.country AND analytics_cube.state = OLD.state
+            AND analytics_cube.language = a.detected_language;
+        DELETE FROM analytics_cube WHERE analysis_count = 0 AND (
+            campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state, language
+        ) = (
+            SELECT OLD.campaign_id, date(OLD.created_at), a.sentiment_category, a.star_rating, OLD.gender,
+                OLD.age_range, OLD.education_level, OLD.country, OLD.state, a.detected_language
+            FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id
+        );
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_cube_update
+    AFTER UPDATE OF campaign_id, created_at, gender, age_range, education_level, country, state ON feedbacks
+    BEGIN
+        UPDATE analytics_cube SET
+            analysis_count = analysis_count - 1,
+            sentiment_sum = sentiment_sum - a.sentiment,
+            star_rating_sum = star_rating_sum - a.star_rating,
+            word_count_sum = word_count_sum - a.word_count,
+            feedback_length_sum = feedback_length_sum - a.feedback_length
+        FROM feedback_analysis AS a
+        WHERE a.feedback_id = OLD.id AND analytics_cube.campaign_id = OLD.campaign_id
+            AND analytics_cube.day = date(OLD.created_at) AND analytics_cube.sentiment_category = a.sentiment_category
+            AND analytics_cube.star_rating = a.star_rating AND analytics_cube.gender = OLD.gender
+            AND analytics_cube.age_range = OLD.age_range AND analytics_cube.education_level = OLD.education_level
+            AND analytics_cube.country = OLD.country AND analytics_cube.state = OLD.state
+            AND analytics_cube.language = a.detected_language;
+        DELETE FROM analytics_cube WHERE analysis_count = 0 AND (
+            campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state, language
+        ) = (
+            SELECT OLD.campaign_id, date(OLD.created_at), a.sentiment_category, a.star_rating, OLD.gender,
+                OLD.age_range, OLD.education_level, OLD.country, OLD.state, a.detected_language
+            FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id
+        );
+        INSERT INTO analytics_cube (
+            campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state,
+            language, analysis_count, sentiment_sum, star_rating_sum, word_count_sum, feedback_length_sum
+        )
+        SELECT NEW.campaign_id, date(NEW.created_at), a.sentiment_category, a.star_rating, NEW.gender, NEW.age_range,
+            NEW.education_level, NEW.country, NEW.state, a.detected_language, 1, a.sentiment, a.star_rating,
+            a.word_count, a.feedback_length
+        FROM feedback_analysis AS a WHERE a.feedback_id = NEW.id
+        ON CONFLICT DO UPDATE SET
+            analysis_count = analysis_count + 1,
+            sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+            star_rating_sum = star_rating_sum + excluded.star_rating_sum,
+            word_count_sum = word_count_sum + excluded.word_count_sum,
+            feedback_length_sum = feedback_length_sum + excluded.feedback_length_sum;
+    END""",
+]
+
+# Trigger dropping the cells of a deleted campaign (foreign keys are not enforced by SQLite by default)
+CAMPAIGN_CUBE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_campaign_cube_delete AFTER DELETE ON campaign
+    BEGIN
+        DELETE FROM analytics_cube WHERE campaign_id = OLD.id;
+    END""",
+]
+
+# Each trigger is created with the table it watches
+for table, triggers in [
+    (FeedbackAnalysis.__table__, FEEDBACK_ANALYSIS_CUBE_TRIGGERS),
+    (Feedback.__table__, FEEDBACK_CUBE_TRIGGERS),
+    (Campaign.__table__, CAMPAIGN_CUBE_TRIGGERS),
+]:
+    for trigger in triggers:
+        event.listen(table, "after_create", DDL(trigger))
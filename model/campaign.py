@@ -1,11 +1,18 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, DDL, event
 from model import BaseModel
+from model.feedback import Feedback
+from model.feedback_analysis import FeedbackAnalysis
 from sqlalchemy.orm import relationship
 
 # Campaign model definition
 class Campaign(BaseModel):
     __tablename__ = "campaign"  # Table name in the database
 
+    # Index backing keyset pagination of the campaign listing, newest first
+    __table_args__ = (
+        Index("ix_campaign_created_at", "created_at"),
+    )
+
     # Primary key column with auto-increment
     id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -27,11 +34,27 @@ class Campaign(BaseModel):
     # Short code for the campaign, must be unique and cannot be null
     short_code = Column(String, nullable=False, unique=True)
 
-    # Relationship with the Feedback model, with cascading delete
+    # Number of feedbacks of the campaign, maintained by triggers on the feedbacks table
+    feedback_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # When the campaign was deleted; its feedbacks are then purged in the background before the row goes
+    deleted_at = Column(DateTime, nullable=True)
+
+    # When the campaign's feedbacks were moved to cold storage (services/campaign_archive.py); its
+    # feedback_count and campaign_stats row keep describing the archived feedbacks
+    archived_at = Column(DateTime, nullable=True)
+
+    # Incremented by triggers whenever an analysis of the campaign is written or one of its feedbacks
+    # changes; with feedback_count, it versions cached dashboard data (services/component_cache.py)
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Relationship with the Feedback model; deleting a campaign never loads its feedbacks
+    # (they are purged in chunks by services/campaign_purge.py before the campaign row is removed)
     feedbacks = relationship(
         'Feedback', 
         back_populates='campaign', 
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
     # Many-to-many relationship with the Dashboard model through the dashboard_campaign table
@@ -43,4 +66,45 @@ class Campaign(BaseModel):
 
     # String representation of the Campaign object
     def __repr__(self):
-        return f"<Campaign {self.id}: {self.name}>"
\ No newline at end of file
+        return f"<Campaign {self.id}: {self.name}>"
+
+# Triggers bumping the data version of the campaign of each analysis written, updated or deleted
+FEEDBACK_ANALYSIS_VERSION_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_version_insert AFTER INSERT ON feedback_analysis
+    BEGIN
+        UPDATE campaign SET data_version = data_version + 1
+        WHERE id = (SELECT campaign_id FROM feedbacks WHERE id = NEW.feedback_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_version_delete AFTER DELETE ON feedback_analysis
+    BEGIN
+        UPDATE campaign SET data_version = data_version + 1
+        WHERE id = (SELECT campaign_id FROM feedbacks WHERE id = OLD.feedback_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_version_update AFTER UPDATE ON feedback_analysis
+    BEGIN
+        UPDATE campaign SET data_version = data_version + 1
+        WHERE id IN (SELECT campaign_id FROM feedbacks WHERE id IN (OLD.feedback_id, NEW.feedback_id));
+    END""",
+]
+
+# Triggers bumping the data version of the campaigns of a deleted or changed feedback (inserts
+# already move feedback_count, and a delete bumps the version even if an insert restores the count)
+FEEDBACK_VERSION_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_version_delete AFTER DELETE ON feedbacks
+    BEGIN
+        UPDATE campaign SET data_version = data_version + 1 WHERE id = OLD.campaign_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_version_update
+    AFTER UPDATE OF campaign_id, created_at, message, gender, age_range, education_level, country, state ON feedbacks
+    BEGIN
+        UPDATE campaign SET data_version = data_version + 1 WHERE id IN (OLD.campaign_id, NEW.campaign_id);
+    END""",
+]
+
+# Each trigger is created with the table it watches
+for table, triggers in [
+    (FeedbackAnalysis.__table__, FEEDBACK_ANALYSIS_VERSION_TRIGGERS),
+    (Feedback.__table__, FEEDBACK_VERSION_TRIGGERS),
+]:
+    for trigger in triggers:
+        event.listen(table, "after_create", DDL(trigger))
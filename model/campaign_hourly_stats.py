@@ -0,0 +1,167 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DDL, event
+from sqlalchemy.dialects.sqlite import DATETIME
+from model import BaseModel
+from model.campaign import Campaign
+from model.feedback import Feedback
+from model.feedback_analysis import FeedbackAnalysis
+
+# Hourly analysis statistics of a campaign, maintained by triggers; trend charts re-bucket them to
+# any granularity and timezone instead of grouping the analyses
+class CampaignHourlyStats(BaseModel):
+    __tablename__ = "campaign_hourly_stats"  # Table name in the database
+
+    # The campaign and the UTC hour the analyzed feedbacks were received in, stored without microseconds
+    # like the triggers write it, so range filters compare as text along the primary key
+    campaign_id = Column(Integer, ForeignKey("campaign.id", ondelete="CASCADE"), primary_key=True)
+    hour = Column(
+        DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+        primary_key=True,
+    )
+
+    # Number of analyzed feedbacks received in the hour (rows are deleted when it drops to 0)
+    analysis_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Sum of the sentiment scores (average = sentiment_sum / analysis_count)
+    sentiment_sum = Column(Float, nullable=False, default=0, server_default="0")
+
+    # Number of analyses per sentiment category
+    positive_count = Column(Integer, nullable=False, default=0, server_default="0")
+    neutral_count = Column(Integer, nullable=False, default=0, server_default="0")
+    negative_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # String representation of the CampaignHourlyStats object
+    def __repr__(self):
+        return f"<CampaignHourlyStats {self.campaign_id} {self.hour}: {self.analysis_count} analyzed>"
+
+# Triggers adding each analysis to the hour of its feedback and removing it again, in the same
+# transaction as the write (sentiment categories are stored by enum name; DDL() formats the statements,
+# hence the doubled % of the strftime patterns)
+FEEDBACK_ANALYSIS_HOURLY_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_hourly_insert AFTER INSERT ON feedback_analysis
+    BEGIN
+        INSERT INTO campaign_hourly_stats (
+            campaign_id, hour, analysis_count, sentiment_sum, positive_count, neutral_count, negative_count
+        )
+        SELECT f.campaign_id, strftime('%%Y-%%m-%%d %%H:00:00', f.created_at), 1, NEW.sentiment,
+            NEW.sentiment_category = 'POSITIVE', NEW.sentiment_category = 'NEUTRAL', NEW.sentiment_category = 'NEGATIVE'
+        FROM feedbacks AS f WHERE f.id = NEW.feedback_id
+        ON CONFLICT DO UPDATE SET
+            analysis_count = analysis_count + 1,
+            sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+            positive_count = positive_count + excluded.positive_count,
+            neutral_count = neutral_count + excluded.neutral_count,
+            negative_count = negative_count + excluded.negative_count;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_hourly_delete AFTER DELETE ON feedback_analysis
+    BEGIN
+        UPDATE campaign_hourly_stats SET
+            analysis_count = analysis_count - 1,
+            sentiment_sum = sentiment_sum - OLD.sentiment,
+            positive_count = positive_count - (OLD.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count - (OLD.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count - (OLD.sentiment_category = 'NEGATIVE')
+        FROM feedbacks AS f
+        WHERE f.id = OLD.feedback_id AND campaign_hourly_stats.campaign_id = f.campaign_id
+            AND campaign_hourly_stats.hour = strftime('%%Y-%%m-%%d %%H:00:00', f.created_at);
+        DELETE FROM campaign_hourly_stats WHERE analysis_count = 0 AND (campaign_id, hour) = (
+            SELECT f.campaign_id, strftime('%%Y-%%m-%%d %%H:00:00', f.created_at)
+            FROM feedbacks AS f WHERE f.id = OLD.feedback_id
+        );
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_hourly_update
+    AFTER UPDATE OF feedback_id, sentiment, sentiment_category ON feedback_analysis
+    BEGIN
+        UPDATE campaign_hourly_stats SET
+            analysis_count = analysis_count - 1,
+            sentiment_sum = sentiment_sum - OLD.sentiment,
+            positive_count = positive_count - (OLD.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count - (OLD.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count - (OLD.sentiment_category = 'NEGATIVE')
+        FROM feedbacks AS f
+        WHERE f.id = OLD.feedback_id AND campaign_hourly_stats.campaign_id = f.campaign_id
+            AND campaign_hourly_stats.hour = strftime('%%Y-%%m-%%d %%H:00:00', f.created_at);
+        DELETE FROM campaign_hourly_stats WHERE analysis_count = 0 AND (campaign_id, hour) = (
+            SELECT f.campaign_id, strftime('%%Y-%%m-%%d %%H:00:00', f.created_at)
+            FROM feedbacks AS f WHERE f.id = OLD.feedback_id
+        );
+        INSERT INTO campaign_hourly_stats (
+            campaign_id, hour, analysis_count, sentiment_sum, positive_count, neutral_count, negative_count
+        )
+        SELECT f.campaign_id, strftime('%%Y-%%m-%%d %%H:00:00', f.created_at), 1, NEW.sentiment,
+            NEW.sentiment_category = 'POSITIVE', NEW.sentiment_category = 'NEUTRAL', NEW.sentiment_category = 'NEGATIVE'
+        FROM feedbacks AS f WHERE f.id = NEW.feedback_id
+        ON CONFLICT DO UPDATE SET
+            analysis_count = analysis_count + 1,
+            sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+            positive_count = positive_count + excluded.positive_count,
+            neutral_count = neutral_count + excluded.neutral_count,
+            negative_count = negative_count + excluded.negative_count;
+    END""",
+]
+
+# Triggers removing the analysis of a deleted feedback from its hour (when the analysis is deleted
+# first, as the ORM cascade does, there is nothing left to remove), and moving it when the feedback
+# changes campaign or date
+FEEDBACK_HOURLY_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_hourly_delete AFTER DELETE ON feedbacks
+    BEGIN
+        UPDATE campaign_hourly_stats SET
+            analysis_count = analysis_count - 1,
+            sentiment_sum = sentiment_sum - a.sentiment,
+            positive_count = positive_count - (a.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count - (a.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count - (a.sentiment_category = 'NEGATIVE')
+        FROM feedback_analysis AS a
+        WHERE a.feedback_id = OLD.id AND campaign_hourly_stats.campaign_id = OLD.campaign_id
+            AND campaign_hourly_stats.hour = strftime('%%Y-%%m-%%d %%H:00:00', OLD.created_at);
+        DELETE FROM campaign_hourly_stats WHERE analysis_count = 0 AND (campaign_id, hour) = (
+            SELECT OLD.campaign_id, strftime('%%Y-%%m-%%d %%H:00:00', OLD.created_at)
+            FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id
+        );
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_hourly_update AFTER UPDATE OF campaign_id, created_at ON feedbacks
+    BEGIN
+        UPDATE campaign_hourly_stats SET
+            analysis_count = analysis_count - 1,
+            sentiment_sum = sentiment_sum - a.sentiment,
+            positive_count = positive_count - (a.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count - (a.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count - (a.sentiment_category = 'NEGATIVE')
+        FROM feedback_analysis AS a
+        WHERE a.feedback_id = OLD.id AND campaign_hourly_stats.campaign_id = OLD.campaign_id
+            AND campaign_hourly_stats.hour = strftime('%%Y-%%m-%%d %%H:00:00', OLD.created_at);
+        DELETE FROM campaign_hourly_stats WHERE analysis_count = 0 AND (campaign_id, hour) = (
+            SELECT OLD.campaign_id, strftime('%%Y-%%m-%%d %%H:00:00', OLD.created_at)
+            FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id
+        );
+        INSERT INTO campaign_hourly_stats (
+            campaign_id, hour, analysis_count, sentiment_sum, positive_count, neutral_count, negative_count
+        )
+        SELECT NEW.campaign_id, strftime('%%Y-%%m-%%d %%H:00:00', NEW.created_at), 1, a.sentiment,
+            a.sentiment_category = 'POSITIVE', a.sentiment_category = 'NEUTRAL', a.sentiment_category = 'NEGATIVE'
+        FROM feedback_analysis AS a WHERE a.feedback_id = NEW.id
+        ON CONFLICT DO UPDATE SET
+            analysis_count = analysis_count + 1,
+            sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+            positive_count = positive_count + excluded.positive_count,
+            neutral_count = neutral_count + excluded.neutral_count,
+            negative_count = negative_count + excluded.negative_count;
+    END""",
+]
+
+# Trigger dropping the hourly statistics of a deleted campaign (foreign keys are not enforced by SQLite by default)
+CAMPAIGN_HOURLY_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_campaign_hourly_delete AFTER DELETE ON campaign
+    BEGIN
+        DELETE FROM campaign_hourly_stats WHERE campaign_id = OLD.id;
+    END""",
+]
+
+# Each trigger is created with the table it watches
+for table, triggers in [
+    (FeedbackAnalysis.__table__, FEEDBACK_ANALYSIS_HOURLY_TRIGGERS),
+    (Feedback.__table__, FEEDBACK_HOURLY_TRIGGERS),
+    (Campaign.__table__, CAMPAIGN_HOURLY_TRIGGERS),
+]:
+    for trigger in triggers:
+        event.listen(table, "after_create", DDL(trigger))
@@ -0,0 +1,177 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DDL, event
+from model import BaseModel
+from model.campaign import Campaign
+from model.feedback import Feedback
+from model.feedback_analysis import FeedbackAnalysis
+
+# Analysis statistics of a campaign, maintained by triggers as analyses are written and feedbacks deleted
+class CampaignStats(BaseModel):
+    __tablename__ = "campaign_stats"  # Table name in the database
+
+    # The campaign these statistics belong to (one row per campaign with at least one analysis written)
+    campaign_id = Column(Integer, ForeignKey("campaign.id", ondelete="CASCADE"), primary_key=True)
+
+    # Number of analyzed feedbacks
+    analyzed_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Sum of the sentiment scores (average = sentiment_sum / analyzed_count)
+    sentiment_sum = Column(Float, nullable=False, default=0, server_default="0")
+
+    # Sum of the star ratings (average = star_rating_sum / analyzed_count)
+    star_rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Number of analyses per sentiment category
+    positive_count = Column(Integer, nullable=False, default=0, server_default="0")
+    neutral_count = Column(Integer, nullable=False, default=0, server_default="0")
+    negative_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Star rating histogram: number of analyses rated 1 to 5 stars
+    star_1_count = Column(Integer, nullable=False, default=0, server_default="0")
+    star_2_count = Column(Integer, nullable=False, default=0, server_default="0")
+    star_3_count = Column(Integer, nullable=False, default=0, server_default="0")
+    star_4_count = Column(Integer, nullable=False, default=0, server_default="0")
+    star_5_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # String representation of the CampaignStats object
+    def __repr__(self):
+        return f"<CampaignStats {self.campaign_id}: {self.analyzed_count} analyzed>"
+
+# Triggers applying each analysis insert, update or delete to its campaign's statistics, in the
+# same transaction as the write (sentiment categories are stored by enum name)
+FEEDBACK_ANALYSIS_STATS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_stats_insert AFTER INSERT ON feedback_analysis
+    BEGIN
+        INSERT OR IGNORE INTO campaign_stats (campaign_id) SELECT campaign_id FROM feedbacks WHERE id = NEW.feedback_id;
+        UPDATE campaign_stats SET
+            analyzed_count = analyzed_count + 1,
+            sentiment_sum = sentiment_sum + NEW.sentiment,
+            star_rating_sum = star_rating_sum + NEW.star_rating,
+            positive_count = positive_count + (NEW.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count + (NEW.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count + (NEW.sentiment_category = 'NEGATIVE'),
+            star_1_count = star_1_count + (NEW.star_rating = 1),
+            star_2_count = star_2_count + (NEW.star_rating = 2),
+            star_3_count = star_3_count + (NEW.star_rating = 3),
+            star_4_count = star_4_count + (NEW.star_rating = 4),
+            star_5_count = star_5_count + (NEW.star_rating = 5)
+        FROM feedbacks AS f WHERE f.id = NEW.feedback_id AND campaign_stats.campaign_id = f.campaign_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_stats_delete AFTER DELETE ON feedback_analysis
+    BEGIN
+        UPDATE campaign_stats SET
+            analyzed_count = analyzed_count - 1,
+            sentiment_sum = sentiment_sum - OLD.sentiment,
+            star_rating_sum = star_rating_sum - OLD.star_rating,
+            positive_count = positive_count - (OLD.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count - (OLD.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count - (OLD.sentiment_category = 'NEGATIVE'),
+            star_1_count = star_1_count - (OLD.star_rating = 1),
+            star_2_count = star_2_count - (OLD.star_rating = 2),
+            star_3_count = star_3_count - (OLD.star_rating = 3),
+            star_4_count = star_4_count - (OLD.star_rating = 4),
+            star_5_count = star_5_count - (OLD.star_rating = 5)
+        FROM feedbacks AS f WHERE f.id = OLD.feedback_id AND campaign_stats.campaign_id = f.campaign_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedback_analysis_stats_update
+    AFTER UPDATE OF feedback_id, sentiment, sentiment_category, star_rating ON feedback_analysis
+    BEGIN
+        UPDATE campaign_stats SET
+            analyzed_count = analyzed_count - 1,
+            sentiment_sum = sentiment_sum - OLD.sentiment,
+            star_rating_sum = star_rating_sum - OLD.star_rating,
+            positive_count = positive_count - (OLD.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count - (OLD.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count - (OLD.sentiment_category = 'NEGATIVE'),
+            star_1_count = star_1_count - (OLD.star_rating = 1),
+            star_2_count = star_2_count - (OLD.star_rating = 2),
+            star_3_count = star_3_count - (OLD.star_rating = 3),
+            star_4_count = star_4_count - (OLD.star_rating = 4),
+            star_5_count = star_5_count - (OLD.star_rating = 5)
+        FROM feedbacks AS f WHERE f.id = OLD.feedback_id AND campaign_stats.campaign_id = f.campaign_id;
+        INSERT OR IGNORE INTO campaign_stats (campaign_id) SELECT campaign_id FROM feedbacks WHERE id = NEW.feedback_id;
+        UPDATE campaign_stats SET
+            analyzed_count = analyzed_count + 1,
+            sentiment_sum = sentiment_sum + NEW.sentiment,
+            star_rating_sum = star_rating_sum + NEW.star_rating,
+            positive_count = positive_count + (NEW.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count + (NEW.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count + (NEW.sentiment_category = 'NEGATIVE'),
+            star_1_count = star_1_count + (NEW.star_rating = 1),
+            star_2_count = star_2_count + (NEW.star_rating = 2),
+            star_3_count = star_3_count + (NEW.star_rating = 3),
+            star_4_count = star_4_count + (NEW.star_rating = 4),
+            star_5_count = star_5_count + (NEW.star_rating = 5)
+        FROM feedbacks AS f WHERE f.id = NEW.feedback_id AND campaign_stats.campaign_id = f.campaign_id;
+    END""",
+]
+
+# Triggers removing the analysis of a deleted feedback from its campaign's statistics (when the
+# analysis is deleted first, as the ORM cascade does, there is nothing left to remove), and moving
+# it along when a feedback changes campaign
+FEEDBACK_STATS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_stats_delete AFTER DELETE ON feedbacks
+    BEGIN
+        UPDATE campaign_stats SET
+            analyzed_count = analyzed_count - 1,
+            sentiment_sum = sentiment_sum - a.sentiment,
+            star_rating_sum = star_rating_sum - a.star_rating,
+            positive_count = positive_count - (a.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count - (a.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count - (a.sentiment_category = 'NEGATIVE'),
+            star_1_count = star_1_count - (a.star_rating = 1),
+            star_2_count = star_2_count - (a.star_rating = 2),
+            star_3_count = star_3_count - (a.star_rating = 3),
+            star_4_count = star_4_count - (a.star_rating = 4),
+            star_5_count = star_5_count - (a.star_rating = 5)
+        FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id AND campaign_stats.campaign_id = OLD.campaign_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_stats_update AFTER UPDATE OF campaign_id ON feedbacks
+    WHEN OLD.campaign_id != NEW.campaign_id
+    BEGIN
+        UPDATE campaign_stats SET
+            analyzed_count = analyzed_count - 1,
+            sentiment_sum = sentiment_sum - a.sentiment,
+            star_rating_sum = star_rating_sum - a.star_rating,
+            positive_count = positive_count - (a.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count - (a.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count - (a.sentiment_category = 'NEGATIVE'),
+            star_1_count = star_1_count - (a.star_rating = 1),
+            star_2_count = star_2_count - (a.star_rating = 2),
+            star_3_count = star_3_count - (a.star_rating = 3),
+            star_4_count = star_4_count - (a.star_rating = 4),
+            star_5_count = star_5_count - (a.star_rating = 5)
+        FROM feedback_analysis AS a WHERE a.feedback_id = OLD.id AND campaign_stats.campaign_id = OLD.campaign_id;
+        INSERT OR IGNORE INTO campaign_stats (campaign_id)
+            SELECT NEW.campaign_id WHERE EXISTS (SELECT 1 FROM feedback_analysis WHERE feedback_id = NEW.id);
+        UPDATE campaign_stats SET
+            analyzed_count = analyzed_count + 1,
+            sentiment_sum = sentiment_sum + a.sentiment,
+            star_rating_sum = star_rating_sum + a.star_rating,
+            positive_count = positive_count + (a.sentiment_category = 'POSITIVE'),
+            neutral_count = neutral_count + (a.sentiment_category = 'NEUTRAL'),
+            negative_count = negative_count + (a.sentiment_category = 'NEGATIVE'),
+            star_1_count = star_1_count + (a.star_rating = 1),
+            star_2_count = star_2_count + (a.star_rating = 2),
+            star_3_count = star_3_count + (a.star_rating = 3),
+            star_4_count = star_4_count + (a.star_rating = 4),
+            star_5_count = star_5_count + (a.star_rating = 5)
+        FROM feedback_analysis AS a WHERE a.feedback_id = NEW.id AND campaign_stats.campaign_id = NEW.campaign_id;
+    END""",
+]
+
+# Trigger dropping the statistics of a deleted campaign (foreign keys are not enforced by SQLite by default)
+CAMPAIGN_STATS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_campaign_stats_delete AFTER DELETE ON campaign
+    BEGIN
+        DELETE FROM campaign_stats WHERE campaign_id = OLD.id;
+    END""",
+]
+
+# Each trigger is created with the table it watches
+for table, triggers in [
+    (FeedbackAnalysis.__table__, FEEDBACK_ANALYSIS_STATS_TRIGGERS),
+    (Feedback.__table__, FEEDBACK_STATS_TRIGGERS),
+    (Campaign.__table__, CAMPAIGN_STATS_TRIGGERS),
+]:
+    for trigger in triggers:
+        event.listen(table, "after_create", DDL(trigger))
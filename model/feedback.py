@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum as SqlEnum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index, DDL, event, text, Enum as SqlEnum
 from model import BaseModel
 from model.enums import AgeRange, Gender, EducationLevel, Country, State
 from sqlalchemy.orm import relationship
@@ -7,6 +7,23 @@ from sqlalchemy.orm import relationship
 class Feedback(BaseModel):
     __tablename__ = "feedbacks"  # Table name in the database
 
+    # Composite indexes matched to the hot queries (managed by config/migrations.py on existing databases)
+    __table_args__ = (
+        # Duplicate-answer check for campaigns that allow a single answer per user
+        Index("ix_feedbacks_campaign_user_ip", "campaign_id", "user_ip"),
+        # Trend analysis over a campaign's timeline
+        Index("ix_feedbacks_campaign_created_at", "campaign_id", "created_at"),
+        # Paginated listing of a campaign's feedbacks
+        Index("ix_feedbacks_campaign_id_id", "campaign_id", "id"),
+        # Keyset pagination over all feedbacks, newest first
+        Index("ix_feedbacks_created_at", "created_at"),
+        # One answer per IP for feedbacks submitted to single-answer campaigns
+        Index(
+            "ux_feedbacks_single_answer_ip", "campaign_id", "user_ip",
+            unique=True, sqlite_where=text("single_answer = 1"),
+        ),
+    )
+
     # Primary key column
     id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -36,6 +53,9 @@ class Feedback(BaseModel):
     
     # Column to store the user's agent information (optional)
     user_agent = Column(String(255), nullable=True)
+
+    # Whether the feedback was submitted to a campaign that allows a single answer per user
+    single_answer = Column(Boolean, nullable=False, default=False, server_default="0")
     
     # One-to-one relationship with FeedbackAnalysis
     analysis = relationship(
@@ -53,4 +73,39 @@ class Feedback(BaseModel):
 
     # String representation of the Feedback object
     def __repr__(self):
-        return f"<Feedback {self.id}: {self.message}>"
\ No newline at end of file
+        return f"<Feedback {self.id}: {self.message}>"
+
+# Triggers keeping campaign.feedback_count in sync within the same transaction as every
+# insert, delete or campaign change of a feedback (ORM, bulk and raw SQL writes alike)
+FEEDBACK_COUNT_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_count_insert AFTER INSERT ON feedbacks
+    BEGIN
+        UPDATE campaign SET feedback_count = feedback_count + 1 WHERE id = NEW.campaign_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_count_delete AFTER DELETE ON feedbacks
+    BEGIN
+        UPDATE campaign SET feedback_count = feedback_count - 1 WHERE id = OLD.campaign_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_count_update AFTER UPDATE OF campaign_id ON feedbacks
+    WHEN OLD.campaign_id != NEW.campaign_id
+    BEGIN
+        UPDATE campaign SET feedback_count = feedback_count - 1 WHERE id = OLD.campaign_id;
+        UPDATE campaign SET feedback_count = feedback_count + 1 WHERE id = NEW.campaign_id;
+    END""",
+]
+
+# Trigger rejecting inserts over a campaign's max_answers; it runs inside the inserting
+# statement, so concurrent submissions cannot overshoot the limit
+FEEDBACK_CONSTRAINT_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_max_answers BEFORE INSERT ON feedbacks
+    WHEN EXISTS (
+        SELECT 1 FROM campaign
+        WHERE id = NEW.campaign_id AND max_answers > 0 AND feedback_count >= max_answers
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'Campaign has reached the maximum number of answers');
+    END""",
+]
+
+for trigger in FEEDBACK_COUNT_TRIGGERS + FEEDBACK_CONSTRAINT_TRIGGERS:
+    event.listen(Feedback.__table__, "after_create", DDL(trigger))
\ No newline at end of file
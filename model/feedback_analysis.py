@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, String, Enum as SqlEnum
+from sqlalchemy import Column, Integer, Float, ForeignKey, String, Index, Enum as SqlEnum
 from sqlalchemy.orm import relationship
 from model.base import BaseModel
 from model.enums import SentimentCategory
@@ -6,6 +6,13 @@ from model.enums import SentimentCategory
 class FeedbackAnalysis(BaseModel):
     __tablename__ = "feedback_analysis"
 
+    # Indexes used by sentiment filters, breakdowns and sorted feedback listings
+    __table_args__ = (
+        Index("ix_feedback_analysis_sentiment_category", "sentiment_category"),
+        Index("ix_feedback_analysis_sentiment", "sentiment", "feedback_id"),
+        Index("ix_feedback_analysis_star_rating", "star_rating", "feedback_id"),
+    )
+
     # Primary key for the feedback analysis table
     id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Float, MetaData, Table, DDL, event
+from model.feedback import Feedback
+
+# Full-text index over feedback messages: an SQLite FTS5 table using `feedbacks` as its
+# external content, so messages are not stored twice. It is declared on its own metadata
+# because create_all cannot create virtual tables; the DDL below manages it instead.
+feedbacks_fts = Table(
+    "feedbacks_fts",
+    MetaData(),
+    Column("rowid", Integer),  # The feedback id
+    Column("message", String),
+    Column("rank", Float),  # FTS5 relevance (bm25, lower is better)
+)
+
+# Statements creating the index and the triggers keeping it in sync with feedback writes
+FEEDBACK_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS feedbacks_fts USING fts5(
+        message, content='feedbacks', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_fts_insert AFTER INSERT ON feedbacks
+    BEGIN
+        INSERT INTO feedbacks_fts (rowid, message) VALUES (NEW.id, NEW.message);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_fts_delete AFTER DELETE ON feedbacks
+    BEGIN
+        INSERT INTO feedbacks_fts (feedbacks_fts, rowid, message) VALUES ('delete', OLD.id, OLD.message);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_feedbacks_fts_update AFTER UPDATE OF message ON feedbacks
+    BEGIN
+        INSERT INTO feedbacks_fts (feedbacks_fts, rowid, message) VALUES ('delete', OLD.id, OLD.message);
+        INSERT INTO feedbacks_fts (rowid, message) VALUES (NEW.id, NEW.message);
+    END""",
+]
+
+for statement in FEEDBACK_SEARCH_DDL:
+    event.listen(Feedback.__table__, "after_create", DDL(statement))
+event.listen(Feedback.__table__, "before_drop", DDL("DROP TABLE IF EXISTS feedbacks_fts"))
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+from model import BaseModel
+
+# Progress of a write-behind ingestion log: the last log sequence written to the database
+class IngestionCheckpoint(BaseModel):
+    __tablename__ = "ingestion_checkpoint"  # Table name in the database
+
+    # Name of the ingestion log (its file path)
+    name = Column(String(255), primary_key=True)
+
+    # Sequence of the last log entry committed to the database, in the same transaction as its feedback
+    sequence = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, DDL, event
+from model import BaseModel
+from model.campaign import Campaign
+
+# Word counts of the analyzed feedbacks per campaign and day, maintained as analyses are written
+# and deleted (services/word_frequency.py); they feed the word_cloud component
+class WordFrequency(BaseModel):
+    __tablename__ = "word_frequency"  # Table name in the database
+
+    # Key ordered so a campaign's counts are read grouped by word straight from the primary key
+    campaign_id = Column(Integer, ForeignKey("campaign.id", ondelete="CASCADE"), primary_key=True)
+    word = Column(String(64), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    # Occurrences of the word in the campaign's analyzed feedbacks of that day
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # String representation of the WordFrequency object
+    def __repr__(self):
+        return f"<WordFrequency {self.campaign_id} {self.word} {self.day}: {self.count}>"
+
+# Trigger dropping the word counts of a deleted campaign (foreign keys are not enforced by SQLite by default)
+CAMPAIGN_WORD_FREQUENCY_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_campaign_word_frequency_delete AFTER DELETE ON campaign
+    BEGIN
+        DELETE FROM word_frequency WHERE campaign_id = OLD.id;
+    END""",
+]
+
+for trigger in CAMPAIGN_WORD_FREQUENCY_TRIGGERS:
+    event.listen(Campaign.__table__, "after_create", DDL(trigger))
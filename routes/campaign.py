@@ -1,16 +1,28 @@
+import uuid
 from flask_openapi3 import APIBlueprint, Tag
 from flask import jsonify
-from config import SessionLocal
-from model import Campaign, Feedback
+from config import SessionLocal, session_for
+from model import Campaign
 from schemas import (
     CampaignResponse,
     CampaignIDParam,
-    PaginationSchema,
+    CampaignListSchema,
+    CampaignWithStatsResponse,
     ListResponseSchema,
     CampaignCreate,
     CampaignShortCodeParam,
+    CampaignCacheStatsResponse,
+    CampaignDeletionResponse,
 )
-from utils import generate_short_code
+from services import (
+    sync_single_answer_flags,
+    campaign_cache,
+    campaign_purger,
+    CAMPAIGN_SORT_KEYS,
+    build_campaign_listing_query,
+    count_campaigns,
+)
+from utils import generate_short_code, paginate
 
 # Create a new Tag for grouping campaign-related operations in the API documentation
 campaign_tag = Tag(name="Campaign", description="Operations related to campaigns.")
@@ -18,6 +30,9 @@ campaign_tag = Tag(name="Campaign", description="Operations related to campaigns
 # Create a new API Blueprint for campaign routes
 campaign_bp = APIBlueprint("campaign", __name__)
 
+# Session factory for read-only endpoints (routed to the read engine when configured for this blueprint)
+ReadSession = session_for(campaign_bp.name)
+
 
 # Endpoint to create a new campaign
 @campaign_bp.post(
@@ -29,18 +44,19 @@ def create_campaign(body: CampaignCreate):
     """
     Create a new campaign.
     """
-    short_code = generate_short_code()  # Generate a unique short code for the campaign
     with SessionLocal() as db:
-        # Create a new campaign instance
+        # Create a new campaign instance, with a unique placeholder until its ID is known
         new_campaign = Campaign(
             name=body.name,
             description=body.description,
             active=body.active,
             multiple_answers_from_user=body.multiple_answers_from_user,
             max_answers=body.max_answers,
-            short_code=short_code,
+            short_code=uuid.uuid4().hex,
         )
         db.add(new_campaign)  # Add the campaign to the database session
+        db.flush()  # Assign the campaign ID
+        new_campaign.short_code = generate_short_code(new_campaign.id)  # Derive the short code from the ID (collision-free)
         db.commit()  # Commit the transaction to save the campaign
         db.refresh(new_campaign)  # Refresh the instance to get the updated data
         return CampaignResponse.model_validate(new_campaign).model_dump(), 201
@@ -49,26 +65,40 @@ def create_campaign(body: CampaignCreate):
 # Endpoint to list all campaigns with pagination
 @campaign_bp.get(
     "/campaigns",
-    responses={200: ListResponseSchema[CampaignResponse]},
+    responses={200: ListResponseSchema[CampaignWithStatsResponse]},
     tags=[campaign_tag],
 )
-def get_campaigns(query: PaginationSchema):
+def get_campaigns(query: CampaignListSchema):
     """
-    List all campaigns with pagination.
+    List campaigns with their feedback and sentiment statistics, newest first by default.
+    Each item carries feedback_count, analyzed_count, average_sentiment and the positive,
+    neutral and negative counts, computed for the whole page in a single query. Supports
+    offset or cursor pagination, an exact or omitted total, and sorting by any of these fields.
     """
-    with SessionLocal() as db:
-        # Query campaigns with pagination
-        campaigns = db.query(Campaign).offset(query.offset).limit(query.limit).all()
-        items = []
-        for campaign in campaigns:
-            # Count the number of feedback entries associated with the campaign
-            feedback_count = db.query(Feedback).filter(Feedback.campaign_id == campaign.id).count()
-            # Add feedback count to the campaign data
-            campaign_data = CampaignResponse.model_validate(
-                {**campaign.__dict__, "feedback_count": feedback_count}
-            ).model_dump()
-            items.append(campaign_data)
-        return jsonify({"items": items, "total": len(items)})
+    with ReadSession() as db:
+        total = count_campaigns(db, query.sort) if query.total == "exact" else None
+        try:
+            rows, next_cursor = paginate(
+                build_campaign_listing_query(db, query.sort), CAMPAIGN_SORT_KEYS[query.sort],
+                query.cursor, query.offset, query.limit, descending=query.order == "desc"
+            )
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        # Each row holds the campaign followed by its statistics
+        items = [
+            CampaignWithStatsResponse(
+                **CampaignResponse.model_validate(campaign).model_dump(),
+                analyzed_count=analyzed_count,
+                average_sentiment=average_sentiment,
+                positive_count=positive_count,
+                neutral_count=neutral_count,
+                negative_count=negative_count,
+            )
+            for campaign, analyzed_count, average_sentiment, positive_count, neutral_count, negative_count in rows
+        ]
+        response = ListResponseSchema(total=total, items=items, next_cursor=next_cursor)
+        return jsonify(response.model_dump()), 200
 
 
 # Endpoint to retrieve a campaign by its ID
@@ -80,16 +110,13 @@ def get_campaigns(query: PaginationSchema):
 def get_campaign(path: CampaignIDParam):
     """
     Retrieve a campaign by its ID.
+    The campaign may come from the in-process cache (its feedback_count can lag by up to CAMPAIGN_CACHE_TTL seconds).
     """
-    with SessionLocal() as db:
-        # Query the campaign by its ID
-        campaign = db.query(Campaign).filter(Campaign.id == path.campaign_id).first()
+    with ReadSession() as db:
+        # Served from the campaign cache; the database is only read on a miss
+        campaign = campaign_cache.get(db, path.campaign_id)
         if campaign:
-            # Count the number of feedback entries associated with the campaign
-            feedback_count = db.query(Feedback).filter(Feedback.campaign_id == campaign.id).count()
-            # Add feedback count to the campaign data
-            campaign = {**campaign.__dict__, "feedback_count": feedback_count}
-            return jsonify(CampaignResponse.model_validate(campaign).model_dump()), 200
+            return jsonify(campaign.model_dump()), 200
         return jsonify({"message": "Campaign not found"}), 404
 
 
@@ -102,23 +129,24 @@ def get_campaign(path: CampaignIDParam):
 def get_campaign_by_short_code(path: CampaignShortCodeParam):
     """
     Retrieve a campaign by its short code.
+    The campaign may come from the in-process cache (its feedback_count can lag by up to CAMPAIGN_CACHE_TTL seconds).
     """
-    with SessionLocal() as db:
-        # Query the campaign by its short code
-        campaign = db.query(Campaign).filter(Campaign.short_code == path.short_code).first()
+    with ReadSession() as db:
+        # Served from the campaign cache; the database is only read on a miss
+        campaign = campaign_cache.get_by_short_code(db, path.short_code)
         if campaign:
-            # Count the number of feedback entries associated with the campaign
-            feedback_count = db.query(Feedback).filter(Feedback.campaign_id == campaign.id).count()
-            # Add feedback count to the campaign data
-            campaign = {**campaign.__dict__, "feedback_count": feedback_count}
-            return jsonify(CampaignResponse.model_validate(campaign).model_dump()), 200
+            return jsonify(campaign.model_dump()), 200
         return jsonify({"message": "Campaign not found"}), 404
 
 
 # Endpoint to update a campaign by its ID
 @campaign_bp.put(
     "/campaign/<int:campaign_id>",
-    responses={200: CampaignResponse, 404: {"message": "Campaign not found"}},
+    responses={
+        200: CampaignResponse,
+        400: {"message": "Campaign is archived; restore it before reopening it"},
+        404: {"message": "Campaign not found"},
+    },
     tags=[campaign_tag],
 )
 def update_campaign(path: CampaignIDParam, body: CampaignCreate):
@@ -127,8 +155,16 @@ def update_campaign(path: CampaignIDParam, body: CampaignCreate):
     """
     with SessionLocal() as db:
         # Query the campaign by its ID
-        campaign = db.query(Campaign).filter(Campaign.id == path.campaign_id).first()
+        campaign = db.query(Campaign).filter(Campaign.id == path.campaign_id, Campaign.deleted_at.is_(None)).first()
         if campaign:
+            # Archived feedbacks are not in the live tables, where the campaign rules are enforced
+            if campaign.archived_at is not None and body.active:
+                return jsonify({"message": "Campaign is archived; restore it before reopening it"}), 400
+
+            # Keep the single-answer flag of stored feedbacks in line with the campaign rule
+            if bool(campaign.multiple_answers_from_user) != body.multiple_answers_from_user:
+                sync_single_answer_flags(db, campaign.id, not body.multiple_answers_from_user)
+
             # Update the campaign fields with the new data
             campaign.name = body.name
             campaign.description = body.description
@@ -136,6 +172,7 @@ def update_campaign(path: CampaignIDParam, body: CampaignCreate):
             campaign.multiple_answers_from_user = body.multiple_answers_from_user
             campaign.max_answers = body.max_answers
             db.commit()  # Commit the transaction to save the changes
+            campaign_cache.invalidate(campaign.id, campaign.short_code)  # Drop the cached copy here and in other processes
             db.refresh(campaign)  # Refresh the instance to get the updated data
             return CampaignResponse.model_validate(campaign).model_dump(), 200
         return jsonify({"message": "Campaign not found"}), 404
@@ -150,12 +187,44 @@ def update_campaign(path: CampaignIDParam, body: CampaignCreate):
 def delete_campaign(path: CampaignIDParam):
     """
     Delete a campaign by its ID.
+    The campaign disappears immediately; its feedbacks and analyses are deleted in the
+    background, in chunks, and the progress is reported by GET /campaign/<id>/deletion.
     """
     with SessionLocal() as db:
         # Query the campaign by its ID
-        campaign = db.query(Campaign).filter(Campaign.id == path.campaign_id).first()
+        campaign = db.query(Campaign).filter(Campaign.id == path.campaign_id, Campaign.deleted_at.is_(None)).first()
         if campaign:
-            db.delete(campaign)  # Delete the campaign from the database
-            db.commit()  # Commit the transaction to save the changes
+            campaign_purger.mark_deleted(db, campaign)  # Hide the campaign now; its feedbacks are purged in the background
+            campaign_cache.invalidate(campaign.id, campaign.short_code)  # Drop the cached copy here and in other processes
             return jsonify({"message": "Campaign deleted"}), 200
         return jsonify({"message": "Campaign not found"}), 404
+
+
+# Endpoint to follow the background deletion of a campaign
+@campaign_bp.get(
+    "/campaign/<int:campaign_id>/deletion",
+    responses={200: CampaignDeletionResponse, 404: {"message": "Campaign deletion not found"}},
+    tags=[campaign_tag],
+)
+def get_campaign_deletion(path: CampaignIDParam):
+    """
+    Retrieve the progress of a campaign deletion: its status and the number of feedbacks deleted so far.
+    A deleted campaign this process has no job for yet (e.g. after a restart) is reported as pending.
+    """
+    progress = campaign_purger.progress(path.campaign_id)
+    if progress:
+        return jsonify(CampaignDeletionResponse(**progress).model_dump()), 200
+    return jsonify({"message": "Campaign deletion not found"}), 404
+
+
+# Endpoint to retrieve the campaign cache metrics
+@campaign_bp.get(
+    "/campaigns/cache",
+    responses={200: CampaignCacheStatsResponse},
+    tags=[campaign_tag],
+)
+def get_campaign_cache_stats():
+    """
+    Retrieve the hit rate and size of this process's campaign cache.
+    """
+    return jsonify(CampaignCacheStatsResponse(**campaign_cache.stats()).model_dump()), 200
@@ -1,7 +1,7 @@
 from flask_openapi3 import APIBlueprint, Tag
 from flask import jsonify
-from config import SessionLocal
-from model import Campaign, Feedback, Dashboard, Component, ComponentType, FeedbackAnalysis, SentimentCategory
+from config import SessionLocal, session_for
+from model import Campaign, Dashboard, Component, ComponentType
 from schemas import (
     DashboardMetricsResponse,
     DashboardIDParam,
@@ -11,8 +11,12 @@ from schemas import (
     DashboardListResponse,
     DashboardComponentIDParam,
     DashboardComponentResponse,
+    DashboardComponentCacheStatsResponse,
+    DashboardDataResponse,
 )
-from sqlalchemy import func, case
+from services import component_cache_key, component_data_cache, compute_component_data, compute_dashboard_data
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
 
 # Create a new Tag for the Dashboard module
 dashboard_tag = Tag(name="Dashboard", description="Operations related to dashboards.")
@@ -20,6 +24,9 @@ dashboard_tag = Tag(name="Dashboard", description="Operations related to dashboa
 # Create a new API Blueprint for dashboard routes
 dashboard_bp = APIBlueprint("dashboard", __name__)
 
+# Session factory for read-only endpoints (routed to the read engine when configured for this blueprint)
+ReadSession = session_for(dashboard_bp.name)
+
 # Route: Get system metrics for the dashboard
 @dashboard_bp.get(
     "/dashboard-system-metrics",
@@ -28,10 +35,13 @@ dashboard_bp = APIBlueprint("dashboard", __name__)
 )
 def get_dashboard_metrics():
     """Retrieve system metrics for the dashboard."""
-    with SessionLocal() as db:
-        total_campaigns = db.query(Campaign).count()
-        total_feedbacks = db.query(Feedback).count()
-        active_campaigns = db.query(Campaign).filter(Campaign.active == True).count()
+    with ReadSession() as db:
+        # Deleted campaigns still being purged are left out
+        campaigns = db.query(Campaign).filter(Campaign.deleted_at.is_(None))
+        total_campaigns = campaigns.count()
+        # Summed from the maintained per-campaign counters instead of counting the feedbacks
+        total_feedbacks = campaigns.with_entities(func.coalesce(func.sum(Campaign.feedback_count), 0)).scalar()
+        active_campaigns = campaigns.filter(Campaign.active == True).count()
 
         metrics = DashboardMetricsResponse(
             total_campaigns=total_campaigns,
@@ -56,7 +66,7 @@ def create_dashboard(body: DashboardCreate):
     with SessionLocal() as db:
         try:
             # Fetch campaigns associated with the dashboard
-            campaigns = db.query(Campaign).filter(Campaign.id.in_(body.campaign_ids)).all()
+            campaigns = db.query(Campaign).filter(Campaign.id.in_(body.campaign_ids), Campaign.deleted_at.is_(None)).all()
 
             # Create components for the dashboard
             components = [
@@ -109,7 +119,7 @@ def create_dashboard(body: DashboardCreate):
 )
 def get_dashboard(path: DashboardIDParam):
     """Retrieve a dashboard by its ID."""
-    with SessionLocal() as db:
+    with ReadSession() as db:
         dashboard = db.query(Dashboard).filter(Dashboard.id == path.dashboard_id).first()
         if not dashboard:
             return jsonify({"message": "Dashboard not found"}), 404
@@ -150,7 +160,7 @@ def update_dashboard(path: DashboardIDParam, body: DashboardUpdate):
         # Update dashboard properties
         dashboard.name = body.name
         dashboard.description = body.description
-        dashboard.campaigns = db.query(Campaign).filter(Campaign.id.in_(body.campaign_ids)).all()
+        dashboard.campaigns = db.query(Campaign).filter(Campaign.id.in_(body.campaign_ids), Campaign.deleted_at.is_(None)).all()
         dashboard.components = [
             Component(
                 name=component["name"],
@@ -207,8 +217,12 @@ def delete_dashboard(path: DashboardIDParam):
 )
 def list_dashboards():
     """List all dashboards."""
-    with SessionLocal() as db:
-        dashboards = db.query(Dashboard).all()
+    with ReadSession() as db:
+        # Load campaigns and components for all dashboards up front instead of once per dashboard
+        dashboards = db.query(Dashboard).options(
+            selectinload(Dashboard.campaigns),
+            selectinload(Dashboard.components),
+        ).all()
         response = DashboardListResponse(
             items=[
                 DashboardResponse(
@@ -245,7 +259,7 @@ def list_dashboards():
 )
 def get_component_data(path: DashboardComponentIDParam):
     """Retrieve data for a specific component in a dashboard."""
-    with SessionLocal() as db:
+    with ReadSession() as db:
         # Validate the dashboard
         dashboard = db.query(Dashboard).filter(Dashboard.id == path.dashboard_id).first()
         if not dashboard:
@@ -259,174 +273,15 @@ def get_component_data(path: DashboardComponentIDParam):
         if not component:
             return jsonify({"message": "Component not found or does not belong to the specified dashboard"}), 404
 
-        campaign_ids = [campaign.id for campaign in dashboard.campaigns]
-
-        # Handle different component types
-        if component.type.value in ["bar_chart", "line_chart", "pie_chart"]:
-            x_axis = component.settings.get("x_axis", "sentiment_category")
-            y_axis = component.settings.get("y_axis", "count")
-            
-            field_mapping = {
-                "sentiment_category": FeedbackAnalysis.sentiment_category,
-                "gender": Feedback.gender,
-                "age_range": Feedback.age_range,
-                "education_level": Feedback.education_level,
-                "country": Feedback.country,
-                "state": Feedback.state,
-                "sentiment": FeedbackAnalysis.sentiment,
-                "word_count": FeedbackAnalysis.word_count,
-                "feedback_length": FeedbackAnalysis.feedback_length,
-                "star_rating": FeedbackAnalysis.star_rating
-            }
-            
-            x_field = field_mapping.get(x_axis, FeedbackAnalysis.sentiment_category)
-            
-            if y_axis == "count":
-                y_expression = func.count().label('value')
-            elif y_axis in field_mapping:
-                y_field = field_mapping[y_axis]
-                if y_axis in ["sentiment", "word_count", "feedback_length", "star_rating"]:
-                    y_expression = func.avg(y_field).label('value')
-                else:
-                    y_expression = func.count().label('value')
-            else:
-                y_expression = func.count().label('value')
-
-            chart_data = db.query(
-                x_field.label('label'),
-                y_expression
-            ).select_from(FeedbackAnalysis).join(
-                Feedback, FeedbackAnalysis.feedback_id == Feedback.id
-            ).filter(
-                Feedback.campaign_id.in_(campaign_ids)
-            ).group_by(x_field).all()
-
-            if chart_data:
-                labels = []
-                values = []
-                for row in chart_data:
-                    if hasattr(row.label, 'value'):
-                        labels.append(row.label.value)
-                    else:
-                        labels.append(str(row.label))
-                    values.append(float(row.value) if row.value else 0)
-                
-                data_payload = {
-                    "labels": labels,
-                    "values": values
-                }
-            else:
-                data_payload = {"data": {"message": "No chart data available"}}
-
-        elif component.type.value == "word_cloud":
-            feedbacks = db.query(Feedback.message).filter(Feedback.campaign_id.in_(campaign_ids)).all()
-            word_count = {}
-            stopwords = {
-                "a", "o", "e", "de", "do", "da", "das", "dos", "em", "um", "uma", "uns", "umas", "para", "por", "com",
-                "no", "na", "nos", "nas", "ao", "à", "aos", "às", "que", "se", "é", "não", "sim", "mas", "ou", "como",
-                "the", "and", "of", "to", "in", "for", "on", "with", "at", "by", "an", "be", "is", "are", "was", "were",
-                "it", "this", "that", "from", "as", "or", "if", "so", "do", "does", "did", "not"
-            }
-            for feedback in feedbacks:
-                words = feedback.message.split()
-                for word in words:
-                    word = word.lower().strip(".,!?\"'()[]{}:;")
-                    if word and word not in stopwords:
-                        word_count[word] = word_count.get(word, 0) + 1
-            data_payload = {
-            "words": [[word, count] for word, count in word_count.items()]
-            }
-
-        elif component.type.value == "sentiment_analysis":
-            sentiment_data = db.query(FeedbackAnalysis).filter(FeedbackAnalysis.feedback_id.in_(
-                db.query(Feedback.id).filter(Feedback.campaign_id.in_(campaign_ids))
-            )).all()
-            if sentiment_data:
-                sentiment_summary = {
-                    "positive": 0,
-                    "neutral": 0,
-                    "negative": 0,
-                }
-                total_sentiment_score = 0
-
-                for data in sentiment_data:
-                    sentiment_summary[data.sentiment_category.value.lower()] += 1
-                    total_sentiment_score += data.sentiment
-
-                total_sentiments = sum(sentiment_summary.values())
-                data_payload = {
-                    "sentiment": total_sentiment_score / len(sentiment_data),
-                    "positive_score": sentiment_summary["positive"] / total_sentiments,
-                    "neutral_score": sentiment_summary["neutral"] / total_sentiments,
-                    "negative_score": sentiment_summary["negative"] / total_sentiments,
-                }
-            else:
-                data_payload = {"data": {"message": "No sentiment data available"}}
-
-        elif component.type.value == "trend_analysis":
-            trend_data = db.query(
-                func.date(Feedback.created_at).label('date'),
-                func.count(FeedbackAnalysis.id).label('total_feedbacks'),
-                func.avg(FeedbackAnalysis.sentiment).label('avg_sentiment'),
-                func.sum(
-                    case(
-                        (FeedbackAnalysis.sentiment_category == SentimentCategory.POSITIVE, 1),
-                        else_=0
-                    )
-                ).label('positive_count'),
-                func.sum(
-                    case(
-                        (FeedbackAnalysis.sentiment_category == SentimentCategory.NEGATIVE, 1),
-                        else_=0
-                    )
-                ).label('negative_count')
-            ).select_from(FeedbackAnalysis).join(
-                Feedback, FeedbackAnalysis.feedback_id == Feedback.id
-            ).filter(
-                Feedback.campaign_id.in_(campaign_ids)
-            ).group_by(
-                func.date(Feedback.created_at)
-            ).order_by(
-                func.date(Feedback.created_at)
-            ).all()
-
-            if trend_data:
-                labels = [row.date for row in trend_data]
-                sentiment_scores = [float(row.avg_sentiment) for row in trend_data]
-                
-                raw_satisfaction = [
-                    (row.positive_count / row.total_feedbacks) * 100
-                    if row.total_feedbacks > 0
-                    else 0.0
-                    for row in trend_data
-                ]
-                
-                satisfaction_trend = []
-                alpha = 0.3
-                
-                for i, current_value in enumerate(raw_satisfaction):
-                    if i == 0:
-                        satisfaction_trend.append(round(current_value, 2))
-                    else:
-                        ema = alpha * current_value + (1 - alpha) * satisfaction_trend[i-1]
-                        
-                        sample_weight = min(trend_data[i].total_feedbacks / 10, 1.0)
-                        adjusted_alpha = alpha * sample_weight + (1 - sample_weight) * 0.1
-                        
-                        ema = adjusted_alpha * current_value + (1 - adjusted_alpha) * satisfaction_trend[i-1]
-                        satisfaction_trend.append(round(ema, 2))
-
-                data_payload = {
-                    "labels": labels,
-                    "sentiment_scores": sentiment_scores,
-                    "satisfaction_trend": satisfaction_trend,
-                    "total_feedbacks": [int(row.total_feedbacks) for row in trend_data]
-                }
-            else:
-                data_payload = {"data": {"message": "No trend data available"}}
-
-        else:
-            data_payload = {"message": "Component type not mapped"}
+        # Campaigns deleted but still being purged are left out
+        campaigns = [campaign for campaign in dashboard.campaigns if campaign.deleted_at is None]
+
+        # Reuse the payload computed for the same settings and campaign data versions, if any
+        key = component_cache_key(component, campaigns)
+        data_payload = component_data_cache.get(key)
+        if data_payload is None:
+            data_payload = compute_component_data(db, component, [campaign.id for campaign in campaigns])
+            component_data_cache.set(key, data_payload)
 
         response_data = DashboardComponentResponse(
             id=component.id,
@@ -435,4 +290,53 @@ def get_component_data(path: DashboardComponentIDParam):
             settings=component.settings or {},
             data=data_payload,
         )
-        return jsonify(response_data.model_dump()), 200
\ No newline at end of file
+        return jsonify(response_data.model_dump()), 200
+
+
+# Route: Get the data of every component in a dashboard
+@dashboard_bp.get(
+    "/dashboard/<int:dashboard_id>/data",
+    responses={200: DashboardDataResponse, 404: {"message": "Dashboard not found"}},
+    tags=[dashboard_tag],
+)
+def get_dashboard_data(path: DashboardIDParam):
+    """Retrieve the data of all the components of a dashboard in one response."""
+    with ReadSession() as db:
+        dashboard = db.query(Dashboard).options(
+            selectinload(Dashboard.campaigns),
+            selectinload(Dashboard.components),
+        ).filter(Dashboard.id == path.dashboard_id).first()
+        if not dashboard:
+            return jsonify({"message": "Dashboard not found"}), 404
+
+        # Campaigns deleted but still being purged are left out
+        campaigns = [campaign for campaign in dashboard.campaigns if campaign.deleted_at is None]
+
+        # Components are planned together: shared chart queries, concurrent parts (see compute_dashboard_data)
+        payloads = compute_dashboard_data(db, dashboard.components, campaigns, session_factory=ReadSession)
+
+        response_data = DashboardDataResponse(
+            id=dashboard.id,
+            components=[
+                DashboardComponentResponse(
+                    id=component.id,
+                    name=component.name,
+                    type=component.type.value,
+                    settings=component.settings or {},
+                    data=payloads[component.id],
+                )
+                for component in dashboard.components
+            ],
+        )
+        return jsonify(response_data.model_dump()), 200
+
+
+# Route: Get the dashboard component data cache metrics
+@dashboard_bp.get(
+    "/dashboards/component-cache",
+    responses={200: DashboardComponentCacheStatsResponse},
+    tags=[dashboard_tag],
+)
+def get_component_cache_stats():
+    """Retrieve the hit rate and size of this process's component data cache."""
+    return jsonify(DashboardComponentCacheStatsResponse(**component_data_cache.stats()).model_dump()), 200
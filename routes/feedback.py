@@ -1,8 +1,47 @@
+import json
 from flask_openapi3 import APIBlueprint, Tag
-from flask import jsonify, request
-from config import SessionLocal
-from model import Feedback, Campaign
-from schemas import FeedbackCreate, FeedbackResponse, FeedbackIDParam, PaginationSchema, ListResponseSchema
+from flask import Response, jsonify, request, stream_with_context
+from pydantic import ValidationError
+from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError, OperationalError
+from config import SessionLocal, session_for, BULK_INGEST_MAX_ITEMS, FEEDBACK_BUFFER_ENABLED
+from model import Feedback
+from schemas import (
+    FeedbackCreate,
+    FeedbackResponse,
+    FeedbackIDParam,
+    FeedbackBulkItem,
+    FeedbackBulkResponse,
+    FeedbackWithAnalysisResponse,
+    FeedbackIncludeSchema,
+    FeedbackListSchema,
+    FeedbackExportSchema,
+    FeedbackProvisionalIDParam,
+    FeedbackBufferedResponse,
+    FeedbackBufferStatsResponse,
+    FeedbackSearchSchema,
+    FeedbackSearchResult,
+    ListResponseSchema,
+)
+from services import (
+    FeedbackIngestor,
+    campaign_cache,
+    chunked,
+    insert_feedback,
+    rejection_message,
+    FEEDBACK_SORT_KEYS,
+    apply_feedback_filters,
+    apply_analysis_filters,
+    estimate_feedback_total,
+    build_search_query,
+    split_snippet,
+    to_match_expression,
+    EXPORT_FORMATS,
+    build_export_query,
+    stream_export,
+    feedback_buffer,
+)
+from utils import decode_cursor, encode_cursor, paginate
 
 # Create a new Tag for feedback operations
 feedback_tag = Tag(name="Feedback", description="Operations related to feedbacks.")
@@ -10,11 +49,15 @@ feedback_tag = Tag(name="Feedback", description="Operations related to feedbacks
 # Create a new API Blueprint for feedback routes
 feedback_bp = APIBlueprint('feedback', __name__)
 
+# Session factory for read-only endpoints (routed to the read engine when configured for this blueprint)
+ReadSession = session_for(feedback_bp.name)
+
 # Create a new feedback
 @feedback_bp.post(
     "/feedback",
     responses={
         201: FeedbackResponse,
+        202: FeedbackBufferedResponse,
         404: {"message": "Campaign not found"},
         400: {"message": "Campaign is not active or has reached the maximum number of answers or does not allow multiple answers from the same user"}
     },
@@ -23,43 +66,152 @@ feedback_bp = APIBlueprint('feedback', __name__)
 def create_feedback(body: FeedbackCreate):
     """
     Create a new feedback for a campaign.
-    Validates campaign status and user restrictions before saving feedback.
+    The feedback is written with a single conditional INSERT; campaign status, max_answers
+    and the one-answer-per-IP rule are enforced by the database, so they also hold under
+    concurrent submissions. The campaign is only read to explain a rejection.
+    With FEEDBACK_BUFFER_ENABLED the feedback is acknowledged with 202 and a provisional ID,
+    and written by the write-behind buffer in group commits.
     """
+    values = {
+        "campaign_id": body.campaign_id,
+        "age_range": body.age_range,
+        "gender": body.gender,
+        "education_level": body.education_level,
+        "country": body.country,
+        "state": body.state,
+        "message": body.message,
+        "user_ip": request.remote_addr,
+        "user_agent": request.user_agent.string,
+    }
+    if FEEDBACK_BUFFER_ENABLED:
+        return _buffer_feedback(values)
+
     with SessionLocal() as db:
-        campaign = db.query(Campaign).filter(Campaign.id == body.campaign_id).first()
-        if not campaign:
-            return jsonify({"message": "Campaign not found"}), 404
-        if not campaign.active:
+        try:
+            new_feedback = insert_feedback(db, values)
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            return jsonify({"message": rejection_message(e)}), 400
+
+        if not new_feedback:
+            campaign = campaign_cache.get(db, body.campaign_id)
+            if not campaign:
+                return jsonify({"message": "Campaign not found"}), 404
             return jsonify({"message": "Campaign is not active"}), 400
-        if campaign.max_answers > 0 and db.query(Feedback).filter(Feedback.campaign_id == body.campaign_id).count() >= campaign.max_answers:
-            return jsonify({"message": "Campaign has reached the maximum number of answers"}), 400
-
-        user_ip = request.remote_addr
-        user_agent = request.user_agent.string
-
-        if not campaign.multiple_answers_from_user:
-            existing_feedback = db.query(Feedback).filter(
-                Feedback.campaign_id == body.campaign_id,
-                Feedback.user_ip == user_ip
-            ).first()
-            if existing_feedback:
-                return jsonify({"message": "Campaign does not allow multiple answers from the same user"}), 400
-
-        new_feedback = Feedback(
-            campaign_id=body.campaign_id,
-            age_range=body.age_range,
-            gender=body.gender,
-            education_level=body.education_level,
-            country=body.country,
-            state=body.state,
-            message=body.message,
-            user_ip=user_ip,
-            user_agent=user_agent
-        )
-        db.add(new_feedback)
-        db.commit()
-        db.refresh(new_feedback)
-        return jsonify(FeedbackResponse.model_validate(new_feedback).model_dump()), 201
+
+        response = FeedbackResponse(**values, id=new_feedback.id, created_at=new_feedback.created_at)
+        return jsonify(response.model_dump()), 201
+
+def _buffer_feedback(values: dict):
+    """
+    Acknowledge a feedback through the write-behind buffer.
+    The campaign must exist and be active; max_answers and the one-answer-per-IP rule
+    are applied when the buffer is flushed, and reported by the status endpoint.
+    """
+    with ReadSession() as db:
+        # A stale cached flag only delays a rejection: the flush re-checks the campaign
+        campaign = campaign_cache.get(db, values["campaign_id"])
+    if not campaign:
+        return jsonify({"message": "Campaign not found"}), 404
+    if not campaign.active:
+        return jsonify({"message": "Campaign is not active"}), 400
+
+    provisional_id = feedback_buffer.submit(values)
+    response = FeedbackBufferedResponse(provisional_id=provisional_id, status="pending")
+    return jsonify(response.model_dump()), 202
+
+# Get the status of a feedback acknowledged by the write-behind buffer
+@feedback_bp.get(
+    "/feedback/pending/<string:provisional_id>",
+    tags=[feedback_tag],
+    responses={200: FeedbackBufferedResponse, 404: {"description": "Unknown provisional ID"}}
+)
+def get_buffered_feedback(path: FeedbackProvisionalIDParam):
+    """
+    Retrieve the status of a buffered feedback: pending, created (with its ID) or rejected (with the reason).
+    """
+    status = feedback_buffer.status(path.provisional_id)
+    if status is None:
+        return jsonify({"message": "Unknown provisional ID"}), 404
+    response = FeedbackBufferedResponse(provisional_id=path.provisional_id, **status)
+    return jsonify(response.model_dump()), 200
+
+# Get the metrics of the write-behind buffer
+@feedback_bp.get(
+    "/feedbacks/buffer",
+    tags=[feedback_tag],
+    responses={200: FeedbackBufferStatsResponse}
+)
+def get_feedback_buffer_stats():
+    """
+    Retrieve the write-behind buffer metrics: pending feedbacks, totals written and the flush lag.
+    """
+    return jsonify(FeedbackBufferStatsResponse(**feedback_buffer.stats()).model_dump()), 200
+
+def _parse_bulk_entries():
+    """
+    Parse the body of a bulk request into `(index, item)` pairs.
+    NDJSON bodies are read line by line from the request stream; anything else must be a JSON array.
+    Items that fail to parse or validate are yielded with an error message instead of an item.
+    An array over BULK_INGEST_MAX_ITEMS is refused before anything is written; the lines of a
+    stream past the limit are reported invalid without being ingested.
+    """
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        lines = (line for line in request.stream if line.strip())
+        raw_entries = enumerate(lines)
+        decode = json.loads
+    else:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, list):
+            raise ValueError("Request body must be a JSON array or an NDJSON stream")
+        if len(payload) > BULK_INGEST_MAX_ITEMS:
+            raise ValueError(f"A bulk request accepts at most {BULK_INGEST_MAX_ITEMS} items")
+        raw_entries = enumerate(payload)
+        decode = None
+
+    for index, raw in raw_entries:
+        if index >= BULK_INGEST_MAX_ITEMS:
+            yield index, f"Exceeds the limit of {BULK_INGEST_MAX_ITEMS} items per bulk request"
+            continue
+        try:
+            yield index, FeedbackBulkItem.model_validate(decode(raw) if decode else raw)
+        except json.JSONDecodeError:
+            yield index, "Invalid JSON"
+        except ValidationError as e:
+            yield index, "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+# Create feedbacks in bulk
+@feedback_bp.post(
+    "/feedbacks/bulk",
+    responses={
+        200: FeedbackBulkResponse,
+        400: {"message": "Request body must be a JSON array or an NDJSON stream"}
+    },
+    tags=[feedback_tag]
+)
+def create_feedbacks_bulk():
+    """
+    Create many feedbacks from a JSON array or an NDJSON stream.
+    Campaign rules are validated once per campaign and enforced across the whole batch.
+    Returns the status of every item: created (with its id), rejected or invalid.
+    """
+    results = []
+    with SessionLocal() as db:
+        ingestor = FeedbackIngestor(db, user_ip=request.remote_addr, default_agent=request.user_agent.string)
+        try:
+            for chunk in chunked(_parse_bulk_entries()):
+                results.extend(ingestor.ingest_chunk(chunk))
+        except ValueError as e:
+            return jsonify({"message": str(e), "items": [r.model_dump() for r in results]}), 400
+
+    created = sum(1 for result in results if result.status == "created")
+    response = FeedbackBulkResponse(
+        created=created,
+        rejected=len(results) - created,
+        items=results,
+    )
+    return jsonify(response.model_dump()), 200
 
 # List all feedbacks with pagination and filters
 @feedback_bp.get(
@@ -67,44 +219,128 @@ def create_feedback(body: FeedbackCreate):
     responses={200: ListResponseSchema[FeedbackResponse]},
     tags=[feedback_tag]
 )
-def get_feedbacks(query: PaginationSchema):
+def get_feedbacks(query: FeedbackListSchema):
     """
-    Retrieve a paginated list of all feedbacks.
-    Supports offset, limit, and filtering by campaign_id, age_range, gender, education_level, country, state.
+    Retrieve a paginated list of all feedbacks, newest first by default.
+    Supports offset or cursor pagination, limit, an exact, estimated or omitted total,
+    and filtering by campaign_id, age_range, gender, education_level, country, state.
+    With include=analysis each item embeds its sentiment analysis, fetched in the same
+    query. Feedbacks can also be filtered by sentiment_category, star_rating and
+    min/max_sentiment, and sorted by created_at, sentiment or star_rating.
     """
-    with SessionLocal() as db:
-        q = db.query(Feedback)
-
+    with ReadSession() as db:
         # Optional filters from query params
-        campaign_id = request.args.get("campaign_id", type=int)
-        age_range = request.args.get("age_range")
-        gender = request.args.get("gender")
-        education_level = request.args.get("education_level")
-        country = request.args.get("country")
-        state = request.args.get("state")
-
-        if campaign_id is not None:
-            q = q.filter(Feedback.campaign_id == campaign_id)
-        if age_range:
-            q = q.filter(Feedback.age_range == age_range)
-        if gender:
-            q = q.filter(Feedback.gender == gender)
-        if education_level:
-            q = q.filter(Feedback.education_level == education_level)
-        if country:
-            q = q.filter(Feedback.country == country)
-        if state:
-            q = q.filter(Feedback.state == state)
-
-        total = q.count()
-        feedbacks = q.offset(query.offset).limit(query.limit).all()
+        q, filters = apply_feedback_filters(db.query(Feedback), query)
+        q, analysis_filters = apply_analysis_filters(q, query)
+        filters.update(analysis_filters)
+
+        if query.total == "exact":
+            total = q.count()
+        elif query.total == "estimate":
+            total = estimate_feedback_total(db, q, filters)
+        else:
+            total = None
+        try:
+            feedbacks, next_cursor = paginate(
+                q, FEEDBACK_SORT_KEYS[query.sort], query.cursor, query.offset, query.limit,
+                descending=query.order == "desc"
+            )
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
 
+        schema = FeedbackWithAnalysisResponse if query.include == "analysis" else FeedbackResponse
         response = ListResponseSchema(
             total=total,
-            items=[FeedbackResponse.model_validate(f) for f in feedbacks]
+            items=[schema.model_validate(f) for f in feedbacks],
+            next_cursor=next_cursor
         )
         return jsonify(response.model_dump()), 200
 
+# Stream an export of feedbacks and their analyses
+@feedback_bp.get(
+    "/feedbacks/export",
+    tags=[feedback_tag],
+    responses={200: {"description": "The export file"}, 400: {"description": "Unsupported export format"}}
+)
+def export_feedbacks(query: FeedbackExportSchema):
+    """
+    Export feedbacks with their sentiment analysis as CSV, NDJSON or Parquet, optionally gzipped.
+    Rows are streamed in batches, so memory use does not grow with the export size.
+    Supports filtering by campaign_id, created_from, created_to and the demographic fields.
+    """
+    db = ReadSession()
+    try:
+        chunks = stream_export(build_export_query(db, query), query.format, query.gzip)
+    except ValueError as e:
+        db.close()
+        return jsonify({"message": str(e)}), 400
+
+    def generate():
+        # The session stays open until the last chunk is sent
+        try:
+            yield from chunks
+        finally:
+            db.close()
+
+    extension, mimetype = EXPORT_FORMATS[query.format]
+    filename = f"feedbacks.{extension}"
+    if query.gzip:
+        filename += ".gz"
+        mimetype = "application/gzip"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+# Full-text search over feedback messages
+@feedback_bp.get(
+    "/feedbacks/search",
+    tags=[feedback_tag],
+    responses={200: ListResponseSchema, 400: {"description": "Invalid search"}}
+)
+def search_feedbacks(query: FeedbackSearchSchema):
+    """
+    Search feedback messages, best matches first.
+    Every word must match (a trailing * matches prefixes); each item includes its
+    relevance rank and a plain-text snippet with the offsets of the matched words.
+    Supports the feedback list filters and cursor pagination.
+    """
+    match = to_match_expression(query.q)
+    if not match:
+        return jsonify({"message": "Search must contain at least one word"}), 400
+
+    try:
+        after = decode_cursor(query.cursor) if query.cursor else None
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    if after is not None and len(after) != 2:
+        return jsonify({"message": "Invalid cursor"}), 400
+
+    with ReadSession() as db:
+        try:
+            rows = build_search_query(db, match, query, after, query.limit + 1).all()
+        except OperationalError:
+            return jsonify({"message": "Invalid search"}), 400
+
+        # One extra row tells whether there is a next page; cursors hold the [rank, id] of the last row
+        next_cursor = None
+        if len(rows) > query.limit:
+            rows = rows[:query.limit]
+            next_cursor = encode_cursor([rows[-1][2], rows[-1][0].id])
+
+        items = []
+        for feedback, snippet, rank in rows:
+            text, highlights = split_snippet(snippet)
+            items.append(FeedbackSearchResult(
+                **FeedbackResponse.model_validate(feedback).model_dump(),
+                rank=rank,
+                snippet=text,
+                highlights=highlights,
+            ))
+        response = ListResponseSchema(total=None, items=items, next_cursor=next_cursor)
+        return jsonify(response.model_dump()), 200
+
 # Get a feedback by its ID
 @feedback_bp.get(
     "/feedback/<int:feedback_id>",
@@ -114,15 +350,20 @@ def get_feedbacks(query: PaginationSchema):
     },
     tags=[feedback_tag]
 )
-def get_feedback(path: FeedbackIDParam):
+def get_feedback(path: FeedbackIDParam, query: FeedbackIncludeSchema):
     """
     Retrieve a specific feedback by its ID.
+    With include=analysis the response embeds its sentiment analysis, fetched in the same query.
     Returns 404 if the feedback does not exist.
     """
-    with SessionLocal() as db:
-        feedback = db.query(Feedback).filter(Feedback.id == path.feedback_id).first()
+    with ReadSession() as db:
+        q = db.query(Feedback).filter(Feedback.id == path.feedback_id)
+        if query.include == "analysis":
+            q = q.options(joinedload(Feedback.analysis))
+        feedback = q.first()
         if feedback:
-            return jsonify(FeedbackResponse.model_validate(feedback).model_dump()), 200
+            schema = FeedbackWithAnalysisResponse if query.include == "analysis" else FeedbackResponse
+            return jsonify(schema.model_validate(feedback).model_dump()), 200
         return jsonify({"message": "Feedback not found"}), 404
 
 # Delete a feedback by its ID
@@ -142,6 +383,7 @@ def delete_feedback(path: FeedbackIDParam):
     with SessionLocal() as db:
         feedback = db.query(Feedback).filter(Feedback.id == path.feedback_id).first()
         if feedback:
+            campaign_id = feedback.campaign_id
             db.delete(feedback)
             db.commit()
             return jsonify({"message": "Feedback was removed"}), 200
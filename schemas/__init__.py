@@ -1,6 +1,8 @@
 from .feedback_analysis import FeedbackAnalysisCreate, FeedbackAnalysisResponse, FeedbackCampaignAnalysisRequest, FeedbackProgressResponse
-from .feedback import FeedbackCreate, FeedbackResponse, FeedbackIDParam
-from .campaign import CampaignCreate, CampaignResponse, CampaignIDParam, CampaignShortCodeParam
+from .feedback import FeedbackCreate, FeedbackResponse, FeedbackIDParam, FeedbackBulkItem, FeedbackBulkItemResult, FeedbackBulkResponse, FeedbackWithAnalysisResponse, FeedbackIncludeSchema, FeedbackListSchema, FeedbackExportSchema, FeedbackProvisionalIDParam, FeedbackBufferedResponse, FeedbackBufferStatsResponse
+from .feedback_search import FeedbackSearchSchema, FeedbackSearchResult
+from .campaign import CampaignCreate, CampaignResponse, CampaignIDParam, CampaignShortCodeParam, CampaignCacheStatsResponse
+from .campaign import CampaignWithStatsResponse, CampaignListSchema, CampaignDeletionResponse
 from .list_response import ListResponseSchema
 from .pagination import PaginationSchema
-from .dashboard import DashboardMetricsResponse, DashboardIDParam, DashboardCreate, DashboardUpdate, DashboardResponse, DashboardListResponse, DashboardComponentIDParam, DashboardComponentResponse
\ No newline at end of file
+from .dashboard import DashboardMetricsResponse, DashboardIDParam, DashboardCreate, DashboardUpdate, DashboardResponse, DashboardListResponse, DashboardComponentIDParam, DashboardComponentResponse, DashboardComponentCacheStatsResponse, DashboardDataResponse
\ No newline at end of file
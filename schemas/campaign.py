@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
+from typing import Literal
 
 # Campaign Create Schema
 class CampaignCreate(BaseModel):
@@ -19,14 +20,62 @@ class CampaignResponse(BaseModel):
     max_answers: int
     short_code: str
     feedback_count: int = 0
+    archived_at: datetime | None = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
+# Campaign With Stats Response Schema (listing items, with their analysis statistics)
+class CampaignWithStatsResponse(CampaignResponse):
+    analyzed_count: int = 0
+    average_sentiment: float | None = None
+    positive_count: int = 0
+    neutral_count: int = 0
+    negative_count: int = 0
+
+# Campaign List Query Schema: pagination and sorting by campaign statistics
+class CampaignListSchema(BaseModel):
+    limit: int = Field(
+        default=10, ge=1, le=100, description="Max number of items to return (1 to 100)"
+    )
+    offset: int = Field(
+        default=0, ge=0, description="Number of items to skip (ignored when a cursor is given)"
+    )
+    cursor: str | None = Field(
+        default=None, description="Opaque cursor returned as next_cursor by the previous page (optional)"
+    )
+    total: Literal["exact", "none"] = Field(
+        default="exact", description="How to compute the total: exact count across all pages, or none"
+    )
+    sort: Literal[
+        "created_at", "feedback_count", "analyzed_count", "average_sentiment",
+        "positive_count", "neutral_count", "negative_count",
+    ] = Field(
+        default="created_at", description="Sort field; sorting by average_sentiment only lists analyzed campaigns"
+    )
+    order: Literal["asc", "desc"] = Field(
+        default="desc", description="Sort direction"
+    )
+
 # Campaign ID Param Schema
 class CampaignIDParam(BaseModel):
     campaign_id: int
 
 # Campaign Short Code Param Schema
 class CampaignShortCodeParam(BaseModel):
-    short_code: str
\ No newline at end of file
+    short_code: str
+
+# Campaign Cache Stats Schema
+class CampaignCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    size: int
+
+# Campaign Deletion Progress Schema
+class CampaignDeletionResponse(BaseModel):
+    campaign_id: int
+    status: Literal["pending", "running", "done", "failed"]
+    total: int
+    deleted: int
+    error: str | None = None
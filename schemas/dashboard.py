@@ -42,4 +42,14 @@ class DashboardComponentResponse(BaseModel):
     name: str
     type: str
     settings: Dict
-    data: Dict
\ No newline at end of file
+    data: Dict
+
+class DashboardDataResponse(BaseModel):
+    id: int
+    components: List[DashboardComponentResponse]
+
+class DashboardComponentCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    size: int
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal
 from datetime import datetime
-from model.enums import AgeRange, Gender, EducationLevel, Country, State
+from model.enums import AgeRange, Gender, EducationLevel, Country, State, SentimentCategory
+from schemas.feedback_analysis import FeedbackAnalysisResponse
+from schemas.pagination import PaginationSchema
 
 # Feedback Create Schema
 class FeedbackCreate(BaseModel):
@@ -30,4 +33,88 @@ class FeedbackResponse(BaseModel):
     user_agent: str | None
     created_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# Feedback Response Schema with its embedded analysis (None when not analyzed yet)
+class FeedbackWithAnalysisResponse(FeedbackResponse):
+    analysis: FeedbackAnalysisResponse | None
+
+# Feedback Include Schema (related data embedded in the response)
+class FeedbackIncludeSchema(BaseModel):
+    include: Literal["analysis"] | None = Field(
+        default=None, description="Embed related data fetched in the same query: analysis (optional)"
+    )
+
+# Feedback List Query Schema: pagination, filters on the feedback and on its analysis, and sorting
+class FeedbackListSchema(PaginationSchema, FeedbackIncludeSchema):
+    sentiment_category: SentimentCategory | None = Field(
+        default=None, description="Filter by analyzed sentiment category (optional)"
+    )
+    star_rating: int | None = Field(
+        default=None, ge=1, le=5, description="Filter by analyzed star rating (optional)"
+    )
+    min_sentiment: float | None = Field(
+        default=None, description="Minimum analyzed sentiment score (optional)"
+    )
+    max_sentiment: float | None = Field(
+        default=None, description="Maximum analyzed sentiment score (optional)"
+    )
+    sort: Literal["created_at", "sentiment", "star_rating"] = Field(
+        default="created_at", description="Sort field; sorting by an analysis field only lists analyzed feedbacks"
+    )
+    order: Literal["asc", "desc"] = Field(
+        default="desc", description="Sort direction"
+    )
+
+# Feedback Bulk Item Schema (imports may carry the original user agent; the IP is always the request's,
+# so the one-answer-per-IP rule cannot be bypassed)
+class FeedbackBulkItem(FeedbackCreate):
+    user_agent: str | None = Field(default=None, max_length=255)
+
+# Feedback Bulk Item Result Schema
+class FeedbackBulkItemResult(BaseModel):
+    index: int
+    status: str
+    id: int | None = None
+    message: str | None = None
+
+# Feedback Bulk Response Schema
+class FeedbackBulkResponse(BaseModel):
+    created: int
+    rejected: int
+    items: List[FeedbackBulkItemResult]
+
+# Feedback Export Query Schema
+class FeedbackExportSchema(BaseModel):
+    format: Literal["csv", "ndjson", "parquet"] = Field(default="csv", description="Export format")
+    gzip: bool = Field(default=False, description="Compress the export with gzip")
+    campaign_id: int | None = Field(default=None, description="Filter by campaign ID (optional)")
+    created_from: datetime | None = Field(default=None, description="Only feedbacks created at or after this time (optional)")
+    created_to: datetime | None = Field(default=None, description="Only feedbacks created before this time (optional)")
+    age_range: str | None = Field(default=None, description="Filter by age range (optional)")
+    gender: str | None = Field(default=None, description="Filter by gender (optional)")
+    education_level: str | None = Field(default=None, description="Filter by education level (optional)")
+    country: str | None = Field(default=None, description="Filter by country (optional)")
+    state: str | None = Field(default=None, description="Filter by state (optional)")
+
+# Provisional ID Param Schema (feedbacks acknowledged by the write-behind buffer)
+class FeedbackProvisionalIDParam(BaseModel):
+    provisional_id: str
+
+# Buffered Feedback Status Schema
+class FeedbackBufferedResponse(BaseModel):
+    provisional_id: str
+    status: str
+    id: int | None = None
+    message: str | None = None
+
+# Write-behind Buffer Stats Schema
+class FeedbackBufferStatsResponse(BaseModel):
+    enabled: bool
+    writer_alive: bool
+    pending: int
+    flushed: int
+    rejected: int
+    flush_lag_ms: float
+    last_flush_lag_ms: float
+    max_flush_lag_ms: float
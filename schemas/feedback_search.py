@@ -0,0 +1,21 @@
+from typing import List
+from pydantic import BaseModel, Field
+from schemas.feedback import FeedbackResponse
+
+# Feedback Search Query Schema
+class FeedbackSearchSchema(BaseModel):
+    q: str = Field(..., min_length=1, max_length=500, description="Words to search for; a trailing * matches prefixes")
+    campaign_id: int | None = Field(default=None, description="Filter by campaign ID (optional)")
+    age_range: str | None = Field(default=None, description="Filter by age range (optional)")
+    gender: str | None = Field(default=None, description="Filter by gender (optional)")
+    education_level: str | None = Field(default=None, description="Filter by education level (optional)")
+    country: str | None = Field(default=None, description="Filter by country (optional)")
+    state: str | None = Field(default=None, description="Filter by state (optional)")
+    limit: int = Field(default=10, ge=1, le=100, description="Max number of items to return (1 to 100)")
+    cursor: str | None = Field(default=None, description="Opaque cursor returned as next_cursor by the previous page (optional)")
+
+# Feedback Search Result Schema (the snippet is plain text; highlights are [start, end) character offsets into it)
+class FeedbackSearchResult(FeedbackResponse):
+    rank: float
+    snippet: str
+    highlights: List[List[int]]
@@ -4,5 +4,6 @@ from typing import Generic, TypeVar, List
 T = TypeVar("T")
 
 class ListResponseSchema(BaseModel, Generic[T]):
-    total: int
+    total: int | None
     items: List[T]
+    next_cursor: str | None = None
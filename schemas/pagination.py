@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from typing import Literal
 
 class PaginationSchema(BaseModel):
     campaign_id: int | None = Field(
@@ -23,5 +24,11 @@ class PaginationSchema(BaseModel):
         default=10, ge=1, le=100, description="Max number of items to return (1 to 100)"
     )
     offset: int = Field(
-        default=0, ge=0, description="Number of items to skip"
+        default=0, ge=0, description="Number of items to skip (ignored when a cursor is given)"
+    )
+    cursor: str | None = Field(
+        default=None, description="Opaque cursor returned as next_cursor by the previous page (optional)"
+    )
+    total: Literal["exact", "estimate", "none"] = Field(
+        default="exact", description="How to compute the total: exact count, estimate (counters or a short-lived cache) or none"
     )
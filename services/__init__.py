@@ -1,2 +1,21 @@
 from .feedback_queue import feedback_queue, processing_feedbacks
-from .feedback_processing import process_feedback_queue
\ No newline at end of file
+from .feedback_processing import process_feedback_queue
+from .feedback_ingestion import FeedbackIngestor, chunked, insert_feedback, rejection_message, sync_single_answer_flags
+from .campaign_counters import (
+    reconcile_feedback_counts, rebuild_campaign_stats, rebuild_analytics_cube, rebuild_campaign_hourly_stats,
+)
+from .feedback_filters import FEEDBACK_FILTER_COLUMNS, FEEDBACK_SORT_KEYS, apply_feedback_filters, apply_analysis_filters
+from .feedback_totals import estimate_feedback_total, feedback_total_cache
+from .feedback_search import build_search_query, split_snippet, to_match_expression
+from .feedback_export import EXPORT_FORMATS, EXPORT_FIELDS, build_export_query, stream_export
+from .feedback_buffer import FeedbackBuffer, feedback_buffer
+from .campaign_cache import CampaignCache, campaign_cache
+from .campaign_listing import CAMPAIGN_SORT_KEYS, CAMPAIGN_STAT_COLUMNS, build_campaign_listing_query, count_campaigns
+from .campaign_purge import CampaignPurger, campaign_purger
+from .campaign_archive import archive_campaign, restore_campaign, campaign_archive_path
+from .dashboard_charts import CUBE_DIMENSIONS, CUBE_MEASURES, build_chart_query, build_shared_chart_query, chart_axes
+from .component_cache import component_cache_key, component_data_cache
+from .word_frequency import top_words, rebuild_word_frequencies
+from .sentiment_summary import CONFIDENCE_BANDS, SENTIMENT_BREAKDOWNS, sentiment_summary, sentiment_breakdown
+from .trend_analysis import TREND_GRANULARITIES, adaptive_ema, trend_series
+from .dashboard_data import CHART_TYPES, compute_component_data, compute_dashboard_data
@@ -0,0 +1,234 @@
+import gzip
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, text
+from sqlalchemy.schema import CreateTable
+from config import CAMPAIGN_ARCHIVE_DIR, CAMPAIGN_PURGE_CHUNK_SIZE
+from model import AnalyticsCube, Campaign, CampaignHourlyStats, CampaignStats, Feedback, FeedbackAnalysis
+from services.campaign_cache import campaign_cache
+from services.campaign_counters import (
+    reconcile_feedback_counts, rebuild_campaign_stats, rebuild_analytics_cube, rebuild_campaign_hourly_stats,
+)
+from services.campaign_purge import delete_campaign_feedbacks
+
+# Tables copied into a campaign archive, in insert order
+ARCHIVED_TABLES = [
+    Campaign.__table__, CampaignStats.__table__, AnalyticsCube.__table__, CampaignHourlyStats.__table__,
+    Feedback.__table__, FeedbackAnalysis.__table__,
+]
+
+
+def campaign_archive_path(campaign_id: int, archive_dir: str = CAMPAIGN_ARCHIVE_DIR) -> str:
+    """
+    Return the path of a campaign's archive file.
+
+    Args:
+        campaign_id (int): The campaign ID.
+        archive_dir (str, optional): The archive directory. Defaults to CAMPAIGN_ARCHIVE_DIR.
+
+    Returns:
+        str: The path of the gzipped SQLite archive.
+    """
+    return os.path.join(archive_dir, f"campaign_{campaign_id}.sqlite.gz")
+
+
+def remove_campaign_archive(campaign_id: int, archive_dir: str = CAMPAIGN_ARCHIVE_DIR):
+    """Delete a campaign's archive file, if it has one."""
+    path = campaign_archive_path(campaign_id, archive_dir)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _columns(table) -> list[str]:
+    """Return the column names of a table."""
+    return [column.name for column in table.columns]
+
+
+def _copy_rows(source, target, table, condition: str, params: dict):
+    """Copy the rows of a table matching a condition, as stored (no type conversion)."""
+    columns = _columns(table)
+    rows = source.execute(
+        text(f"SELECT {', '.join(columns)} FROM {table.name} WHERE {condition}"), params
+    ).mappings().all()
+    if rows:
+        placeholders = ", ".join(f":{column}" for column in columns)
+        target.execute(
+            text(f"INSERT OR IGNORE INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})"),
+            [dict(row) for row in rows],
+        )
+    return len(rows)
+
+
+def _copy_feedbacks(source, target, campaign_id: int, chunk_size: int, commit=None) -> tuple[int, int]:
+    """Copy a campaign's feedbacks and their analyses chunk by chunk, in ID order."""
+    feedbacks = analyses = 0
+    last_id = 0
+    while True:
+        ids = source.execute(
+            text("SELECT id FROM feedbacks WHERE campaign_id = :campaign_id AND id > :last_id ORDER BY id LIMIT :limit"),
+            {"campaign_id": campaign_id, "last_id": last_id, "limit": chunk_size},
+        ).scalars().all()
+        if not ids:
+            return feedbacks, analyses
+        bounds = {"campaign_id": campaign_id, "first_id": ids[0], "last_id": ids[-1]}
+        feedbacks += _copy_rows(
+            source, target, Feedback.__table__, "campaign_id = :campaign_id AND id BETWEEN :first_id AND :last_id", bounds
+        )
+        analyses += _copy_rows(
+            source, target, FeedbackAnalysis.__table__,
+            "feedback_id IN (SELECT id FROM feedbacks WHERE campaign_id = :campaign_id AND id BETWEEN :first_id AND :last_id)",
+            bounds,
+        )
+        if commit:
+            commit()
+        last_id = ids[-1]
+
+
+@contextmanager
+def _open_archive(path: str):
+    """Yield a connection to a decompressed copy of an archive."""
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "campaign.sqlite")
+        with gzip.open(path, "rb") as source, open(database, "wb") as target:
+            shutil.copyfileobj(source, target)
+        engine = create_engine(f"sqlite:///{database}")
+        try:
+            with engine.connect() as connection:
+                yield connection
+        finally:
+            engine.dispose()
+
+
+def _write_archive(db, campaign_id: int, path: str, chunk_size: int) -> tuple[int, int]:
+    """Copy a campaign and its rows into a new SQLite file and gzip it to `path`."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=directory or None) as scratch:
+        database = os.path.join(scratch, "campaign.sqlite")
+        engine = create_engine(f"sqlite:///{database}")
+        with engine.begin() as archive:
+            # Plain tables: none of the triggers of the live schema are copied
+            for table in ARCHIVED_TABLES:
+                archive.execute(CreateTable(table))
+            params = {"campaign_id": campaign_id}
+            _copy_rows(db, archive, Campaign.__table__, "id = :campaign_id", params)
+            _copy_rows(db, archive, CampaignStats.__table__, "campaign_id = :campaign_id", params)
+            _copy_rows(db, archive, AnalyticsCube.__table__, "campaign_id = :campaign_id", params)
+            _copy_rows(db, archive, CampaignHourlyStats.__table__, "campaign_id = :campaign_id", params)
+            counts = _copy_feedbacks(db, archive, campaign_id, chunk_size)
+        engine.dispose()
+
+        compressed = os.path.join(scratch, "campaign.sqlite.gz")
+        with open(database, "rb") as source, gzip.open(compressed, "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.replace(compressed, path)
+    return counts
+
+
+def archive_campaign(db, campaign_id: int, chunk_size: int = CAMPAIGN_PURGE_CHUNK_SIZE,
+                     archive_dir: str = CAMPAIGN_ARCHIVE_DIR) -> dict:
+    """
+    Move a closed campaign's feedbacks and analyses to cold storage.
+
+    The campaign, its statistics, feedbacks and analyses are copied into a
+    gzipped SQLite file (one per campaign), then the feedbacks and analyses are
+    deleted from the live tables in chunks. The campaign row stays, marked with
+    `archived_at`, and keeps its `feedback_count`, `campaign_stats` row,
+    `analytics_cube` cells and `campaign_hourly_stats`, so listings and dashboards still report its
+    aggregates. Running it again after an interruption finishes the job.
+
+    Args:
+        db: An open database session.
+        campaign_id (int): The campaign ID.
+        chunk_size (int, optional): Feedbacks copied or deleted per transaction. Defaults to CAMPAIGN_PURGE_CHUNK_SIZE.
+        archive_dir (str, optional): The archive directory. Defaults to CAMPAIGN_ARCHIVE_DIR.
+
+    Returns:
+        dict: `feedbacks` and `analyses` archived, and the archive `path`.
+
+    Raises:
+        ValueError: If the campaign does not exist or is still active.
+    """
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id, Campaign.deleted_at.is_(None)).first()
+    if not campaign:
+        raise ValueError(f"Campaign {campaign_id} not found")
+    path = campaign_archive_path(campaign_id, archive_dir)
+
+    if campaign.archived_at is None:
+        if campaign.active:
+            raise ValueError(f"Campaign {campaign_id} is active; close it before archiving")
+        _write_archive(db, campaign_id, path, chunk_size)
+        campaign.archived_at = datetime.now(timezone.utc)
+        db.commit()
+    elif not os.path.exists(path):
+        raise ValueError(f"Archive of campaign {campaign_id} not found at {path}")
+
+    delete_campaign_feedbacks(db, campaign_id, chunk_size)
+
+    # The deletes above emptied the counters and cells: put back the aggregates saved in the archive
+    with _open_archive(path) as archive:
+        feedbacks = archive.execute(text("SELECT COUNT(*) FROM feedbacks")).scalar()
+        analyses = archive.execute(text("SELECT COUNT(*) FROM feedback_analysis")).scalar()
+        db.execute(text("DELETE FROM campaign_stats WHERE campaign_id = :campaign_id"), {"campaign_id": campaign_id})
+        _copy_rows(archive, db, CampaignStats.__table__, "campaign_id = :campaign_id", {"campaign_id": campaign_id})
+        db.execute(text("DELETE FROM analytics_cube WHERE campaign_id = :campaign_id"), {"campaign_id": campaign_id})
+        _copy_rows(archive, db, AnalyticsCube.__table__, "campaign_id = :campaign_id", {"campaign_id": campaign_id})
+        db.execute(text("DELETE FROM campaign_hourly_stats WHERE campaign_id = :campaign_id"), {"campaign_id": campaign_id})
+        _copy_rows(archive, db, CampaignHourlyStats.__table__, "campaign_id = :campaign_id", {"campaign_id": campaign_id})
+        db.execute(
+            text("UPDATE campaign SET feedback_count = :count WHERE id = :campaign_id"),
+            {"count": feedbacks, "campaign_id": campaign_id},
+        )
+        db.commit()
+
+    campaign_cache.invalidate(campaign_id, campaign.short_code)
+    return {"feedbacks": feedbacks, "analyses": analyses, "path": path}
+
+
+def restore_campaign(db, campaign_id: int, chunk_size: int = CAMPAIGN_PURGE_CHUNK_SIZE,
+                     archive_dir: str = CAMPAIGN_ARCHIVE_DIR) -> dict:
+    """
+    Bring an archived campaign's feedbacks and analyses back into the live tables.
+
+    Rows are inserted chunk by chunk with their original IDs and values; the
+    database triggers rebuild the counters, the search index, `campaign_stats`,
+    `analytics_cube` and `campaign_hourly_stats` as they go. The archive file is removed once the
+    campaign is fully restored. Running it again after an interruption finishes the job.
+
+    Args:
+        db: An open database session.
+        campaign_id (int): The campaign ID.
+        chunk_size (int, optional): Feedbacks inserted per transaction. Defaults to CAMPAIGN_PURGE_CHUNK_SIZE.
+        archive_dir (str, optional): The archive directory. Defaults to CAMPAIGN_ARCHIVE_DIR.
+
+    Returns:
+        dict: `feedbacks` and `analyses` read from the archive.
+
+    Raises:
+        ValueError: If the campaign does not exist, is not archived, or its archive is missing.
+    """
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id, Campaign.deleted_at.is_(None)).first()
+    if not campaign or campaign.archived_at is None:
+        raise ValueError(f"Campaign {campaign_id} is not archived")
+    path = campaign_archive_path(campaign_id, archive_dir)
+    if not os.path.exists(path):
+        raise ValueError(f"Archive of campaign {campaign_id} not found at {path}")
+
+    # Count only the rows already live (from an interrupted restore); the triggers add the rest
+    reconcile_feedback_counts(db, [campaign_id], include_archived=True)
+    rebuild_campaign_stats(db, [campaign_id], include_archived=True)
+    rebuild_analytics_cube(db, [campaign_id], include_archived=True)
+    rebuild_campaign_hourly_stats(db, [campaign_id], include_archived=True)
+
+    with _open_archive(path) as archive:
+        feedbacks, analyses = _copy_feedbacks(archive, db, campaign_id, chunk_size, commit=db.commit)
+
+    campaign.archived_at = None
+    db.commit()
+    os.remove(path)
+    campaign_cache.invalidate(campaign_id, campaign.short_code)
+    return {"feedbacks": feedbacks, "analyses": analyses}
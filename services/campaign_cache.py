@@ -0,0 +1,159 @@
+import logging
+import threading
+from config import CAMPAIGN_CACHE_TTL, CAMPAIGN_CACHE_SIZE
+from model import Campaign
+from schemas import CampaignResponse
+from utils import TTLCache, decode_short_code
+
+logger = logging.getLogger(__name__)
+
+
+class CampaignCache:
+    """
+    In-process cache of campaign rows, looked up by ID or short code.
+
+    Entries expire after `ttl` seconds and are dropped explicitly when a campaign
+    is updated or deleted. Other processes learn about those changes through the
+    invalidation listeners (e.g. a publisher on a shared message bus whose
+    subscribers call `invalidate(..., publish=False)`); without one, their
+    copies are at most `ttl` seconds stale.
+
+    Only campaign edits invalidate an entry: feedback writes do not, so a busy
+    campaign keeps being served from memory. The `feedback_count` of a cached
+    campaign is therefore a snapshot up to `ttl` seconds old; `max_answers` is
+    enforced by the database, never from this count.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.by_id = TTLCache(ttl=ttl, maxsize=maxsize)  # campaign id -> CampaignResponse
+        self.by_short_code = TTLCache(ttl=ttl, maxsize=maxsize)  # short code -> campaign id
+        self.hits = 0
+        self.misses = 0
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool):
+        """Count a lookup for the hit-rate metrics."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _store(self, campaign) -> CampaignResponse:
+        """Cache a campaign row under its ID and short code."""
+        snapshot = CampaignResponse.model_validate(campaign)
+        self.by_id.set(snapshot.id, snapshot)
+        self.by_short_code.set(snapshot.short_code, snapshot.id)
+        return snapshot
+
+    def get(self, db, campaign_id: int) -> CampaignResponse | None:
+        """
+        Return a campaign by its ID, reading the database only on a miss.
+
+        Args:
+            db: An open database session, used on a miss.
+            campaign_id (int): The campaign ID.
+
+        Returns:
+            CampaignResponse | None: The campaign, or None if it does not exist or was deleted.
+        """
+        snapshot = self.by_id.get(campaign_id)
+        self._count(snapshot is not None)
+        if snapshot is not None:
+            return snapshot
+        campaign = db.query(Campaign).filter(Campaign.id == campaign_id, Campaign.deleted_at.is_(None)).first()
+        return self._store(campaign) if campaign else None
+
+    def get_by_short_code(self, db, short_code: str) -> CampaignResponse | None:
+        """
+        Return a campaign by its short code, reading the database only on a miss.
+
+        Codes made by `generate_short_code` are decoded straight to the campaign ID
+        and served like `get`; legacy random codes go through the short code map
+        and, on a miss, the unique short code index.
+
+        Args:
+            db: An open database session, used on a miss.
+            short_code (str): The campaign short code.
+
+        Returns:
+            CampaignResponse | None: The campaign, or None if it does not exist or was deleted.
+        """
+        campaign_id = decode_short_code(short_code)
+        if campaign_id is not None:
+            snapshot = self.get(db, campaign_id)
+            if snapshot is not None and snapshot.short_code == short_code:
+                return snapshot
+
+        campaign_id = self.by_short_code.get(short_code)
+        snapshot = self.by_id.get(campaign_id) if campaign_id is not None else None
+        self._count(snapshot is not None)
+        if snapshot is not None:
+            return snapshot
+        campaign = db.query(Campaign).filter(Campaign.short_code == short_code, Campaign.deleted_at.is_(None)).first()
+        return self._store(campaign) if campaign else None
+
+    def invalidate(self, campaign_id: int, short_code: str | None = None, publish: bool = True):
+        """
+        Drop a campaign from the cache.
+
+        Args:
+            campaign_id (int): The campaign ID.
+            short_code (str | None, optional): Its short code, when known.
+            publish (bool, optional): Notify the invalidation listeners (other processes).
+                Pass False when applying an invalidation received from them. Defaults to True.
+        """
+        snapshot = self.by_id.delete(campaign_id)
+        for code in {short_code, snapshot.short_code if snapshot else None} - {None}:
+            self.by_short_code.delete(code)
+        if not publish:
+            return
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(campaign_id, short_code)
+            except Exception:
+                logger.exception("Campaign cache invalidation listener failed")
+
+    def add_invalidation_listener(self, listener):
+        """
+        Register a callback run with `(campaign_id, short_code)` after each local invalidation.
+
+        This is the hook for multi-process deployments: publish the invalidation to
+        the other processes, which apply it with `invalidate(..., publish=False)`.
+
+        Args:
+            listener: A callable taking the campaign ID and short code.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def clear(self):
+        """Drop every cached campaign and reset the counters."""
+        self.by_id.clear()
+        self.by_short_code.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Return the cache metrics.
+
+        Returns:
+            dict: Hits, misses and hit rate of campaign lookups, and the number of cached campaigns.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": self.by_id.stats()["size"],
+            }
+
+
+# Campaign cache shared by the request handlers of this process
+campaign_cache = CampaignCache(ttl=CAMPAIGN_CACHE_TTL, maxsize=CAMPAIGN_CACHE_SIZE)
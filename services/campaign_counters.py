@@ -0,0 +1,164 @@
+from sqlalchemy import text
+
+
+def reconcile_feedback_counts(db, campaign_ids: list[int] | None = None, include_archived: bool = False) -> int:
+    """
+    Repair `campaign.feedback_count` from the feedbacks table.
+
+    The counter is kept in sync by triggers, so this is only needed after
+    manual data fixes or restores made with the triggers disabled. Archived
+    campaigns keep the count of their archived feedbacks and are skipped.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int] | None, optional): Restrict the repair to these campaigns.
+            Defaults to every campaign.
+        include_archived (bool, optional): Also recount archived campaigns from their live
+            feedbacks (used when restoring them). Defaults to False.
+
+    Returns:
+        int: The number of campaigns whose counter was corrected.
+    """
+    actual_count = "(SELECT COUNT(*) FROM feedbacks WHERE feedbacks.campaign_id = campaign.id)"
+    statement = f"UPDATE campaign SET feedback_count = {actual_count} WHERE feedback_count != {actual_count}"
+    if not include_archived:
+        statement += " AND archived_at IS NULL"
+    params = {}
+    if campaign_ids:
+        placeholders = ", ".join(f":id_{i}" for i in range(len(campaign_ids)))
+        statement += f" AND id IN ({placeholders})"
+        params = {f"id_{i}": campaign_id for i, campaign_id in enumerate(campaign_ids)}
+
+    result = db.execute(text(statement), params)
+    db.commit()
+    return result.rowcount
+
+
+def _rebuild_conditions(campaign_ids: list[int] | None, include_archived: bool) -> tuple[list[str], dict]:
+    """Return the `campaign_id` conditions and parameters selecting the campaigns to rebuild."""
+    conditions = []
+    params = {}
+    if campaign_ids:
+        placeholders = ", ".join(f":id_{i}" for i in range(len(campaign_ids)))
+        conditions.append(f"campaign_id IN ({placeholders})")
+        params = {f"id_{i}": campaign_id for i, campaign_id in enumerate(campaign_ids)}
+    if not include_archived:
+        conditions.append("campaign_id NOT IN (SELECT id FROM campaign WHERE archived_at IS NOT NULL)")
+    return conditions, params
+
+
+def rebuild_campaign_stats(db, campaign_ids: list[int] | None = None, include_archived: bool = False) -> int:
+    """
+    Recompute `campaign_stats` from the feedback analyses.
+
+    The statistics are kept in sync by triggers, so this is only needed after
+    manual data fixes or restores made with the triggers disabled, or to clear
+    the rounding drift that long runs of sentiment updates leave in `sentiment_sum`.
+    Archived campaigns keep the statistics of their archived analyses and are skipped.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int] | None, optional): Restrict the rebuild to these campaigns.
+            Defaults to every campaign.
+        include_archived (bool, optional): Also rebuild archived campaigns from their live
+            analyses (used when restoring them). Defaults to False.
+
+    Returns:
+        int: The number of campaigns with statistics after the rebuild.
+    """
+    conditions, params = _rebuild_conditions(campaign_ids, include_archived)
+    condition = " AND ".join(conditions)
+
+    db.execute(text("DELETE FROM campaign_stats" + (f" WHERE {condition}" if condition else "")), params)
+    result = db.execute(text(
+        f"""INSERT INTO campaign_stats (
+            campaign_id, analyzed_count, sentiment_sum, star_rating_sum, positive_count, neutral_count, negative_count,
+            star_1_count, star_2_count, star_3_count, star_4_count, star_5_count
+        )
+        SELECT f.campaign_id, COUNT(*), SUM(a.sentiment), SUM(a.star_rating),
+            SUM(a.sentiment_category = 'POSITIVE'), SUM(a.sentiment_category = 'NEUTRAL'), SUM(a.sentiment_category = 'NEGATIVE'),
+            SUM(a.star_rating = 1), SUM(a.star_rating = 2), SUM(a.star_rating = 3), SUM(a.star_rating = 4), SUM(a.star_rating = 5)
+        FROM feedback_analysis AS a JOIN feedbacks AS f ON f.id = a.feedback_id
+        {"WHERE " + " AND ".join(f"f.{c}" for c in conditions) if conditions else ""}
+        GROUP BY f.campaign_id"""
+    ), params)
+    db.commit()
+    return result.rowcount
+
+
+def rebuild_analytics_cube(db, campaign_ids: list[int] | None = None, include_archived: bool = False) -> int:
+    """
+    Recompute the `analytics_cube` rollup from the feedback analyses.
+
+    The cube is kept in sync by triggers, so this is only needed after manual
+    data fixes or restores made with the triggers disabled, or to clear the
+    rounding drift of `sentiment_sum`. Archived campaigns keep the cells of
+    their archived analyses and are skipped.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int] | None, optional): Restrict the rebuild to these campaigns.
+            Defaults to every campaign.
+        include_archived (bool, optional): Also rebuild archived campaigns from their live
+            analyses (used when restoring them). Defaults to False.
+
+    Returns:
+        int: The number of cells after the rebuild.
+    """
+    conditions, params = _rebuild_conditions(campaign_ids, include_archived)
+    condition = " AND ".join(conditions)
+
+    db.execute(text("DELETE FROM analytics_cube" + (f" WHERE {condition}" if condition else "")), params)
+    result = db.execute(text(
+        f"""INSERT INTO analytics_cube (
+            campaign_id, day, sentiment_category, star_rating, gender, age_range, education_level, country, state,
+            language, analysis_count, sentiment_sum, star_rating_sum, word_count_sum, feedback_length_sum
+        )
+        SELECT f.campaign_id, date(f.created_at), a.sentiment_category, a.star_rating, f.gender, f.age_range,
+            f.education_level, f.country, f.state, a.detected_language, COUNT(*), SUM(a.sentiment), SUM(a.star_rating),
+            SUM(a.word_count), SUM(a.feedback_length)
+        FROM feedback_analysis AS a JOIN feedbacks AS f ON f.id = a.feedback_id
+        {"WHERE " + " AND ".join(f"f.{c}" for c in conditions) if conditions else ""}
+        GROUP BY f.campaign_id, date(f.created_at), a.sentiment_category, a.star_rating, f.gender, f.age_range,
+            f.education_level, f.country, f.state, a.detected_language"""
+    ), params)
+    db.commit()
+    return result.rowcount
+
+
+def rebuild_campaign_hourly_stats(db, campaign_ids: list[int] | None = None, include_archived: bool = False) -> int:
+    """
+    Recompute `campaign_hourly_stats` from the feedback analyses.
+
+    The hourly statistics are kept in sync by triggers, so this is only needed
+    after manual data fixes or restores made with the triggers disabled, or to
+    clear the rounding drift of `sentiment_sum`. Archived campaigns keep the
+    hours of their archived analyses and are skipped.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int] | None, optional): Restrict the rebuild to these campaigns.
+            Defaults to every campaign.
+        include_archived (bool, optional): Also rebuild archived campaigns from their live
+            analyses (used when restoring them). Defaults to False.
+
+    Returns:
+        int: The number of campaign hours after the rebuild.
+    """
+    conditions, params = _rebuild_conditions(campaign_ids, include_archived)
+    condition = " AND ".join(conditions)
+
+    db.execute(text("DELETE FROM campaign_hourly_stats" + (f" WHERE {condition}" if condition else "")), params)
+    result = db.execute(text(
+        f"""INSERT INTO campaign_hourly_stats (
+            campaign_id, hour, analysis_count, sentiment_sum, positive_count, neutral_count, negative_count
+        )
+        SELECT f.campaign_id, strftime('%Y-%m-%d %H:00:00', f.created_at), COUNT(*), SUM(a.sentiment),
+            SUM(a.sentiment_category = 'POSITIVE'), SUM(a.sentiment_category = 'NEUTRAL'),
+            SUM(a.sentiment_category = 'NEGATIVE')
+        FROM feedback_analysis AS a JOIN feedbacks AS f ON f.id = a.feedback_id
+        {"WHERE " + " AND ".join(f"f.{c}" for c in conditions) if conditions else ""}
+        GROUP BY f.campaign_id, strftime('%Y-%m-%d %H:00:00', f.created_at)"""
+    ), params)
+    db.commit()
+    return result.rowcount
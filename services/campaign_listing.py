@@ -0,0 +1,58 @@
+from sqlalchemy import String, func, type_coerce
+from model import Campaign, CampaignStats
+
+# Statistic columns of the listing, in response order, read from the maintained campaign_stats
+# row; campaigns without analyses count zero and have no average
+CAMPAIGN_STAT_COLUMNS = {
+    "analyzed_count": func.coalesce(CampaignStats.analyzed_count, 0),
+    "average_sentiment": CampaignStats.sentiment_sum / func.nullif(CampaignStats.analyzed_count, 0),
+    "positive_count": func.coalesce(CampaignStats.positive_count, 0),
+    "neutral_count": func.coalesce(CampaignStats.neutral_count, 0),
+    "negative_count": func.coalesce(CampaignStats.negative_count, 0),
+}
+
+# Unique sort keys of the campaign listing (created_at compared as stored text, see FEEDBACK_SORT_KEYS)
+CAMPAIGN_SORT_KEYS = {
+    "created_at": [type_coerce(Campaign.created_at, String), Campaign.id],
+    "feedback_count": [Campaign.feedback_count, Campaign.id],
+    **{name: [column, Campaign.id] for name, column in CAMPAIGN_STAT_COLUMNS.items()},
+}
+
+
+def build_campaign_listing_query(db, sort: str = "created_at"):
+    """
+    Build the campaign listing query, joining each campaign to its analysis statistics.
+
+    The statistics are read from `campaign_stats`, kept up to date by triggers as
+    analyses are written, so a page costs a single query and no scan of the analyses.
+    Sorting by `average_sentiment` only lists campaigns with at least one analysis
+    (the average is undefined otherwise), like sorting feedbacks by an analysis field.
+
+    Args:
+        db: An open database session.
+        sort (str, optional): The sort field, a key of CAMPAIGN_SORT_KEYS. Defaults to "created_at".
+
+    Returns:
+        Query: Rows of (Campaign, analyzed_count, average_sentiment, positive_count, neutral_count, negative_count).
+    """
+    query = db.query(Campaign, *CAMPAIGN_STAT_COLUMNS.values()).filter(Campaign.deleted_at.is_(None))
+    if sort == "average_sentiment":
+        return query.join(CampaignStats, CampaignStats.campaign_id == Campaign.id).filter(CampaignStats.analyzed_count > 0)
+    return query.outerjoin(CampaignStats, CampaignStats.campaign_id == Campaign.id)
+
+
+def count_campaigns(db, sort: str = "created_at") -> int:
+    """
+    Count the campaigns listed by `build_campaign_listing_query`.
+
+    Args:
+        db: An open database session.
+        sort (str, optional): The sort field of the listing. Defaults to "created_at".
+
+    Returns:
+        int: The number of campaigns across all pages.
+    """
+    query = db.query(func.count(Campaign.id)).filter(Campaign.deleted_at.is_(None))
+    if sort == "average_sentiment":
+        query = query.join(CampaignStats, CampaignStats.campaign_id == Campaign.id).filter(CampaignStats.analyzed_count > 0)
+    return query.scalar()
@@ -0,0 +1,201 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from queue import Queue
+from sqlalchemy import select
+from config import SessionLocal, CAMPAIGN_PURGE_CHUNK_SIZE
+from model import Campaign, Feedback, FeedbackAnalysis, dashboard_campaign
+
+logger = logging.getLogger(__name__)
+
+# Status values of a campaign purge
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def delete_campaign_feedbacks(db, campaign_id: int, chunk_size: int, on_chunk=None) -> int:
+    """
+    Delete a campaign's feedbacks and their analyses in chunks, committing after each one.
+
+    Rows are deleted with table-level DELETEs, so nothing is loaded into the session,
+    and the write lock is released between chunks. The database triggers keep the
+    campaign counters, the search index and `campaign_stats` in step.
+
+    Args:
+        db: An open database session.
+        campaign_id (int): The campaign ID.
+        chunk_size (int): Feedbacks deleted per transaction.
+        on_chunk (callable, optional): Called with the running total after each chunk.
+
+    Returns:
+        int: The number of feedbacks deleted.
+    """
+    deleted = 0
+    while True:
+        # Walk the (campaign_id, id) index; only the IDs of one chunk are ever held
+        ids = db.execute(
+            select(Feedback.id)
+            .where(Feedback.campaign_id == campaign_id)
+            .order_by(Feedback.id)
+            .limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return deleted
+        db.execute(FeedbackAnalysis.__table__.delete().where(FeedbackAnalysis.feedback_id.in_(ids)))
+        db.execute(Feedback.__table__.delete().where(Feedback.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+        if on_chunk:
+            on_chunk(deleted)
+
+
+class CampaignPurger:
+    """
+    Background deletion of campaigns and everything they own.
+
+    `mark_deleted` hides a campaign at once (it sets `deleted_at` and clears
+    `active`, so no feedback can be added anymore) and queues it. A worker
+    thread then deletes its analyses and feedbacks in chunks of `chunk_size`
+    feedbacks (see `delete_campaign_feedbacks`). The campaign row goes last,
+    with its cold-storage archive if it has one.
+
+    Progress is kept in memory per campaign. Campaigns left half purged by a
+    restart are picked up again by `resume`; until a process has a job for
+    them, `progress` reports them as pending from their `deleted_at`.
+    """
+
+    def __init__(self, chunk_size: int = 1000):
+        self.chunk_size = chunk_size
+        self.jobs = {}  # campaign id -> progress dict
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the background worker."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def mark_deleted(self, db, campaign) -> dict:
+        """
+        Soft-delete a campaign and queue the purge of its feedbacks.
+
+        Args:
+            db: An open database session; the change is committed.
+            campaign (Campaign): The campaign to delete.
+
+        Returns:
+            dict: The progress of the purge.
+        """
+        campaign.deleted_at = datetime.now(timezone.utc)
+        campaign.active = False
+        db.commit()
+        return self._enqueue(campaign.id, campaign.feedback_count)
+
+    def resume(self) -> int:
+        """
+        Queue the purge of every campaign deleted but not purged yet (e.g. before a restart).
+
+        Returns:
+            int: The number of campaigns queued.
+        """
+        with SessionLocal() as db:
+            pending = db.query(Campaign.id, Campaign.feedback_count).filter(Campaign.deleted_at.isnot(None)).all()
+        for campaign_id, feedback_count in pending:
+            self._enqueue(campaign_id, feedback_count)
+        return len(pending)
+
+    def _enqueue(self, campaign_id: int, total: int) -> dict:
+        """Register a purge job and hand it to the worker."""
+        with self._lock:
+            job = self.jobs.get(campaign_id)
+            if job and job["status"] in (STATUS_PENDING, STATUS_RUNNING):
+                return dict(job)
+            job = {
+                "campaign_id": campaign_id,
+                "status": STATUS_PENDING,
+                "total": total,
+                "deleted": 0,
+                "error": None,
+            }
+            self.jobs[campaign_id] = job
+        self._queue.put(campaign_id)
+        return dict(job)
+
+    def progress(self, campaign_id: int) -> dict | None:
+        """
+        Return the progress of a campaign purge.
+
+        Args:
+            campaign_id (int): The campaign ID.
+
+        Returns:
+            dict | None: `status`, `total` and `deleted` feedbacks, and the `error` of a
+            failed purge, or None if the campaign is neither being purged nor soft-deleted.
+        """
+        with self._lock:
+            job = self.jobs.get(campaign_id)
+            if job:
+                return dict(job)
+
+        # No job here (restart, or another process): a soft-deleted campaign is still waiting for its purge
+        with SessionLocal() as db:
+            remaining = db.execute(
+                select(Campaign.feedback_count).where(Campaign.id == campaign_id, Campaign.deleted_at.isnot(None))
+            ).scalar_one_or_none()
+        if remaining is None:
+            return None
+        return {"campaign_id": campaign_id, "status": STATUS_PENDING, "total": remaining, "deleted": 0, "error": None}
+
+    def _update(self, campaign_id: int, **values):
+        """Update the progress of a purge."""
+        with self._lock:
+            self.jobs[campaign_id].update(values)
+
+    def _run(self):
+        """Background worker loop."""
+        while True:
+            campaign_id = self._queue.get()
+            try:
+                self.purge(campaign_id)
+            except Exception as e:
+                # Keep the worker alive for the next campaigns
+                logger.exception("Purge of campaign %s failed", campaign_id)
+                self._update(campaign_id, status=STATUS_FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def wait(self):
+        """Block until every queued purge has finished."""
+        self._queue.join()
+
+    def purge(self, campaign_id: int) -> int:
+        """
+        Delete a soft-deleted campaign, its feedbacks and their analyses, chunk by chunk.
+
+        Args:
+            campaign_id (int): The campaign ID.
+
+        Returns:
+            int: The number of feedbacks deleted.
+        """
+        self._update(campaign_id, status=STATUS_RUNNING)
+        with SessionLocal() as db:
+            deleted = delete_campaign_feedbacks(
+                db, campaign_id, self.chunk_size, on_chunk=lambda done: self._update(campaign_id, deleted=done)
+            )
+            db.execute(dashboard_campaign.delete().where(dashboard_campaign.c.campaign_id == campaign_id))
+            db.execute(Campaign.__table__.delete().where(Campaign.id == campaign_id, Campaign.deleted_at.isnot(None)))
+            db.commit()
+        # Imported here: the archive service builds on delete_campaign_feedbacks from this module
+        from services.campaign_archive import remove_campaign_archive
+        remove_campaign_archive(campaign_id)
+        self._update(campaign_id, status=STATUS_DONE)
+        return deleted
+
+
+# Purger used by delete_campaign, with its worker started for this process
+campaign_purger = CampaignPurger(chunk_size=CAMPAIGN_PURGE_CHUNK_SIZE)
+campaign_purger.start()
@@ -0,0 +1,29 @@
+import hashlib
+import json
+from config import COMPONENT_CACHE_TTL, COMPONENT_CACHE_SIZE
+from utils import TTLCache
+
+# Computed dashboard component data, keyed by component, settings and campaign data versions
+component_data_cache = TTLCache(ttl=COMPONENT_CACHE_TTL, maxsize=COMPONENT_CACHE_SIZE)
+
+
+def component_cache_key(component, campaigns) -> tuple:
+    """
+    Build the cache key of a component's data.
+
+    The key holds the component ID, a hash of its type and settings, and the data
+    version of every campaign it aggregates: `feedback_count` (moved by feedback
+    inserts) and `data_version` (bumped by triggers on every analysis write and
+    feedback change or delete). Any change to the underlying data produces a new
+    key, so cached entries never need to be invalidated; stale ones age out of the LRU.
+
+    Args:
+        component (Component): The dashboard component.
+        campaigns (list[Campaign]): The campaigns the component aggregates.
+
+    Returns:
+        tuple: A hashable cache key.
+    """
+    settings = json.dumps([component.type.value, component.settings or {}], sort_keys=True, default=str)
+    versions = tuple(sorted((campaign.id, campaign.feedback_count, campaign.data_version) for campaign in campaigns))
+    return component.id, hashlib.sha1(settings.encode()).hexdigest(), versions
@@ -0,0 +1,109 @@
+from sqlalchemy import func
+from model import AnalyticsCube, Feedback, FeedbackAnalysis
+
+# Chart axes grouped by a dimension of the analytics cube
+CUBE_DIMENSIONS = {
+    "sentiment_category": AnalyticsCube.sentiment_category,
+    "gender": AnalyticsCube.gender,
+    "age_range": AnalyticsCube.age_range,
+    "education_level": AnalyticsCube.education_level,
+    "country": AnalyticsCube.country,
+    "state": AnalyticsCube.state,
+    "star_rating": AnalyticsCube.star_rating,
+    "language": AnalyticsCube.language,
+}
+
+# Numeric analysis fields a chart can average, as their sum in the cube
+CUBE_MEASURES = {
+    "sentiment": AnalyticsCube.sentiment_sum,
+    "word_count": AnalyticsCube.word_count_sum,
+    "feedback_length": AnalyticsCube.feedback_length_sum,
+    "star_rating": AnalyticsCube.star_rating_sum,
+}
+
+# Continuous analysis fields, grouped by exact value from the analyses themselves (too many distinct values for the cube)
+ANALYSIS_VALUE_AXES = {
+    "sentiment": FeedbackAnalysis.sentiment,
+    "word_count": FeedbackAnalysis.word_count,
+    "feedback_length": FeedbackAnalysis.feedback_length,
+}
+
+
+def build_chart_query(db, campaign_ids: list[int], x_axis: str = "sentiment_category", y_axis: str = "count"):
+    """
+    Build the query of a bar, line or pie chart over a set of campaigns.
+
+    Categorical axes are read from `analytics_cube`, kept up to date by triggers
+    as analyses are written, so the cost depends on the number of populated cells
+    rather than on the number of feedbacks. Averages are computed from the cells'
+    sums and counts. Only the continuous x axes (sentiment, word count, feedback
+    length) still group the analyses themselves.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int]): The campaigns to aggregate.
+        x_axis (str, optional): The grouping field; unknown fields fall back to
+            "sentiment_category". Defaults to "sentiment_category".
+        y_axis (str, optional): "count", or a numeric analysis field to average
+            (other fields count). Defaults to "count".
+
+    Returns:
+        Query: Rows of (label, value), one per distinct x value.
+    """
+    if x_axis in ANALYSIS_VALUE_AXES:
+        x_field = ANALYSIS_VALUE_AXES[x_axis]
+        if y_axis in CUBE_MEASURES:
+            y_expression = func.avg(getattr(FeedbackAnalysis, y_axis))
+        else:
+            y_expression = func.count()
+        return db.query(x_field.label("label"), y_expression.label("value")).select_from(FeedbackAnalysis).join(
+            Feedback, FeedbackAnalysis.feedback_id == Feedback.id
+        ).filter(Feedback.campaign_id.in_(campaign_ids)).group_by(x_field)
+
+    x_field = CUBE_DIMENSIONS.get(x_axis, AnalyticsCube.sentiment_category)
+    if y_axis in CUBE_MEASURES:
+        y_expression = func.sum(CUBE_MEASURES[y_axis]) * 1.0 / func.sum(AnalyticsCube.analysis_count)
+    else:
+        y_expression = func.sum(AnalyticsCube.analysis_count)
+    return db.query(x_field.label("label"), y_expression.label("value")).filter(
+        AnalyticsCube.campaign_id.in_(campaign_ids)
+    ).group_by(x_field)
+
+
+def chart_axes(x_axis: str = "sentiment_category", y_axis: str = "count") -> tuple[str, str]:
+    """
+    Resolve the axes of a chart the way build_chart_query reads them.
+
+    Args:
+        x_axis (str, optional): The requested grouping field. Defaults to "sentiment_category".
+        y_axis (str, optional): The requested value field. Defaults to "count".
+
+    Returns:
+        tuple[str, str]: The effective x axis (unknown fields become "sentiment_category")
+        and y axis (a key of CUBE_MEASURES, or "count").
+    """
+    if x_axis not in ANALYSIS_VALUE_AXES and x_axis not in CUBE_DIMENSIONS:
+        x_axis = "sentiment_category"
+    return x_axis, y_axis if y_axis in CUBE_MEASURES else "count"
+
+
+def build_shared_chart_query(db, campaign_ids: list[int], x_axis: str, measures: list[str]):
+    """
+    Build one analytics cube query serving every chart grouped by the same dimension.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int]): The campaigns to aggregate.
+        x_axis (str): A key of CUBE_DIMENSIONS.
+        measures (list[str]): Keys of CUBE_MEASURES the charts average.
+
+    Returns:
+        Query: Rows of (label, analysis_count, one sum per measure, labelled by its name), one
+        per distinct x value; a chart's average is the sum of its measure divided by `analysis_count`.
+    """
+    x_field = CUBE_DIMENSIONS[x_axis]
+    return db.query(
+        x_field.label("label"),
+        func.sum(AnalyticsCube.analysis_count).label("analysis_count"),
+        *[func.sum(CUBE_MEASURES[measure]).label(measure) for measure in measures],
+    ).filter(AnalyticsCube.campaign_id.in_(campaign_ids)).group_by(x_field)
@@ -0,0 +1,185 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from config import DASHBOARD_DATA_WORKERS, WORD_CLOUD_DEFAULT_LIMIT, WORD_CLOUD_MAX_LIMIT
+from services.component_cache import component_cache_key, component_data_cache
+from services.dashboard_charts import CUBE_DIMENSIONS, build_chart_query, build_shared_chart_query, chart_axes
+from services.sentiment_summary import SENTIMENT_BREAKDOWNS, sentiment_summary, sentiment_breakdown
+from services.trend_analysis import trend_series
+from services.word_frequency import top_words
+
+# Component types drawn as charts over the analytics cube or the analyses
+CHART_TYPES = ["bar_chart", "line_chart", "pie_chart"]
+
+
+def _chart_payload(rows: list[tuple]) -> dict:
+    """Turn (label, value) chart rows into a chart payload."""
+    if not rows:
+        return {"data": {"message": "No chart data available"}}
+    return {
+        "labels": [label.value if hasattr(label, "value") else str(label) for label, _ in rows],
+        "values": [float(value) if value else 0 for _, value in rows],
+    }
+
+
+def compute_component_data(db, component, campaign_ids: list[int]) -> dict:
+    """
+    Compute the data payload of a dashboard component over a set of campaigns.
+
+    Args:
+        db: An open database session.
+        component (Component): The dashboard component.
+        campaign_ids (list[int]): The campaigns it aggregates.
+
+    Returns:
+        dict: The component data, or a `message` payload for invalid settings or missing data.
+    """
+    # Handle different component types
+    if component.type.value in CHART_TYPES:
+        x_axis = component.settings.get("x_axis", "sentiment_category")
+        y_axis = component.settings.get("y_axis", "count")
+
+        # Served from the analytics cube (see build_chart_query)
+        chart_data = build_chart_query(db, campaign_ids, x_axis, y_axis).all()
+        data_payload = _chart_payload([(row.label, row.value) for row in chart_data])
+
+    elif component.type.value == "word_cloud":
+        # Top words from the maintained per-campaign word counts (see top_words)
+        settings = component.settings or {}
+        try:
+            limit = min(max(int(settings.get("limit", WORD_CLOUD_DEFAULT_LIMIT)), 1), WORD_CLOUD_MAX_LIMIT)
+            start_date = date.fromisoformat(settings["start_date"]) if settings.get("start_date") else None
+            end_date = date.fromisoformat(settings["end_date"]) if settings.get("end_date") else None
+        except (TypeError, ValueError):
+            return {"data": {"message": "Invalid word cloud settings: limit must be an integer, dates YYYY-MM-DD"}}
+        data_payload = {
+            "words": [[word, count] for word, count in top_words(db, campaign_ids, limit, start_date, end_date)]
+        }
+
+    elif component.type.value == "sentiment_analysis":
+        # Totals read from the maintained campaign_stats rows, breakdowns aggregated in the database
+        breakdowns = (component.settings or {}).get("breakdowns", [])
+        unknown = [name for name in breakdowns if name not in SENTIMENT_BREAKDOWNS]
+        if unknown:
+            return {"data": {"message": f"Unknown sentiment breakdowns: {', '.join(map(str, unknown))}"}}
+        data_payload = sentiment_summary(db, campaign_ids)
+        if data_payload:
+            if breakdowns:
+                data_payload["breakdowns"] = {name: sentiment_breakdown(db, campaign_ids, name) for name in breakdowns}
+        else:
+            data_payload = {"data": {"message": "No sentiment data available"}}
+
+    elif component.type.value == "trend_analysis":
+        # Bucketed from the maintained hourly statistics, smoothed with a vectorized EMA (see trend_series)
+        settings = component.settings or {}
+        try:
+            start_date = date.fromisoformat(settings["start_date"]) if settings.get("start_date") else None
+            end_date = date.fromisoformat(settings["end_date"]) if settings.get("end_date") else None
+            window = max(int(settings["window"]), 1) if settings.get("window") else None
+            data_payload = trend_series(
+                db,
+                campaign_ids,
+                granularity=settings.get("granularity", "day"),
+                timezone=settings.get("timezone", "UTC"),
+                start_date=start_date,
+                end_date=end_date,
+                window=window,
+                fill_gaps=bool(settings.get("fill_gaps", False)),
+            )
+        except (TypeError, ValueError) as e:
+            return {"data": {"message": f"Invalid trend settings: {e}"}}
+        if not data_payload:
+            data_payload = {"data": {"message": "No trend data available"}}
+
+    else:
+        data_payload = {"message": "Component type not mapped"}
+
+    return data_payload
+
+
+def _single_component(db, campaign_ids: list[int], settings_hash: str, component) -> dict:
+    """Compute a component on its own, keyed by its settings hash."""
+    return {settings_hash: compute_component_data(db, component, campaign_ids)}
+
+
+def _shared_charts(db, campaign_ids: list[int], x_axis: str, charts: dict) -> dict:
+    """Compute every chart grouped by the same cube dimension from one query, per settings hash."""
+    measures = sorted({y_axis for _, y_axis in charts.values() if y_axis != "count"})
+    rows = build_shared_chart_query(db, campaign_ids, x_axis, measures).all()
+    return {
+        settings_hash: _chart_payload([
+            (row.label, row.analysis_count if y_axis == "count" else getattr(row, y_axis) * 1.0 / row.analysis_count)
+            for row in rows
+        ])
+        for settings_hash, (_, y_axis) in charts.items()
+    }
+
+
+def compute_dashboard_data(db, components: list, campaigns: list, session_factory=None,
+                           max_workers: int = DASHBOARD_DATA_WORKERS) -> dict[int, dict]:
+    """
+    Compute the data payloads of all the components of a dashboard together.
+
+    The components are planned as a whole: payloads still in the component data
+    cache are reused; components with the same type and settings are computed
+    once; and bar, line and pie charts grouped by the same analytics cube
+    dimension share a single query that sums every measure they average. The
+    remaining independent parts run concurrently, each in its own session from
+    `session_factory` (sessions are not thread-safe), inside the caller's
+    context so their queries are still counted by the request instrumentation.
+
+    Args:
+        db: An open database session, used for the cache keys and when a single part is left.
+        components (list[Component]): The dashboard components.
+        campaigns (list[Campaign]): The campaigns they aggregate.
+        session_factory (callable | None, optional): Opens a session for each concurrent part.
+            Defaults to None (every part runs in `db`, one after the other).
+        max_workers (int, optional): Parts computed at the same time. Defaults to DASHBOARD_DATA_WORKERS.
+
+    Returns:
+        dict[int, dict]: The data payload of each component, by component ID.
+    """
+    campaign_ids = [campaign.id for campaign in campaigns]
+    keys = {component.id: component_cache_key(component, campaigns) for component in components}
+    payloads = {}
+    pending = {}
+    for component in components:
+        payload = component_data_cache.get(keys[component.id])
+        if payload is not None:
+            payloads[component.id] = payload
+        else:
+            # The cache key holds a hash of the type and settings: identical components are computed once
+            pending.setdefault(keys[component.id][1], component)
+
+    # Plan the parts: one per cube dimension shared by charts, one per other component
+    shared = {}
+    parts = []
+    for settings_hash, component in pending.items():
+        settings = component.settings or {}
+        x_axis, y_axis = chart_axes(settings.get("x_axis", "sentiment_category"), settings.get("y_axis", "count"))
+        if component.type.value in CHART_TYPES and x_axis in CUBE_DIMENSIONS:
+            shared.setdefault(x_axis, {})[settings_hash] = (component, y_axis)
+        else:
+            parts.append((_single_component, (settings_hash, component)))
+    parts.extend((_shared_charts, (x_axis, charts)) for x_axis, charts in shared.items())
+
+    def run(function, args) -> dict:
+        """Compute a part in its own session."""
+        with session_factory() as part_db:
+            return function(part_db, campaign_ids, *args)
+
+    computed = {}
+    if session_factory is None or max_workers <= 1 or len(parts) <= 1:
+        for function, args in parts:
+            computed.update(function(db, campaign_ids, *args))
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(parts))) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, run, *part) for part in parts]
+            for future in futures:
+                computed.update(future.result())
+
+    for component in components:
+        if component.id not in payloads:
+            payloads[component.id] = computed[keys[component.id][1]]
+            component_data_cache.set(keys[component.id], payloads[component.id])
+    return payloads
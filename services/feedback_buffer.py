@@ -0,0 +1,320 @@
+import fcntl
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert
+from config import (
+    SessionLocal,
+    FEEDBACK_BUFFER_BATCH_SIZE,
+    FEEDBACK_BUFFER_MAX_LATENCY_MS,
+    FEEDBACK_BUFFER_LOG_PATH,
+    FEEDBACK_BUFFER_FSYNC,
+    FEEDBACK_BUFFER_STATUS_TTL,
+)
+from model import IngestionCheckpoint
+from schemas import FeedbackBulkItem
+from services.feedback_ingestion import FeedbackIngestor
+from utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Status values of a buffered feedback
+STATUS_PENDING = "pending"
+
+# Seconds to wait before retrying a batch the database could not take
+FLUSH_RETRY_DELAY = 1.0
+
+
+class FeedbackBuffer:
+    """
+    Write-behind buffer for feedback submissions.
+
+    `submit` appends a validated submission to a local write-ahead log, syncs it
+    to disk and returns a provisional id right away. A background writer then
+    inserts the buffered feedbacks in group commits of up to `batch_size`
+    items, waiting at most `max_latency_ms` after the oldest one arrived.
+    Campaign rules are applied at flush time by the bulk ingestor, and each
+    outcome (the feedback id or the rejection message) is kept under the
+    provisional id for `status_ttl` seconds.
+
+    Every log entry carries a sequence number. The last sequence written to the
+    database is stored in `ingestion_checkpoint` in the same transaction as the
+    feedbacks, so after a crash the log is replayed from the checkpoint and no
+    submission is lost or inserted twice. The log is truncated whenever the
+    buffer drains.
+
+    Each process needs its own log: `start` takes an exclusive lock on the
+    first free slot of `log_path` (the path itself, then `log_path.1`,
+    `log_path.2`, ...) and writes there. A restarted process claims the slot a
+    dead one released and replays what it left behind.
+    """
+
+    def __init__(self, log_path: str, batch_size: int = 200, max_latency_ms: float = 50,
+                 fsync: bool = True, status_ttl: float = 3600):
+        self.log_path = log_path
+        self.batch_size = batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.fsync = fsync
+        self.results = TTLCache(ttl=status_ttl, maxsize=1_000_000)
+        self.pending = OrderedDict()  # provisional id -> log entry, in log order
+        self.sequence = 0
+        self.flushed = 0
+        self.rejected = 0
+        self.last_flush_lag_ms = 0.0
+        self.max_flush_lag_ms = 0.0
+        self._log = None
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._lock_file = None
+
+    def start(self):
+        """Claim a log slot, replay the entries of it that were not flushed yet, then start the background writer."""
+        self._claim_log()
+        self.recover()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _claim_log(self):
+        """Lock the first log slot no other process holds and make it the log of this buffer."""
+        base_path = self.log_path
+        directory = os.path.dirname(base_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        for slot in itertools.count():
+            path = base_path if slot == 0 else f"{base_path}.{slot}"
+            lock_file = open(path + ".lock", "a")
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+            # Held until the process exits
+            self._lock_file = lock_file
+            self.log_path = path
+            return
+
+    def recover(self):
+        """
+        Load the log entries written after the database checkpoint back into the buffer.
+
+        Returns:
+            int: The number of entries recovered.
+        """
+        with SessionLocal() as db:
+            checkpoint = db.get(IngestionCheckpoint, self.log_path)
+            self.sequence = checkpoint.sequence if checkpoint else 0
+
+        entries = []
+        if os.path.exists(self.log_path):
+            with open(self.log_path) as log:
+                for line in log:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn write at the end of the log: never acknowledged
+                    if entry["seq"] > self.sequence:
+                        entries.append(entry)
+
+        with self._condition:
+            # Rewrite the log with the recovered entries only, dropping flushed ones and any torn line
+            self._open_log(truncate=True)
+            for entry in entries:
+                self._log.write(json.dumps(entry) + "\n")
+                entry["accepted_at"] = time.monotonic()
+                self.pending[entry["id"]] = entry
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            if entries:
+                self.sequence = entries[-1]["seq"]
+            self._condition.notify()
+        return len(entries)
+
+    def _open_log(self, truncate: bool = False):
+        """Open the log for appending, optionally truncating it first."""
+        if self._log:
+            self._log.close()
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._log = open(self.log_path, "w" if truncate else "a")
+
+    def submit(self, values: dict) -> str:
+        """
+        Buffer a validated feedback submission.
+
+        The entry is durable once this returns: it is in the log (synced to disk
+        when `fsync` is enabled) and will be written by the next flush.
+
+        Args:
+            values (dict): The feedback values (campaign_id, demographics, message, user_ip, user_agent).
+
+        Returns:
+            str: The provisional id of the submission.
+        """
+        provisional_id = uuid.uuid4().hex
+        record = {key: getattr(value, "value", value) for key, value in values.items()}
+        with self._condition:
+            if self._log is None:
+                self._open_log()
+            self.sequence += 1
+            entry = {"seq": self.sequence, "id": provisional_id, "values": record}
+            self._log.write(json.dumps(entry) + "\n")
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            entry["accepted_at"] = time.monotonic()
+            self.pending[provisional_id] = entry
+            self._condition.notify()
+        return provisional_id
+
+    def status(self, provisional_id: str) -> dict | None:
+        """
+        Return the status of a buffered submission.
+
+        Args:
+            provisional_id (str): The id returned by `submit`.
+
+        Returns:
+            dict | None: `status` ("pending", "created" or "rejected") with the feedback
+            `id` or the rejection `message`, or None if the id is unknown or expired.
+        """
+        with self._condition:
+            if provisional_id in self.pending:
+                return {"status": STATUS_PENDING, "id": None, "message": None}
+        return self.results.get(provisional_id)
+
+    def _take_batch(self) -> list:
+        """Wait until a batch is full or its oldest entry is due, then return it (without removing it)."""
+        with self._condition:
+            while True:
+                if self.pending:
+                    oldest = next(iter(self.pending.values()))
+                    wait = oldest["accepted_at"] + self.max_latency - time.monotonic()
+                    if len(self.pending) >= self.batch_size or wait <= 0:
+                        return list(self.pending.values())[:self.batch_size]
+                    self._condition.wait(wait)
+                else:
+                    self._condition.wait()
+
+    def _run(self):
+        """Background writer loop."""
+        while True:
+            batch = self._take_batch()
+            try:
+                self.flush_batch(batch)
+            except Exception:
+                # Keep the writer alive; the batch stays pending and is retried
+                logger.exception("Feedback buffer flush failed; retrying in %.1fs", FLUSH_RETRY_DELAY)
+                time.sleep(FLUSH_RETRY_DELAY)
+
+    def flush(self) -> int:
+        """
+        Write everything buffered so far, in batches.
+
+        Returns:
+            int: The number of entries written (created or rejected).
+        """
+        written = 0
+        while True:
+            with self._condition:
+                batch = list(self.pending.values())[:self.batch_size]
+            if not batch:
+                return written
+            written += self.flush_batch(batch)
+
+    def flush_batch(self, batch: list) -> int:
+        """
+        Write one batch of log entries in a single transaction.
+
+        Args:
+            batch (list): Log entries, in log order.
+
+        Returns:
+            int: The number of entries written.
+        """
+        with self._flush_lock:
+            with self._condition:
+                batch = [entry for entry in batch if entry["id"] in self.pending]
+            if not batch:
+                return 0
+
+            last_sequence = batch[-1]["seq"]
+            with SessionLocal() as db:
+                # Move the checkpoint in the same transaction as the feedbacks
+                saved = []
+                def save_checkpoint(session):
+                    session.execute(
+                        insert(IngestionCheckpoint)
+                        .values(name=self.log_path, sequence=last_sequence)
+                        .on_conflict_do_update(index_elements=["name"], set_={"sequence": last_sequence})
+                    )
+                    saved.append(last_sequence)
+                event.listen(db, "before_commit", save_checkpoint)
+
+                ingestor = FeedbackIngestor(db)
+                entries = [
+                    (index, FeedbackBulkItem.model_validate(entry["values"]))
+                    for index, entry in enumerate(batch)
+                ]
+                # Bulk items carry no IP: each entry keeps the one its submission came from
+                user_ips = {index: entry["values"].get("user_ip") for index, entry in enumerate(batch)}
+                results = ingestor.ingest_chunk(entries, user_ips=user_ips)
+                if not saved:
+                    # No feedback of the batch was accepted, so nothing was committed yet
+                    db.commit()
+
+            now = time.monotonic()
+            lag_ms = (now - batch[0]["accepted_at"]) * 1000
+            with self._condition:
+                for entry, result in zip(batch, results):
+                    del self.pending[entry["id"]]
+                    self.results.set(entry["id"], {"status": result.status, "id": result.id, "message": result.message})
+                    if result.status == "created":
+                        self.flushed += 1
+                    else:
+                        self.rejected += 1
+                self.last_flush_lag_ms = lag_ms
+                self.max_flush_lag_ms = max(self.max_flush_lag_ms, lag_ms)
+                if not self.pending:
+                    # Everything in the log is in the database
+                    self._open_log(truncate=True)
+            return len(batch)
+
+    def stats(self) -> dict:
+        """
+        Return the buffer metrics.
+
+        Returns:
+            dict: Whether the background writer runs, pending entries, written totals and the
+            flush lag: the age of the oldest pending entry, and the delay between
+            acknowledgement and commit of the last batch.
+        """
+        with self._condition:
+            oldest = next(iter(self.pending.values()), None)
+            return {
+                "enabled": self._thread is not None,
+                "writer_alive": self._thread is not None and self._thread.is_alive(),
+                "pending": len(self.pending),
+                "flushed": self.flushed,
+                "rejected": self.rejected,
+                "flush_lag_ms": round((time.monotonic() - oldest["accepted_at"]) * 1000, 3) if oldest else 0.0,
+                "last_flush_lag_ms": round(self.last_flush_lag_ms, 3),
+                "max_flush_lag_ms": round(self.max_flush_lag_ms, 3),
+            }
+
+
+# Buffer used by create_feedback when FEEDBACK_BUFFER_ENABLED is set
+feedback_buffer = FeedbackBuffer(
+    FEEDBACK_BUFFER_LOG_PATH,
+    batch_size=FEEDBACK_BUFFER_BATCH_SIZE,
+    max_latency_ms=FEEDBACK_BUFFER_MAX_LATENCY_MS,
+    fsync=FEEDBACK_BUFFER_FSYNC,
+    status_ttl=FEEDBACK_BUFFER_STATUS_TTL,
+)
@@ -0,0 +1,246 @@
+import csv
+import io
+import json
+import zlib
+from config import EXPORT_BATCH_SIZE
+from model import Feedback, FeedbackAnalysis
+from services.feedback_filters import apply_feedback_filters
+
+# Supported export formats, mapped to their file extension and media type
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "ndjson": ("ndjson", "application/x-ndjson"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+# Exported columns, in order; analysis columns are empty for feedbacks not analyzed yet
+EXPORT_COLUMNS = [
+    ("feedback_id", Feedback.id),
+    ("campaign_id", Feedback.campaign_id),
+    ("created_at", Feedback.created_at),
+    ("age_range", Feedback.age_range),
+    ("gender", Feedback.gender),
+    ("education_level", Feedback.education_level),
+    ("country", Feedback.country),
+    ("state", Feedback.state),
+    ("message", Feedback.message),
+    ("sentiment_category", FeedbackAnalysis.sentiment_category),
+    ("sentiment_score", FeedbackAnalysis.sentiment),
+    ("star_rating", FeedbackAnalysis.star_rating),
+    ("word_count", FeedbackAnalysis.word_count),
+    ("feedback_length", FeedbackAnalysis.feedback_length),
+    ("detected_language", FeedbackAnalysis.detected_language),
+]
+
+# Names of the exported columns
+EXPORT_FIELDS = [name for name, _ in EXPORT_COLUMNS]
+
+
+def build_export_query(db, params):
+    """
+    Build the feedback export query: one row per feedback with its analysis, in id order.
+
+    Rows are streamed in batches of EXPORT_BATCH_SIZE (`yield_per`), so the
+    export holds a single batch in memory whatever the number of rows.
+
+    Args:
+        db: An open database session.
+        params: An object with the feedback filters, `created_from` and `created_to` as attributes.
+
+    Returns:
+        Query: The streaming export query.
+    """
+    query = db.query(*[column.label(name) for name, column in EXPORT_COLUMNS]).outerjoin(
+        FeedbackAnalysis, FeedbackAnalysis.feedback_id == Feedback.id
+    )
+    query, _ = apply_feedback_filters(query, params)
+    if getattr(params, "created_from", None):
+        query = query.filter(Feedback.created_at >= params.created_from)
+    if getattr(params, "created_to", None):
+        query = query.filter(Feedback.created_at < params.created_to)
+    return query.order_by(Feedback.id).yield_per(EXPORT_BATCH_SIZE)
+
+
+def export_records(rows):
+    """
+    Convert export rows into plain records (enums as their values, datetimes as ISO strings).
+
+    Args:
+        rows: An iterable of export query rows.
+
+    Yields:
+        dict: One record per row, keyed by EXPORT_FIELDS.
+    """
+    for row in rows:
+        record = {}
+        for name, value in zip(EXPORT_FIELDS, row):
+            if hasattr(value, "value"):
+                value = value.value
+            elif hasattr(value, "isoformat"):
+                value = value.isoformat()
+            record[name] = value
+        yield record
+
+
+def _batches(records, size: int):
+    """Group records into lists of at most `size` items."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(records):
+    """
+    Serialize records as CSV, one chunk per batch.
+
+    Args:
+        records: An iterable of export records.
+
+    Yields:
+        bytes: The header, then the encoded rows batch by batch.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for batch in _batches(records, EXPORT_BATCH_SIZE):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def stream_ndjson(records):
+    """
+    Serialize records as newline-delimited JSON, one chunk per batch.
+
+    Args:
+        records: An iterable of export records.
+
+    Yields:
+        bytes: The encoded lines, batch by batch.
+    """
+    for batch in _batches(records, EXPORT_BATCH_SIZE):
+        yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch).encode()
+
+
+class _ChunkSink:
+    """Write-only file object handing out what was written so far, for streaming Parquet output."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_parquet(records):
+    """
+    Serialize records as Parquet, one row group per batch.
+
+    Uses `pyarrow` (in requirements.txt), imported on first use; if it is missing, that is reported before any output is produced.
+
+    Args:
+        records: An iterable of export records.
+
+    Returns:
+        generator: The file contents as bytes, row group by row group, then the footer.
+
+    Raises:
+        ValueError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export requires the pyarrow package")
+
+    schema = pa.schema([
+        ("feedback_id", pa.int64()),
+        ("campaign_id", pa.int64()),
+        ("created_at", pa.string()),
+        ("age_range", pa.string()),
+        ("gender", pa.string()),
+        ("education_level", pa.string()),
+        ("country", pa.string()),
+        ("state", pa.string()),
+        ("message", pa.string()),
+        ("sentiment_category", pa.string()),
+        ("sentiment_score", pa.float64()),
+        ("star_rating", pa.int64()),
+        ("word_count", pa.int64()),
+        ("feedback_length", pa.int64()),
+        ("detected_language", pa.string()),
+    ])
+
+    def chunks():
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for batch in _batches(records, EXPORT_BATCH_SIZE):
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                yield sink.drain()
+        yield sink.drain()
+
+    return chunks()
+
+
+def gzip_stream(chunks):
+    """
+    Compress a stream of byte chunks into a single gzip stream.
+
+    Args:
+        chunks: An iterable of bytes.
+
+    Yields:
+        bytes: The compressed stream.
+    """
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(rows, export_format: str, compress: bool = False):
+    """
+    Serialize export rows in the requested format.
+
+    Args:
+        rows: An iterable of export query rows (e.g. `build_export_query(...)`).
+        export_format (str): One of EXPORT_FORMATS.
+        compress (bool, optional): Whether to gzip the output. Defaults to False.
+
+    Returns:
+        generator: The serialized export as byte chunks.
+
+    Raises:
+        ValueError: If the format needs an optional package that is not installed.
+    """
+    writers = {"csv": stream_csv, "ndjson": stream_ndjson, "parquet": stream_parquet}
+    chunks = writers[export_format](export_records(rows))
+    return gzip_stream(chunks) if compress else chunks
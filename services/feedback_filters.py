@@ -0,0 +1,88 @@
+from sqlalchemy import String, type_coerce
+from sqlalchemy.orm import contains_eager
+from model import Feedback, FeedbackAnalysis
+
+# Optional feedback filters accepted by the listing endpoints, mapped to their columns
+FEEDBACK_FILTER_COLUMNS = {
+    "campaign_id": Feedback.campaign_id,
+    "age_range": Feedback.age_range,
+    "gender": Feedback.gender,
+    "education_level": Feedback.education_level,
+    "country": Feedback.country,
+    "state": Feedback.state,
+}
+
+# Optional analysis filters, mapped to their column and comparison
+ANALYSIS_FILTER_COLUMNS = {
+    "sentiment_category": (FeedbackAnalysis.sentiment_category, "__eq__"),
+    "star_rating": (FeedbackAnalysis.star_rating, "__eq__"),
+    "min_sentiment": (FeedbackAnalysis.sentiment, "__ge__"),
+    "max_sentiment": (FeedbackAnalysis.sentiment, "__le__"),
+}
+
+# Unique sort keys of the feedback listings, each backed by an index. created_at is
+# compared as stored text so cursors match rows exactly, whatever the timestamp precision;
+# analysis sorts break ties on feedback_id, which equals the feedback id.
+FEEDBACK_SORT_KEYS = {
+    "created_at": [type_coerce(Feedback.created_at, String), Feedback.id],
+    "sentiment": [FeedbackAnalysis.sentiment, FeedbackAnalysis.feedback_id],
+    "star_rating": [FeedbackAnalysis.star_rating, FeedbackAnalysis.feedback_id],
+}
+
+
+def apply_feedback_filters(query, params):
+    """
+    Apply the feedback filters present in a request's query parameters.
+
+    Args:
+        query: The query to filter.
+        params: An object with one attribute per filter (e.g. a PaginationSchema); None or empty values are ignored.
+
+    Returns:
+        tuple: The filtered query and the dict of applied filters (name -> value).
+    """
+    filters = {}
+    for name, column in FEEDBACK_FILTER_COLUMNS.items():
+        value = getattr(params, name, None)
+        if value is None or value == "":
+            continue
+        query = query.filter(column == value)
+        filters[name] = value
+    return query, filters
+
+
+def apply_analysis_filters(query, params):
+    """
+    Join feedback analyses into a feedback query for filtering, sorting or embedding.
+
+    Filtering or sorting by an analysis field uses an inner join, so only analyzed
+    feedbacks are listed; embedding alone (`include=analysis`) uses an outer join.
+    Either way embedded analyses are loaded from the same query.
+
+    Args:
+        query: The feedback query.
+        params: An object with the analysis filters, `sort` and `include` as attributes (e.g. a FeedbackListSchema).
+
+    Returns:
+        tuple: The query and the dict of applied filters (name -> value); sorting by an
+        analysis field adds `analyzed`, since it narrows the result like a filter.
+    """
+    filters = {}
+    for name, (column, operator) in ANALYSIS_FILTER_COLUMNS.items():
+        value = getattr(params, name, None)
+        if value is None:
+            continue
+        query = query.filter(getattr(column, operator)(value))
+        filters[name] = getattr(value, "value", value)
+
+    if getattr(params, "sort", "created_at") != "created_at":
+        filters["analyzed"] = True
+
+    include = getattr(params, "include", None) == "analysis"
+    if filters:
+        query = query.join(Feedback.analysis)
+    elif include:
+        query = query.outerjoin(Feedback.analysis)
+    if include:
+        query = query.options(contains_eager(Feedback.analysis))
+    return query, filters
@@ -0,0 +1,289 @@
+from sqlalchemy import case, func, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+from config import BULK_INGEST_CHUNK_SIZE
+from model import Campaign, Feedback
+from schemas import FeedbackBulkItem, FeedbackBulkItemResult
+
+# Rejection messages for the campaign rules
+MAX_ANSWERS_MESSAGE = "Campaign has reached the maximum number of answers"
+SINGLE_ANSWER_MESSAGE = "Campaign does not allow multiple answers from the same user"
+CONSTRAINT_MESSAGE = "Feedback was rejected by a database constraint"
+
+# Error raised by the partial unique index enforcing one answer per IP (ux_feedbacks_single_answer_ip)
+SINGLE_ANSWER_CONSTRAINT = "UNIQUE constraint failed: feedbacks.campaign_id, feedbacks.user_ip"
+
+# Number of times a bulk chunk is re-validated after losing a race with concurrent writers
+BULK_INGEST_RETRIES = 3
+
+# Columns provided by the submitter when inserting a feedback
+FEEDBACK_FIELDS = [
+    "campaign_id", "age_range", "gender", "education_level", "country", "state",
+    "message", "user_ip", "user_agent",
+]
+
+# Status values reported for each item of a bulk request
+STATUS_CREATED = "created"
+STATUS_REJECTED = "rejected"
+STATUS_INVALID = "invalid"
+
+
+def insert_feedback(db, values: dict):
+    """
+    Insert a feedback with a single conditional statement.
+
+    The row is only inserted when the campaign exists and is active; the
+    `single_answer` flag is copied from the campaign in the same statement.
+    `max_answers` and the one-answer-per-IP rule are enforced by the database
+    (capacity trigger and partial unique index), so concurrent submissions
+    cannot overshoot them.
+
+    Args:
+        db: An open database session.
+        values (dict): The values of the FEEDBACK_FIELDS columns.
+
+    Returns:
+        Row | None: The `id` and `created_at` of the new feedback, or None when the
+        campaign does not exist or is not active.
+
+    Raises:
+        IntegrityError: When the campaign is full or the IP already answered it.
+            Use `rejection_message` to describe it.
+    """
+    table = Feedback.__table__
+    source = select(
+        *[literal(values[name], table.c[name].type) for name in FEEDBACK_FIELDS],
+        case((Campaign.multiple_answers_from_user == True, False), else_=True),
+    ).where(
+        Campaign.id == values["campaign_id"],
+        Campaign.active == True,
+    )
+    statement = insert(Feedback).from_select(FEEDBACK_FIELDS + ["single_answer"], source).returning(
+        Feedback.id, Feedback.created_at
+    )
+    return db.execute(statement).first()
+
+
+def rejection_message(error: IntegrityError) -> str:
+    """
+    Describe which campaign rule an insert violated.
+
+    Args:
+        error (IntegrityError): The error raised by the insert.
+
+    Returns:
+        str: The rejection message shown to the client.
+    """
+    if MAX_ANSWERS_MESSAGE in str(error.orig):
+        return MAX_ANSWERS_MESSAGE
+    if SINGLE_ANSWER_CONSTRAINT in str(error.orig):
+        return SINGLE_ANSWER_MESSAGE
+    return CONSTRAINT_MESSAGE
+
+
+def sync_single_answer_flags(db, campaign_id: int, single_answer: bool):
+    """
+    Update the `single_answer` flag of a campaign's stored feedbacks after its rule changes.
+
+    When the campaign switches to a single answer per user, the first feedback of each
+    IP is flagged so later submissions from that IP are rejected; switching back clears
+    every flag. The caller commits.
+
+    Args:
+        db: An open database session.
+        campaign_id (int): The campaign ID.
+        single_answer (bool): Whether the campaign now allows a single answer per user.
+    """
+    db.query(Feedback).filter(Feedback.campaign_id == campaign_id).update(
+        {Feedback.single_answer: False}, synchronize_session=False
+    )
+    if single_answer:
+        first_answers = select(func.min(Feedback.id)).where(
+            Feedback.campaign_id == campaign_id,
+            Feedback.user_ip.isnot(None),
+        ).group_by(Feedback.user_ip)
+        db.query(Feedback).filter(Feedback.id.in_(first_answers)).update(
+            {Feedback.single_answer: True}, synchronize_session=False
+        )
+
+
+class FeedbackIngestor:
+    """
+    Validates and inserts feedbacks in chunks for bulk ingestion.
+
+    Campaign rules are enforced across the whole batch: each campaign is loaded
+    once, `max_answers` is checked against the running count (stored feedbacks
+    plus the ones accepted so far) and the one-answer-per-IP rule also applies
+    between items of the same batch (every item is submitted from the
+    request's IP, unless `ingest_chunk` is given the IP of each entry, as the
+    write-behind buffer does). Accepted items of a chunk are inserted with
+    a single multi-row INSERT and committed together.
+    """
+
+    def __init__(self, db, user_ip: str | None = None, default_agent: str | None = None):
+        self.db = db
+        self.user_ip = user_ip
+        self.default_agent = default_agent
+        self.campaigns = {}  # campaign_id -> campaign row or None when not found
+        self.answer_counts = {}  # campaign_id -> number of stored and accepted feedbacks
+        self.answered_ips = {}  # campaign_id -> IPs that already answered a single-answer campaign
+
+    def _load_campaigns(self, campaign_ids: set):
+        """Load the campaigns not seen yet; their answer counts come from the feedback_count column."""
+        new_ids = campaign_ids - self.campaigns.keys()
+        if not new_ids:
+            return
+
+        for campaign_id in new_ids:
+            self.campaigns[campaign_id] = None
+        # Plain rows rather than ORM objects, so commits between chunks do not expire them
+        campaigns = self.db.query(
+            Campaign.id,
+            Campaign.active,
+            Campaign.max_answers,
+            Campaign.multiple_answers_from_user,
+            Campaign.feedback_count,
+        ).filter(Campaign.id.in_(new_ids), Campaign.deleted_at.is_(None)).all()
+        for campaign in campaigns:
+            self.campaigns[campaign.id] = campaign
+            self.answered_ips[campaign.id] = set()
+            if campaign.max_answers > 0:
+                self.answer_counts[campaign.id] = campaign.feedback_count
+
+    def _load_answered_ips(self, items: list):
+        """Load which single-answer campaigns of the chunk the submitting IPs already answered."""
+        pairs = {
+            (item.campaign_id, user_ip)
+            for item, user_ip in items
+            if self.campaigns.get(item.campaign_id) and not self.campaigns[item.campaign_id].multiple_answers_from_user
+        }
+        if not pairs:
+            return
+
+        existing = self.db.query(Feedback.campaign_id, Feedback.user_ip).filter(
+            Feedback.campaign_id.in_({campaign_id for campaign_id, _ in pairs}),
+            Feedback.user_ip.in_({user_ip for _, user_ip in pairs}),
+        ).distinct().all()
+        for campaign_id, ip in existing:
+            self.answered_ips[campaign_id].add(ip)
+
+    def _check(self, item: FeedbackBulkItem, user_ip: str | None) -> str | None:
+        """Return the rejection message for an item, or None if it is accepted."""
+        campaign = self.campaigns.get(item.campaign_id)
+        if not campaign:
+            return "Campaign not found"
+        if not campaign.active:
+            return "Campaign is not active"
+        if campaign.max_answers > 0 and self.answer_counts[campaign.id] >= campaign.max_answers:
+            return MAX_ANSWERS_MESSAGE
+        if not campaign.multiple_answers_from_user and user_ip in self.answered_ips[campaign.id]:
+            return SINGLE_ANSWER_MESSAGE
+        return None
+
+    def _forget_campaigns(self, campaign_ids: set):
+        """Drop the cached state of campaigns so the next chunk reloads it."""
+        for campaign_id in campaign_ids:
+            self.campaigns.pop(campaign_id, None)
+            self.answer_counts.pop(campaign_id, None)
+            self.answered_ips.pop(campaign_id, None)
+
+    def ingest_chunk(self, entries: list, attempt: int = 1, user_ips: dict | None = None) -> list:
+        """
+        Validate and insert one chunk of items.
+
+        If a concurrent writer made the chunk violate a campaign rule between
+        validation and insert, the database rejects the whole INSERT; the chunk
+        is then re-validated against fresh campaign state and retried. Once the
+        retries are exhausted its accepted items are reported as rejected.
+
+        Args:
+            entries (list): `(index, item)` pairs, where item is a `FeedbackBulkItem`
+                or an error message for entries that failed to parse or validate.
+            attempt (int, optional): The current attempt. Defaults to 1.
+            user_ips (dict | None, optional): The IP each entry was submitted from, by index.
+                Defaults to None (every entry comes from the ingestor's `user_ip`).
+
+        Returns:
+            list: A `FeedbackBulkItemResult` per entry, in the same order.
+        """
+        results = {}
+        valid = []
+        for index, item in entries:
+            if isinstance(item, FeedbackBulkItem):
+                valid.append((index, item))
+            else:
+                results[index] = FeedbackBulkItemResult(index=index, status=STATUS_INVALID, message=item)
+
+        self._load_campaigns({item.campaign_id for _, item in valid})
+        def ip_of(index):
+            """Return the IP an entry was submitted from."""
+            return user_ips.get(index, self.user_ip) if user_ips else self.user_ip
+
+        self._load_answered_ips([(item, ip_of(index)) for index, item in valid])
+
+        accepted = []
+        for index, item in valid:
+            message = self._check(item, ip_of(index))
+            if message:
+                results[index] = FeedbackBulkItemResult(index=index, status=STATUS_REJECTED, message=message)
+                continue
+
+            if item.campaign_id in self.answer_counts:
+                self.answer_counts[item.campaign_id] += 1
+            if not self.campaigns[item.campaign_id].multiple_answers_from_user:
+                self.answered_ips[item.campaign_id].add(ip_of(index))
+            accepted.append((index, {
+                "campaign_id": item.campaign_id,
+                "age_range": item.age_range,
+                "gender": item.gender,
+                "education_level": item.education_level,
+                "country": item.country,
+                "state": item.state,
+                "message": item.message,
+                "user_ip": ip_of(index),
+                "user_agent": item.user_agent or self.default_agent,
+                "single_answer": not self.campaigns[item.campaign_id].multiple_answers_from_user,
+            }))
+
+        if accepted:
+            # One multi-row INSERT for the chunk; SQLite assigns ascending ids in VALUES order
+            try:
+                ids = sorted(self.db.execute(
+                    insert(Feedback).returning(Feedback.id),
+                    [row for _, row in accepted],
+                ).scalars().all())
+                self.db.commit()
+            except IntegrityError as e:
+                self.db.rollback()
+                self._forget_campaigns({row["campaign_id"] for _, row in accepted})
+                if attempt < BULK_INGEST_RETRIES:
+                    return self.ingest_chunk(entries, attempt + 1, user_ips)
+                # Still losing the race: reject the chunk instead of failing a request whose earlier chunks are committed
+                message = rejection_message(e)
+                ids = []
+                for index, _ in accepted:
+                    results[index] = FeedbackBulkItemResult(index=index, status=STATUS_REJECTED, message=message)
+            for (index, _), feedback_id in zip(accepted, ids):
+                results[index] = FeedbackBulkItemResult(index=index, status=STATUS_CREATED, id=feedback_id)
+
+        return [results[index] for index, _ in entries]
+
+
+def chunked(entries, size: int = BULK_INGEST_CHUNK_SIZE):
+    """
+    Group an iterable of entries into lists of at most `size` items.
+
+    Args:
+        entries: Any iterable.
+        size (int, optional): The chunk size. Defaults to BULK_INGEST_CHUNK_SIZE.
+
+    Yields:
+        list: The next chunk.
+    """
+    chunk = []
+    for entry in entries:
+        chunk.append(entry)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,104 @@
+import re
+from sqlalchemy import and_, func, literal_column, or_, select
+from model import Feedback, feedbacks_fts
+from services.feedback_filters import apply_feedback_filters
+
+# Markers around matched words in search snippets: private-use characters, turned into highlight
+# offsets by split_snippet, so messages are returned as plain text and never mixed with markup
+SNIPPET_START = "\ue000"
+SNIPPET_END = "\ue001"
+
+# Maximum number of words in a search snippet
+SNIPPET_WORDS = 16
+
+def to_match_expression(search: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Each word becomes a quoted term, so punctuation and FTS5 operators typed by
+    users cannot break the query; all words must match. A trailing `*` keeps
+    prefix matching (e.g. `atend*` matches `atendimento`).
+
+    Args:
+        search (str): The text typed by the user.
+
+    Returns:
+        str: The MATCH expression, or an empty string if the text has no words.
+    """
+    terms = []
+    for word, prefix in re.findall(r"(\w+)(\*?)", search):
+        terms.append(f'"{word}"{prefix}')
+    return " ".join(terms)
+
+
+def build_search_query(db, match: str, params, after: list | None = None, limit: int = 10):
+    """
+    Build the ranked full-text search query over feedback messages.
+
+    The best `limit` matches are taken from `feedbacks_fts` alone, ordered by
+    `rank`, which FTS5 serves itself: snippets are only built for the rows
+    returned and nothing is sorted after a join. Feedback filters are checked
+    inside that query on each match, and only the selected matches are joined
+    to `feedbacks`.
+
+    Args:
+        db: An open database session.
+        match (str): The FTS5 MATCH expression (see `to_match_expression`).
+        params: An object with the optional feedback filters as attributes.
+        after (list | None, optional): The [rank, id] of the last row of the previous page.
+            Defaults to None (first page).
+        limit (int, optional): The number of matches to return. Defaults to 10.
+
+    Returns:
+        Query: Rows of (Feedback, snippet, rank), by relevance (bm25, lower is better) then id; snippets carry
+        SNIPPET_START / SNIPPET_END markers (see `split_snippet`).
+    """
+    fts = literal_column("feedbacks_fts")
+    snippet = func.snippet(fts, 0, SNIPPET_START, SNIPPET_END, "…", SNIPPET_WORDS)
+    matches = select(
+        feedbacks_fts.c.rowid.label("id"), feedbacks_fts.c.rank.label("rank"), snippet.label("snippet")
+    ).where(fts.op("MATCH")(match))
+
+    # A correlated primary key lookup rather than `rowid IN (...)`, which FTS5 would take as its
+    # constraint (one lookup per id) instead of serving the matches in rank order
+    feedback, filters = apply_feedback_filters(select(Feedback.id).where(Feedback.id == feedbacks_fts.c.rowid), params)
+    if filters:
+        matches = matches.where(feedback.exists())
+    if after:
+        rank, feedback_id = after
+        matches = matches.where(or_(
+            feedbacks_fts.c.rank > rank,
+            and_(feedbacks_fts.c.rank == rank, feedbacks_fts.c.rowid > feedback_id),
+        ))
+    top = matches.order_by(feedbacks_fts.c.rank).limit(limit).subquery()
+    return db.query(Feedback, top.c.snippet, top.c.rank).join(top, top.c.id == Feedback.id).order_by(
+        top.c.rank, Feedback.id
+    )
+
+
+def split_snippet(snippet: str) -> tuple[str, list[list[int]]]:
+    """
+    Remove the match markers from a snippet.
+
+    Args:
+        snippet (str): A snippet built by `build_search_query`.
+
+    Returns:
+        tuple[str, list[list[int]]]: The plain snippet text and the [start, end)
+        character offsets of the matched words in it.
+    """
+    text = []
+    highlights = []
+    length = 0
+    start = None
+    for part in re.split(f"([{SNIPPET_START}{SNIPPET_END}])", snippet):
+        if part == SNIPPET_START:
+            start = length
+        elif part == SNIPPET_END:
+            if start is not None:
+                highlights.append([start, length])
+            start = None
+        else:
+            text.append(part)
+            length += len(part)
+    return "".join(text), highlights
@@ -0,0 +1,40 @@
+from sqlalchemy import func
+from config import COUNT_CACHE_TTL, COUNT_CACHE_SIZE
+from model import Campaign
+from utils import TTLCache
+
+# Recently counted totals, keyed by the filter set
+feedback_total_cache = TTLCache(ttl=COUNT_CACHE_TTL, maxsize=COUNT_CACHE_SIZE)
+
+
+def estimate_feedback_total(db, query, filters: dict) -> int:
+    """
+    Estimate the number of feedbacks matching a listing's filters without counting them on every page.
+
+    Without filters, or with only a campaign filter, the total comes from the
+    maintained `campaign.feedback_count` counters. Archived campaigns are left
+    out: they keep the count of feedbacks that are no longer in the live table,
+    which the listing (and its exact total) never returns. Demographic filters reuse a
+    count computed for the same filter set within the last COUNT_CACHE_TTL
+    seconds, so paging through a result only pays for the count once.
+
+    Args:
+        db: An open database session.
+        query: The filtered feedback query, counted on a cache miss.
+        filters (dict): The applied filters (name -> value).
+
+    Returns:
+        int: The estimated total.
+    """
+    if not filters.keys() - {"campaign_id"}:
+        counters = db.query(func.coalesce(func.sum(Campaign.feedback_count), 0)).filter(Campaign.archived_at.is_(None))
+        if "campaign_id" in filters:
+            counters = counters.filter(Campaign.id == filters["campaign_id"])
+        return counters.scalar()
+
+    key = tuple(sorted(filters.items()))
+    total = feedback_total_cache.get(key)
+    if total is None:
+        total = query.count()
+        feedback_total_cache.set(key, total)
+    return total
@@ -0,0 +1,95 @@
+from sqlalchemy import case, func
+from model import AnalyticsCube, CampaignStats, Feedback, FeedbackAnalysis, SentimentCategory
+from services.dashboard_charts import CUBE_DIMENSIONS
+
+# Confidence bands of an analysis, by the magnitude of its sentiment score: (name, lowest |sentiment|),
+# strongest first; the score has to clear the lower bound of a band to belong to it
+CONFIDENCE_BANDS = [("high", 0.6), ("medium", 0.3), ("low", 0.0)]
+
+# Breakdowns a sentiment_analysis component can ask for: the demographic dimensions of the
+# analytics cube, and the confidence bands
+SENTIMENT_BREAKDOWNS = [name for name in CUBE_DIMENSIONS if name != "sentiment_category"] + ["confidence"]
+
+
+def _scores(count: int, sentiment_sum: float, positive: int, neutral: int, negative: int) -> dict:
+    """Turn summed statistics into an average sentiment and category shares."""
+    return {
+        "sentiment": sentiment_sum / count,
+        "positive_score": positive / count,
+        "neutral_score": neutral / count,
+        "negative_score": negative / count,
+    }
+
+
+def sentiment_summary(db, campaign_ids: list[int]) -> dict | None:
+    """
+    Summarize the sentiment of a set of campaigns from their maintained statistics.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int]): The campaigns to summarize.
+
+    Returns:
+        dict | None: The average `sentiment` and the `positive_score`, `neutral_score`
+        and `negative_score` shares, or None if no feedback was analyzed.
+    """
+    totals = db.query(
+        func.coalesce(func.sum(CampaignStats.analyzed_count), 0),
+        func.sum(CampaignStats.sentiment_sum),
+        func.sum(CampaignStats.positive_count),
+        func.sum(CampaignStats.neutral_count),
+        func.sum(CampaignStats.negative_count),
+    ).filter(CampaignStats.campaign_id.in_(campaign_ids)).one()
+    return _scores(*totals) if totals[0] else None
+
+
+def sentiment_breakdown(db, campaign_ids: list[int], breakdown: str) -> list[dict]:
+    """
+    Break the sentiment of a set of campaigns down by a dimension, in one aggregate query.
+
+    Demographic dimensions are summed from the analytics cube. Confidence bands
+    group the analyses by `abs(sentiment)` (see CONFIDENCE_BANDS) inside the
+    database, so no analysis is loaded either way.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int]): The campaigns to aggregate.
+        breakdown (str): A name of SENTIMENT_BREAKDOWNS.
+
+    Returns:
+        list[dict]: One entry per value of the dimension with analyses: its `label`,
+        `count`, and the scores of `sentiment_summary`.
+    """
+    if breakdown == "confidence":
+        label = case(
+            *[(func.abs(FeedbackAnalysis.sentiment) >= bound, name) for name, bound in CONFIDENCE_BANDS[:-1]],
+            else_=CONFIDENCE_BANDS[-1][0],
+        )
+        rows = db.query(
+            label,
+            func.count(),
+            func.sum(FeedbackAnalysis.sentiment),
+            func.sum(case((FeedbackAnalysis.sentiment_category == SentimentCategory.POSITIVE, 1), else_=0)),
+            func.sum(case((FeedbackAnalysis.sentiment_category == SentimentCategory.NEUTRAL, 1), else_=0)),
+            func.sum(case((FeedbackAnalysis.sentiment_category == SentimentCategory.NEGATIVE, 1), else_=0)),
+        ).select_from(FeedbackAnalysis).join(
+            Feedback, FeedbackAnalysis.feedback_id == Feedback.id
+        ).filter(Feedback.campaign_id.in_(campaign_ids)).group_by(label).all()
+        order = [name for name, _ in CONFIDENCE_BANDS]
+        rows.sort(key=lambda row: order.index(row[0]))
+    else:
+        dimension = CUBE_DIMENSIONS[breakdown]
+        count = AnalyticsCube.analysis_count
+        rows = db.query(
+            dimension,
+            func.sum(count),
+            func.sum(AnalyticsCube.sentiment_sum),
+            func.sum(case((AnalyticsCube.sentiment_category == SentimentCategory.POSITIVE, count), else_=0)),
+            func.sum(case((AnalyticsCube.sentiment_category == SentimentCategory.NEUTRAL, count), else_=0)),
+            func.sum(case((AnalyticsCube.sentiment_category == SentimentCategory.NEGATIVE, count), else_=0)),
+        ).filter(AnalyticsCube.campaign_id.in_(campaign_ids)).group_by(dimension).all()
+
+    return [
+        {"label": getattr(value, "value", value), "count": total, **_scores(total, *sums)}
+        for value, total, *sums in rows
+    ]
@@ -0,0 +1,140 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from model import CampaignHourlyStats
+
+# Granularities of a trend_analysis component: pandas period frequency and label format of each bucket
+# (weeks start on Monday and are labelled by that day)
+TREND_GRANULARITIES = {
+    "hour": ("h", "%Y-%m-%dT%H:00"),
+    "day": ("D", "%Y-%m-%d"),
+    "week": ("W-SUN", "%Y-%m-%d"),
+    "month": ("M", "%Y-%m"),
+}
+
+# Smoothing factor of the satisfaction trend for buckets with enough feedbacks, and the floor it
+# is blended toward for buckets with fewer than TREND_FULL_WEIGHT_COUNT analyses
+TREND_ALPHA = 0.3
+TREND_MIN_ALPHA = 0.1
+TREND_FULL_WEIGHT_COUNT = 10
+
+# Buckets smoothed per vectorized block; the running decay of a block stays above 0.7 ** 256 (no underflow)
+EMA_BLOCK_SIZE = 256
+
+
+def adaptive_ema(values: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """
+    Smooth a series with a per-step smoothing factor, without a Python loop per step.
+
+    The recurrence s[i] = a[i] * x[i] + (1 - a[i]) * s[i - 1], seeded with
+    s[0] = x[0], is solved in closed form over blocks: with D the running product
+    of (1 - a), s = D * (s_prev + cumsum(a * x / D)). Blocks keep D far from
+    underflow on long series; each one starts from the last value of the previous.
+
+    Args:
+        values (np.ndarray): The series to smooth.
+        alphas (np.ndarray): The smoothing factor of each step, in [0, 1); 0 carries the previous value.
+
+    Returns:
+        np.ndarray: The smoothed series.
+    """
+    smoothed = np.empty(len(values))
+    if not len(values):
+        return smoothed
+    smoothed[0] = previous = values[0]
+    for start in range(1, len(values), EMA_BLOCK_SIZE):
+        block = slice(start, start + EMA_BLOCK_SIZE)
+        decay = np.cumprod(1 - alphas[block])
+        smoothed[block] = decay * (previous + np.cumsum(alphas[block] * values[block] / decay))
+        previous = smoothed[block][-1]
+    return smoothed
+
+
+def trend_series(db, campaign_ids: list[int], granularity: str = "day", timezone: str = "UTC",
+                 start_date: date | None = None, end_date: date | None = None, window: int | None = None,
+                 fill_gaps: bool = False) -> dict | None:
+    """
+    Build the sentiment and satisfaction trend of a set of campaigns.
+
+    The hourly statistics maintained in `campaign_hourly_stats` are read along
+    their primary key, shifted to the timezone and summed into buckets by
+    pandas; the satisfaction trend is an exponential moving average whose factor
+    shrinks toward TREND_MIN_ALPHA for buckets with few feedbacks, computed by
+    adaptive_ema. Nothing is read from the feedbacks themselves, so the cost
+    follows the number of hours with feedbacks, not the number of feedbacks.
+
+    Buckets follow the hour an hourly row starts in, which is exact for
+    timezones with whole-hour offsets.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int]): The campaigns to aggregate.
+        granularity (str, optional): A key of TREND_GRANULARITIES. Defaults to "day".
+        timezone (str, optional): IANA timezone the buckets and dates are in. Defaults to "UTC".
+        start_date (date | None, optional): First local day included. Defaults to None (no bound).
+        end_date (date | None, optional): Last local day included. Defaults to None (no bound).
+        window (int | None, optional): Keep only the last `window` buckets. Defaults to None (all).
+        fill_gaps (bool, optional): Include empty buckets between the first and last one (or the
+            date bounds, when given); they carry the trend forward. Defaults to False.
+
+    Returns:
+        dict | None: `labels`, `sentiment_scores` (None for empty buckets), `satisfaction_trend`
+        and `total_feedbacks` per bucket, or None if no feedback was analyzed in the range.
+
+    Raises:
+        ValueError: If the granularity or the timezone is unknown.
+    """
+    if granularity not in TREND_GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}', expected one of: {', '.join(TREND_GRANULARITIES)}")
+    try:
+        zone = ZoneInfo(timezone)
+    except (KeyError, ValueError):
+        raise ValueError(f"Unknown timezone '{timezone}'")
+    frequency, label_format = TREND_GRANULARITIES[granularity]
+
+    def utc_bound(day: date) -> datetime:
+        """Return the UTC time of a local midnight, naive like the stored hours."""
+        return datetime.combine(day, datetime.min.time(), zone).astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+    query = select(
+        CampaignHourlyStats.hour, CampaignHourlyStats.analysis_count,
+        CampaignHourlyStats.sentiment_sum, CampaignHourlyStats.positive_count,
+    ).where(CampaignHourlyStats.campaign_id.in_(campaign_ids))
+    if start_date:
+        query = query.where(CampaignHourlyStats.hour >= utc_bound(start_date))
+    if end_date:
+        query = query.where(CampaignHourlyStats.hour < utc_bound(end_date + timedelta(days=1)))
+    hours = pd.DataFrame(db.execute(query).all(), columns=["hour", "count", "sentiment_sum", "positive"])
+    if hours.empty:
+        return None
+
+    # Local buckets of the UTC hours, summed across hours and campaigns
+    local = pd.DatetimeIndex(hours.pop("hour")).tz_localize("UTC").tz_convert(zone).tz_localize(None)
+    buckets = hours.groupby(local.to_period(frequency)).sum()
+    if fill_gaps:
+        first = pd.Period(start_date, frequency) if start_date else buckets.index[0]
+        last = pd.Period(end_date, frequency) if end_date else buckets.index[-1]
+        buckets = buckets.reindex(pd.period_range(first, last, freq=frequency), fill_value=0)
+
+    # The trend starts at the first bucket with feedbacks; empty buckets (alpha 0) carry it forward
+    counts = buckets["count"].to_numpy(dtype=float)
+    filled = counts > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sentiment = np.where(filled, buckets["sentiment_sum"].to_numpy(dtype=float) / counts, np.nan)
+        satisfaction = np.where(filled, buckets["positive"].to_numpy(dtype=float) / counts * 100, 0.0)
+    weight = np.minimum(counts / TREND_FULL_WEIGHT_COUNT, 1.0)
+    alphas = np.where(filled, TREND_ALPHA * weight + (1 - weight) * TREND_MIN_ALPHA, 0.0)
+    first_filled = int(np.argmax(filled))
+    trend = np.full(len(counts), np.nan)
+    trend[first_filled:] = adaptive_ema(satisfaction[first_filled:], alphas[first_filled:])
+
+    if window:
+        buckets, sentiment, trend, counts = buckets[-window:], sentiment[-window:], trend[-window:], counts[-window:]
+    return {
+        "labels": [period.start_time.strftime(label_format) for period in buckets.index],
+        "sentiment_scores": [None if np.isnan(value) else float(value) for value in sentiment],
+        "satisfaction_trend": [None if np.isnan(value) else round(float(value), 2) for value in trend],
+        "total_feedbacks": [int(count) for count in counts],
+    }
@@ -0,0 +1,168 @@
+import heapq
+from collections import Counter
+from datetime import date
+from itertools import groupby
+from operator import itemgetter
+from sqlalchemy import event, func, select, text
+from sqlalchemy.dialects.sqlite import insert
+from model import Campaign, Feedback, FeedbackAnalysis, WordFrequency
+from utils.text import count_words
+
+# Analyzed feedbacks tokenized per batch when rebuilding the word counts
+REBUILD_BATCH_SIZE = 1000
+
+
+def _feedback_words(connection, feedback_id: int, language: str | None) -> tuple[int, str, Counter] | None:
+    """Return the campaign, day and word counts of a feedback, or None if it is gone."""
+    row = connection.execute(
+        text("SELECT campaign_id, date(created_at) AS day, message FROM feedbacks WHERE id = :id"), {"id": feedback_id}
+    ).first()
+    if row is None:
+        return None
+    return row.campaign_id, row.day, count_words(row.message, language)
+
+
+def add_word_counts(connection, counts: dict[tuple[int, str, str], int]):
+    """
+    Add word occurrences to `word_frequency`.
+
+    Args:
+        connection: An open connection or session, in the transaction of the write.
+        counts (dict[tuple[int, str, str], int]): Occurrences per (campaign_id, word, day).
+    """
+    if not counts:
+        return
+    statement = insert(WordFrequency)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=["campaign_id", "word", "day"],
+            set_={"count": WordFrequency.count + statement.excluded.count},
+        ),
+        [
+            {"campaign_id": campaign_id, "word": word, "day": date.fromisoformat(day), "count": count}
+            for (campaign_id, word, day), count in counts.items()
+        ],
+    )
+
+
+def remove_word_counts(connection, counts: dict[tuple[int, str, str], int]):
+    """
+    Remove word occurrences from `word_frequency`, dropping the counts that reach zero.
+
+    Args:
+        connection: An open connection or session, in the transaction of the delete.
+        counts (dict[tuple[int, str, str], int]): Occurrences per (campaign_id, word, day).
+    """
+    if not counts:
+        return
+    rows = [
+        {"campaign_id": campaign_id, "word": word, "day": day, "count": count}
+        for (campaign_id, word, day), count in counts.items()
+    ]
+    key = "campaign_id = :campaign_id AND word = :word AND day = :day"
+    connection.execute(text(f"UPDATE word_frequency SET count = count - :count WHERE {key}"), rows)
+    connection.execute(text(f"DELETE FROM word_frequency WHERE {key} AND count <= 0"), rows)
+
+
+@event.listens_for(FeedbackAnalysis, "after_insert")
+def _count_analysis_words(mapper, connection, analysis):
+    """Count the words of a feedback when its analysis is written, in the same transaction."""
+    words = _feedback_words(connection, analysis.feedback_id, analysis.detected_language)
+    if words:
+        campaign_id, day, counts = words
+        add_word_counts(connection, {(campaign_id, word, day): count for word, count in counts.items()})
+
+
+@event.listens_for(FeedbackAnalysis, "after_delete")
+def _uncount_analysis_words(mapper, connection, analysis):
+    """Remove the words of a feedback when its analysis is deleted (before the feedback, in a cascade)."""
+    words = _feedback_words(connection, analysis.feedback_id, analysis.detected_language)
+    if words:
+        campaign_id, day, counts = words
+        remove_word_counts(connection, {(campaign_id, word, day): count for word, count in counts.items()})
+
+
+def _campaign_word_counts(db, campaign_id: int, start_date: date | None, end_date: date | None):
+    """Yield a campaign's (word, count) totals in word order, read along the primary key."""
+    query = select(WordFrequency.word, func.sum(WordFrequency.count)).where(WordFrequency.campaign_id == campaign_id)
+    if start_date:
+        query = query.where(WordFrequency.day >= start_date)
+    if end_date:
+        query = query.where(WordFrequency.day <= end_date)
+    yield from db.execute(query.group_by(WordFrequency.word).order_by(WordFrequency.word))
+
+
+def top_words(db, campaign_ids: list[int], limit: int, start_date: date | None = None,
+              end_date: date | None = None) -> list[tuple[str, int]]:
+    """
+    Return the most frequent words across campaigns.
+
+    Each campaign's totals stream out of `word_frequency` in word order; the
+    streams are merged with a heap, the counts of a word summed across
+    campaigns, and the `limit` largest kept with a bounded heap. Memory stays
+    proportional to the number of campaigns plus `limit`, whatever the vocabulary.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int]): The campaigns to merge.
+        limit (int): The number of words to return.
+        start_date (date | None, optional): First day of feedbacks counted. Defaults to None (no bound).
+        end_date (date | None, optional): Last day of feedbacks counted. Defaults to None (no bound).
+
+    Returns:
+        list[tuple[str, int]]: (word, count) pairs, most frequent first (ties in word order).
+    """
+    streams = [_campaign_word_counts(db, campaign_id, start_date, end_date) for campaign_id in campaign_ids]
+    merged = heapq.merge(*streams, key=itemgetter(0))
+    totals = ((word, sum(count for _, count in rows)) for word, rows in groupby(merged, key=itemgetter(0)))
+    return heapq.nlargest(limit, totals, key=itemgetter(1))
+
+
+def rebuild_word_frequencies(db, campaign_ids: list[int] | None = None, include_archived: bool = False) -> int:
+    """
+    Recompute `word_frequency` from the analyzed feedbacks.
+
+    The counts are maintained as analyses are written and deleted through the
+    ORM, so this is only needed after writes made around it (raw SQL imports)
+    or after a change to the tokenizer or the stopword lists. Archived campaigns
+    keep the counts of their archived feedbacks and are skipped.
+
+    Args:
+        db: An open database session.
+        campaign_ids (list[int] | None, optional): Restrict the rebuild to these campaigns.
+            Defaults to every campaign.
+        include_archived (bool, optional): Also rebuild archived campaigns from their live
+            feedbacks. Defaults to False.
+
+    Returns:
+        int: The number of word counts after the rebuild.
+    """
+    campaigns = select(Campaign.id)
+    if campaign_ids:
+        campaigns = campaigns.where(Campaign.id.in_(campaign_ids))
+    if not include_archived:
+        campaigns = campaigns.where(Campaign.archived_at.is_(None))
+    db.execute(WordFrequency.__table__.delete().where(WordFrequency.campaign_id.in_(campaigns)))
+
+    last_id = 0
+    while True:
+        # Keyset batches of analyzed feedbacks; each batch is summed before it is written
+        rows = db.execute(
+            select(Feedback.id, Feedback.campaign_id, func.date(Feedback.created_at), Feedback.message,
+                   FeedbackAnalysis.detected_language)
+            .join(FeedbackAnalysis, FeedbackAnalysis.feedback_id == Feedback.id)
+            .where(Feedback.campaign_id.in_(campaigns), Feedback.id > last_id)
+            .order_by(Feedback.id)
+            .limit(REBUILD_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        counts = Counter()
+        for _, campaign_id, day, message, language in rows:
+            for word, count in count_words(message, language).items():
+                counts[(campaign_id, word, day)] += count
+        add_word_counts(db.connection(), counts)
+        last_id = rows[-1][0]
+
+    db.commit()
+    return db.query(func.count()).select_from(WordFrequency).filter(WordFrequency.campaign_id.in_(campaigns)).scalar()
@@ -1,4 +1,10 @@
-from model import Campaign
+import os
+from sqlalchemy import text
+from model import Campaign, CampaignStats, Feedback, FeedbackAnalysis
+from model.enums import SentimentCategory
+from services import reconcile_feedback_counts, rebuild_campaign_stats, rebuild_analytics_cube, campaign_cache, CampaignPurger
+from services import archive_campaign, restore_campaign, campaign_archive_path
+from utils import generate_short_code, decode_short_code
 
 
 def test_create_campaign(client, db_session):
@@ -143,4 +149,395 @@ def test_delete_campaign(client, db_session):
     assert data["message"] == "Campaign deleted"
 
     response = client.get(f"/api/campaign/{campaign.id}")
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+def test_campaign_feedback_count_tracks_inserts_and_deletes(client, db_session):
+    """Test that the feedback counter follows feedback inserts and deletes."""
+    campaign = Campaign(name="Counted Campaign", active=True, short_code="COUNT")
+    db_session.add(campaign)
+    db_session.commit()
+
+    payload = {
+        "message": "Counted",
+        "campaign_id": campaign.id,
+        "age_range": "25-34",
+        "gender": "male",
+        "education_level": "bachelor",
+        "country": "Brazil",
+        "state": "SP"
+    }
+    first = client.post("/api/feedback", json=payload).get_json()
+    client.post("/api/feedback", json=payload)
+    client.post("/api/feedbacks/bulk", json=[payload, payload])
+
+    assert client.get(f"/api/campaign/{campaign.id}").get_json()["feedback_count"] == 4
+
+    # Feedback writes leave the cached campaign alone: its count lags, the listing reads the counter
+    client.delete(f"/api/feedback/{first['id']}")
+    assert client.get(f"/api/campaign/short_code/{campaign.short_code}").get_json()["feedback_count"] == 4
+    assert client.get("/api/campaigns").get_json()["items"][0]["feedback_count"] == 3
+    campaign_cache.clear()
+    assert client.get(f"/api/campaign/short_code/{campaign.short_code}").get_json()["feedback_count"] == 3
+
+
+def test_reconcile_feedback_counts(db_session):
+    """Test that the repair job fixes a drifted counter."""
+    campaign = Campaign(name="Drifted Campaign", short_code="DRIFT")
+    db_session.add(campaign)
+    db_session.commit()
+    db_session.add(Feedback(campaign_id=campaign.id, message="One"))
+    db_session.commit()
+
+    db_session.execute(text("UPDATE campaign SET feedback_count = 42"))
+    db_session.commit()
+
+    assert reconcile_feedback_counts(db_session) == 1
+    db_session.refresh(campaign)
+    assert campaign.feedback_count == 1
+    assert reconcile_feedback_counts(db_session) == 0
+
+
+def test_get_campaigns_query_count(client, db_session, assert_max_queries):
+    """Test that listing campaigns does not count feedbacks once per campaign."""
+    for index in range(5):
+        db_session.add(Campaign(name=f"Campaign {index}", short_code=f"C{index}"))
+    db_session.commit()
+
+    with assert_max_queries(1):
+        response = client.get("/api/campaigns?limit=10&offset=0&total=none")
+    assert response.status_code == 200
+    assert len(response.get_json()["items"]) == 5
+
+
+def test_get_campaigns_cursor_pagination(client, db_session):
+    """Test that the campaign listing returns a cursor for the next page."""
+    for index in range(3):
+        db_session.add(Campaign(name=f"Campaign {index}", short_code=f"P{index}"))
+    db_session.commit()
+
+    first = client.get("/api/campaigns?limit=2").get_json()
+    assert len(first["items"]) == 2
+    assert first["next_cursor"]
+
+    second = client.get(f"/api/campaigns?limit=2&cursor={first['next_cursor']}").get_json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+    ids = [item["id"] for item in first["items"] + second["items"]]
+    assert sorted(ids) == sorted(set(ids)) and len(ids) == 3
+
+
+def test_campaign_cache_serves_repeated_lookups(client, db_session, assert_max_queries):
+    """Test that repeated short-code lookups are served from the campaign cache."""
+    campaign = Campaign(name="Cached Campaign", short_code="CACHE")
+    db_session.add(campaign)
+    db_session.commit()
+
+    assert client.get("/api/campaign/short_code/CACHE").status_code == 200
+    with assert_max_queries(0):
+        for _ in range(3):
+            response = client.get("/api/campaign/short_code/CACHE")
+            assert response.get_json()["name"] == "Cached Campaign"
+
+    stats = client.get("/api/campaigns/cache").get_json()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.75
+    assert stats["size"] == 1
+
+
+def test_campaign_cache_invalidated_on_update_and_delete(client, db_session):
+    """Test that updates and deletes drop the cached campaign."""
+    campaign = Campaign(name="Before Update", short_code="INVAL")
+    db_session.add(campaign)
+    db_session.commit()
+    campaign_id = campaign.id
+
+    assert client.get(f"/api/campaign/{campaign_id}").get_json()["name"] == "Before Update"
+    client.put(f"/api/campaign/{campaign_id}", json={"name": "After Update", "active": False})
+    data = client.get("/api/campaign/short_code/INVAL").get_json()
+    assert data["name"] == "After Update"
+    assert data["active"] is False
+
+    client.delete(f"/api/campaign/{campaign_id}")
+    assert client.get(f"/api/campaign/{campaign_id}").status_code == 404
+    assert client.get("/api/campaign/short_code/INVAL").status_code == 404
+
+
+def test_campaign_cache_invalidation_listeners(client, db_session):
+    """Test that local invalidations are published and remote ones are not republished."""
+    campaign = Campaign(name="Published Campaign", short_code="PUB")
+    db_session.add(campaign)
+    db_session.commit()
+    campaign_id = campaign.id
+
+    published = []
+    listeners = list(campaign_cache._listeners)
+    campaign_cache.add_invalidation_listener(lambda *args: published.append(args))
+    try:
+        client.put(f"/api/campaign/{campaign_id}", json={"name": "Published Update"})
+        assert published == [(campaign_id, "PUB")]
+
+        client.get(f"/api/campaign/{campaign_id}")
+        campaign_cache.invalidate(campaign_id, publish=False)
+        assert published == [(campaign_id, "PUB")]
+        assert campaign_cache.stats()["size"] == 0
+    finally:
+        campaign_cache._listeners = listeners
+
+
+def _campaign_with_analyses(db_session, short_code: str, sentiments: list[float]) -> Campaign:
+    """Create a campaign with one analyzed feedback per sentiment score, plus one unanalyzed feedback."""
+    campaign = Campaign(name=f"Campaign {short_code}", short_code=short_code)
+    db_session.add(campaign)
+    db_session.flush()
+    for sentiment in sentiments:
+        category = (
+            SentimentCategory.POSITIVE if sentiment > 0.05
+            else SentimentCategory.NEGATIVE if sentiment < -0.05
+            else SentimentCategory.NEUTRAL
+        )
+        feedback = Feedback(campaign_id=campaign.id, message="Analyzed")
+        feedback.analysis = FeedbackAnalysis(
+            sentiment=sentiment, sentiment_category=category, star_rating=3,
+            detected_language="en", word_count=1, feedback_length=8
+        )
+        db_session.add(feedback)
+    db_session.add(Feedback(campaign_id=campaign.id, message="Not analyzed"))
+    db_session.commit()
+    return campaign
+
+
+def test_get_campaigns_with_statistics(client, db_session, assert_max_queries):
+    """Test that each listed campaign carries its analysis statistics and the total spans all pages."""
+    _campaign_with_analyses(db_session, "HAPPY", [0.8, 0.6, 0.0])
+    _campaign_with_analyses(db_session, "SAD", [-0.5])
+    for index in range(3):
+        db_session.add(Campaign(name=f"Empty {index}", short_code=f"E{index}"))
+    db_session.commit()
+
+    with assert_max_queries(2):
+        data = client.get("/api/campaigns?limit=2&sort=positive_count").get_json()
+    assert data["total"] == 5
+    happy = data["items"][0]
+    assert happy["short_code"] == "HAPPY"
+    assert happy["feedback_count"] == 4
+    assert happy["analyzed_count"] == 3
+    assert abs(happy["average_sentiment"] - 1.4 / 3) < 1e-9
+    assert (happy["positive_count"], happy["neutral_count"], happy["negative_count"]) == (2, 1, 0)
+
+    empty = client.get("/api/campaigns?limit=10&sort=analyzed_count&order=asc").get_json()["items"][0]
+    assert empty["analyzed_count"] == 0
+    assert empty["average_sentiment"] is None
+
+
+def test_get_campaigns_sorted_by_average_sentiment(client, db_session):
+    """Test that sorting by average sentiment pages through analyzed campaigns only."""
+    for index, sentiment in enumerate([0.1, -0.7, 0.9, 0.4]):
+        _campaign_with_analyses(db_session, f"S{index}", [sentiment])
+    db_session.add(Campaign(name="Never analyzed", short_code="NONE"))
+    db_session.commit()
+
+    first = client.get("/api/campaigns?limit=3&sort=average_sentiment").get_json()
+    assert first["total"] == 4
+    second = client.get(f"/api/campaigns?limit=3&sort=average_sentiment&cursor={first['next_cursor']}").get_json()
+    assert second["next_cursor"] is None
+    averages = [item["average_sentiment"] for item in first["items"] + second["items"]]
+    assert averages == [0.9, 0.4, 0.1, -0.7]
+
+
+def test_campaign_stats_follow_analysis_writes(client, db_session):
+    """Test that campaign_stats is updated with each analysis insert, update and feedback delete."""
+    campaign = _campaign_with_analyses(db_session, "STATS", [0.8, -0.5])
+    stats = db_session.get(CampaignStats, campaign.id)
+    assert stats.analyzed_count == 2
+    assert abs(stats.sentiment_sum - 0.3) < 1e-9
+    assert (stats.positive_count, stats.neutral_count, stats.negative_count) == (1, 0, 1)
+    assert stats.star_rating_sum == 6
+    assert stats.star_3_count == 2
+
+    negative = db_session.query(FeedbackAnalysis).filter(FeedbackAnalysis.sentiment < 0).one()
+    negative.star_rating = 1
+    db_session.commit()
+    db_session.refresh(stats)
+    assert (stats.star_1_count, stats.star_3_count, stats.star_rating_sum) == (1, 1, 4)
+
+    response = client.delete(f"/api/feedback/{negative.feedback_id}")
+    assert response.status_code == 200
+    db_session.expire_all()
+    stats = db_session.get(CampaignStats, campaign.id)
+    assert stats.analyzed_count == 1
+    assert (stats.positive_count, stats.negative_count, stats.star_1_count) == (1, 0, 0)
+    assert abs(stats.sentiment_sum - 0.8) < 1e-9
+
+    db_session.execute(text("DELETE FROM feedbacks"))
+    db_session.commit()
+    db_session.refresh(stats)
+    assert stats.analyzed_count == 0
+    assert stats.positive_count == 0
+
+
+def test_rebuild_campaign_stats(db_session):
+    """Test that the rebuild command recomputes drifted statistics."""
+    campaign = _campaign_with_analyses(db_session, "REBLD", [0.5, 0.7])
+    db_session.execute(text("UPDATE campaign_stats SET analyzed_count = 42, sentiment_sum = 0"))
+    db_session.commit()
+
+    assert rebuild_campaign_stats(db_session, [campaign.id]) == 1
+    stats = db_session.get(CampaignStats, campaign.id)
+    db_session.refresh(stats)
+    assert stats.analyzed_count == 2
+    assert abs(stats.sentiment_sum - 1.2) < 1e-9
+    assert stats.positive_count == 2
+
+
+def test_short_codes_are_collision_free():
+    """Test that short codes are unique per campaign ID and decode back to it."""
+    codes = [generate_short_code(campaign_id) for campaign_id in range(1, 20001)]
+    assert len(set(codes)) == len(codes)
+    assert all(len(code) == 7 and code.isalnum() for code in codes)
+    assert [decode_short_code(code) for code in codes] == list(range(1, 20001))
+    assert generate_short_code(1, key="other-key") != codes[0]
+    assert decode_short_code("LEGACY") is None
+    assert decode_short_code("bad-c0d") is None
+
+
+def test_created_campaign_resolves_by_short_code(client, db_session, assert_max_queries):
+    """Test that a new campaign gets the code of its ID and is resolved by decoding it."""
+    campaign = client.post("/api/campaign", json={"name": "Coded Campaign"}).get_json()
+    assert campaign["short_code"] == generate_short_code(campaign["id"])
+
+    response = client.get(f"/api/campaign/short_code/{campaign['short_code']}")
+    assert response.get_json()["id"] == campaign["id"]
+    # The code decodes to an ID already in the cache, so the short code map is not needed
+    with assert_max_queries(0):
+        assert client.get(f"/api/campaign/{campaign['id']}").status_code == 200
+    missing = generate_short_code(campaign["id"] + 1)
+    assert client.get(f"/api/campaign/short_code/{missing}").status_code == 404
+
+
+def test_delete_campaign_purges_in_background(client, db_session, monkeypatch, assert_max_queries):
+    """Test that deleting a campaign returns before its feedbacks are purged, then purges them in chunks."""
+    campaign = _campaign_with_analyses(db_session, "PURGE", [0.5, -0.2, 0.1, 0.9])
+    campaign_id = campaign.id
+    feedback_total = db_session.execute(text("SELECT COUNT(*) FROM feedbacks")).scalar()
+    purger = CampaignPurger(chunk_size=2)
+    monkeypatch.setattr("routes.campaign.campaign_purger", purger)
+
+    # The request only marks the campaign: its cost does not depend on the number of feedbacks
+    with assert_max_queries(3):
+        response = client.delete(f"/api/campaign/{campaign_id}")
+    assert response.status_code == 200
+    assert response.get_json()["message"] == "Campaign deleted"
+    assert client.get(f"/api/campaign/{campaign_id}").status_code == 404
+    assert client.get("/api/campaigns").get_json()["total"] == 0
+    assert client.delete(f"/api/campaign/{campaign_id}").status_code == 404
+    progress = client.get(f"/api/campaign/{campaign_id}/deletion").get_json()
+    assert progress["status"] == "pending"
+    assert progress["total"] == feedback_total
+
+    purger.start()
+    purger.wait()
+    progress = client.get(f"/api/campaign/{campaign_id}/deletion").get_json()
+    assert (progress["status"], progress["deleted"]) == ("done", 5)
+    db_session.expire_all()
+    assert db_session.get(Campaign, campaign_id) is None
+    assert db_session.get(CampaignStats, campaign_id) is None
+    assert db_session.execute(text("SELECT COUNT(*) FROM feedbacks")).scalar() == 0
+    assert db_session.execute(text("SELECT COUNT(*) FROM feedback_analysis")).scalar() == 0
+
+
+def test_resume_campaign_purge(db_session):
+    """Test that campaigns deleted before a restart are purged by resume."""
+    campaign = _campaign_with_analyses(db_session, "RESUME", [0.3])
+    campaign.deleted_at = campaign.created_at
+    db_session.commit()
+    campaign_id = campaign.id
+
+    purger = CampaignPurger(chunk_size=10)
+    assert purger.resume() == 1
+    purger.start()
+    purger.wait()
+    assert purger.progress(campaign_id)["status"] == "done"
+    db_session.expire_all()
+    assert db_session.get(Campaign, campaign_id) is None
+
+
+def test_archive_and_restore_campaign(client, db_session, tmp_path):
+    """Test that archiving moves a closed campaign's rows out of the live tables, keeping its aggregates, and restore brings them back."""
+    campaign = _campaign_with_analyses(db_session, "ARCHV", [0.6, -0.4, 0.0])
+    campaign_id = campaign.id
+    live_rows = db_session.execute(text("SELECT id, message, created_at FROM feedbacks ORDER BY id")).all()
+    listed = client.get("/api/campaigns").get_json()["items"][0]
+    cube_query = text("SELECT sentiment_category, analysis_count, sentiment_sum FROM analytics_cube ORDER BY 1")
+    cells = db_session.execute(cube_query).all()
+
+    try:
+        archive_campaign(db_session, campaign_id, chunk_size=2, archive_dir=str(tmp_path))
+        assert False, "An active campaign must not be archived"
+    except ValueError:
+        pass
+    campaign.active = False
+    db_session.commit()
+
+    result = archive_campaign(db_session, campaign_id, chunk_size=2, archive_dir=str(tmp_path))
+    assert (result["feedbacks"], result["analyses"]) == (4, 3)
+    assert open(campaign_archive_path(campaign_id, str(tmp_path)), "rb").read(2) == b"\x1f\x8b"
+    assert db_session.execute(text("SELECT COUNT(*) FROM feedbacks")).scalar() == 0
+    assert db_session.execute(text("SELECT COUNT(*) FROM feedback_analysis")).scalar() == 0
+
+    # Aggregates are still served from the campaign counters, campaign_stats and analytics_cube
+    archived = client.get("/api/campaigns").get_json()["items"][0]
+    assert archived["archived_at"] is not None
+    for field in ["feedback_count", "analyzed_count", "average_sentiment", "positive_count", "negative_count"]:
+        assert archived[field] == listed[field]
+    assert db_session.execute(cube_query).all() == cells
+    assert rebuild_campaign_stats(db_session) == 0
+    assert rebuild_analytics_cube(db_session) == 0
+    assert reconcile_feedback_counts(db_session) == 0
+    assert client.put(f"/api/campaign/{campaign_id}", json={"name": "Reopened", "active": True}).status_code == 400
+
+    result = restore_campaign(db_session, campaign_id, chunk_size=2, archive_dir=str(tmp_path))
+    assert (result["feedbacks"], result["analyses"]) == (4, 3)
+    assert not os.path.exists(campaign_archive_path(campaign_id, str(tmp_path)))
+    assert db_session.execute(text("SELECT id, message, created_at FROM feedbacks ORDER BY id")).all() == live_rows
+    restored = client.get("/api/campaigns").get_json()["items"][0]
+    assert restored["archived_at"] is None
+    for field in ["feedback_count", "analyzed_count", "positive_count", "neutral_count", "negative_count"]:
+        assert restored[field] == listed[field]
+    assert abs(restored["average_sentiment"] - listed["average_sentiment"]) < 1e-9
+    assert [cell[:2] for cell in db_session.execute(cube_query).all()] == [cell[:2] for cell in cells]
+    assert len(client.get("/api/feedbacks/search?q=analyzed").get_json()["items"]) == 4
+
+
+def test_campaign_purge_failure_keeps_worker(db_session, monkeypatch):
+    """Test that a purge failing outside the database is marked failed without stopping the worker."""
+    first = _campaign_with_analyses(db_session, "FAIL1", [0.2])
+    second = _campaign_with_analyses(db_session, "FAIL2", [0.4])
+    first_id, second_id = first.id, second.id
+
+    def remove_campaign_archive(campaign_id):
+        if campaign_id == first_id:
+            raise OSError("archive is read-only")
+    monkeypatch.setattr("services.campaign_archive.remove_campaign_archive", remove_campaign_archive)
+
+    purger = CampaignPurger(chunk_size=10)
+    purger.start()
+    purger.mark_deleted(db_session, first)
+    purger.mark_deleted(db_session, second)
+    purger.wait()
+    failed = purger.progress(first_id)
+    assert (failed["status"], failed["error"]) == ("failed", "archive is read-only")
+    assert purger.progress(second_id)["status"] == "done"
+
+
+def test_campaign_deletion_without_local_job(client, db_session, monkeypatch):
+    """Test that a soft-deleted campaign with no purge job in this process is reported as pending."""
+    campaign = _campaign_with_analyses(db_session, "ORPHN", [0.1, 0.2])
+    campaign.deleted_at = campaign.created_at
+    db_session.commit()
+    monkeypatch.setattr("routes.campaign.campaign_purger", CampaignPurger())
+
+    progress = client.get(f"/api/campaign/{campaign.id}/deletion").get_json()
+    assert progress["status"] == "pending"
+    assert (progress["total"], progress["deleted"]) == (campaign.feedback_count, 0)
+    assert client.get("/api/campaign/9999/deletion").status_code == 404
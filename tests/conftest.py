@@ -1,9 +1,11 @@
 import pytest
+from contextlib import contextmanager
 from flask import Flask
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from routes import feedback_bp, feedback_analysis_bp, campaign_bp, dashboard_bp
-from config import BaseModel, DB_URL
+from config import BaseModel, DB_URL, engine, read_engine, track_queries, init_query_instrumentation
+from services import feedback_total_cache, campaign_cache, campaign_purger, component_data_cache
 
 # Define the database file path for testing
 TEST_DB_FILE = DB_URL.replace("sqlite:///", "")
@@ -44,14 +46,25 @@ def db_session(setup_database):
     BaseModel.metadata.drop_all(bind=test_engine)
     BaseModel.metadata.create_all(bind=test_engine)
 
+    # Reopen the app's pooled connections: SQLite keeps per-connection state for the
+    # FTS5 search table, which goes stale when the schema is recreated underneath it
+    engine.dispose()
+    read_engine.dispose()
+
+    # Forget cached totals, campaigns and component data of the previous test's data (ids are reused)
+    feedback_total_cache.clear()
+    campaign_cache.clear()
+    component_data_cache.clear()
+
     # Create a new session
     session = TestingSessionLocal()
 
     # Yield the session to the test
     yield session
 
-    # Close the session after the test
+    # Close the session after the test, once background campaign purges are finished
     session.close()
+    campaign_purger.wait()
 
 @pytest.fixture
 def app():
@@ -65,6 +78,7 @@ def app():
     app.register_blueprint(feedback_analysis_bp, url_prefix="/api")
     app.register_blueprint(dashboard_bp, url_prefix="/api")
     app.config["TESTING"] = True
+    init_query_instrumentation(app)
     return app
 
 @pytest.fixture
@@ -73,3 +87,20 @@ def client(app):
     Fixture to provide a test client for making API requests.
     """
     return app.test_client()
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Fixture to assert the maximum number of queries executed inside a block.
+    Usage: `with assert_max_queries(3): client.get(...)`.
+    """
+    @contextmanager
+    def _assert_max_queries(max_queries):
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"Expected at most {max_queries} queries, got {stats.count}:\n" + "\n".join(stats.statements)
+        )
+
+    return _assert_max_queries
@@ -1,5 +1,9 @@
-from model import Campaign, Feedback, Dashboard, Component
+from datetime import datetime
+from sqlalchemy import text
+from model import AnalyticsCube, Campaign, Feedback, Dashboard, Component
 from model import FeedbackAnalysis, SentimentCategory
+from services import rebuild_analytics_cube, component_data_cache, rebuild_word_frequencies, rebuild_campaign_hourly_stats
+from utils.text import count_words
 
 
 def test_dashboard_metrics(client, db_session):
@@ -216,4 +220,350 @@ def test_get_component_data(client, db_session):
     assert data["type"] == "bar_chart"
     assert "data" in data
     assert "labels" in data["data"]
-    assert "values" in data["data"]
\ No newline at end of file
+    assert "values" in data["data"]
+
+def test_list_dashboards_query_count(client, db_session, assert_max_queries):
+    """Test that listing dashboards does not issue one query per dashboard."""
+    campaign = Campaign(name="Campaign 1", active=True, short_code="ABC123")
+    db_session.add(campaign)
+    db_session.commit()
+
+    for index in range(5):
+        db_session.add(Dashboard(
+            name=f"Dashboard {index}",
+            campaigns=[campaign],
+            components=[Component(name="Pie", type="PIE_CHART", settings={})],
+        ))
+    db_session.commit()
+
+    with assert_max_queries(3):
+        response = client.get("/api/dashboards")
+    assert response.status_code == 200
+    assert response.get_json()["total"] == 5
+    assert "Server-Timing" in response.headers
+
+
+def _cube_cells(db_session):
+    return sorted(
+        tuple(row) for row in db_session.execute(text(
+            "SELECT campaign_id, day, sentiment_category, star_rating, gender, language, "
+            "analysis_count, ROUND(sentiment_sum, 6), word_count_sum FROM analytics_cube"
+        ))
+    )
+
+
+def test_component_data_from_analytics_cube(client, db_session):
+    """Test that charts are served from the analytics cube, which follows analysis writes and feedback deletes."""
+    campaign = Campaign(name="Campaign 1", active=True, short_code="CUBE01")
+    db_session.add(campaign)
+    db_session.commit()
+    dashboard = Dashboard(name="Cube Dashboard", campaigns=[campaign])
+    db_session.add(dashboard)
+    db_session.commit()
+    component = Component(
+        name="Sentiment by gender", type="BAR_CHART",
+        settings={"x_axis": "gender", "y_axis": "sentiment"}, dashboard_id=dashboard.id,
+    )
+    db_session.add(component)
+    db_session.commit()
+
+    feedbacks = [
+        Feedback(campaign_id=campaign.id, message=f"Feedback {index}", age_range="18-24", gender=gender,
+                 education_level="bachelor", country="brazil", state="SP")
+        for index, gender in enumerate(["male", "male", "female"])
+    ]
+    db_session.add_all(feedbacks)
+    db_session.commit()
+    db_session.add_all([
+        FeedbackAnalysis(feedback_id=feedback.id, detected_language="en", word_count=2, feedback_length=10,
+                         sentiment=sentiment, sentiment_category=SentimentCategory.POSITIVE, star_rating=4)
+        for feedback, sentiment in zip(feedbacks, [0.6, 0.6, -0.2])
+    ])
+    db_session.commit()
+
+    # The two male feedbacks share one cell
+    assert db_session.query(AnalyticsCube).count() == 2
+    response = client.get(f"/api/dashboard/{dashboard.id}/component/{component.id}/data")
+    data = response.get_json()["data"]
+    assert dict(zip(data["labels"], data["values"])) == {"male": 0.6, "female": -0.2}
+
+    # Updates move analyses between cells, deletes empty them
+    analysis = db_session.query(FeedbackAnalysis).filter_by(feedback_id=feedbacks[0].id).one()
+    analysis.sentiment = 0.2
+    db_session.delete(feedbacks[2])
+    db_session.commit()
+    response = client.get(f"/api/dashboard/{dashboard.id}/component/{component.id}/data")
+    data = response.get_json()["data"]
+    assert data["labels"] == ["male"]
+    assert abs(data["values"][0] - 0.4) < 1e-9
+
+    # The incrementally maintained cells match a rebuild from the analyses
+    cells = _cube_cells(db_session)
+    assert rebuild_analytics_cube(db_session) == 1
+    assert _cube_cells(db_session) == cells
+
+
+def test_component_data_cache(client, db_session, assert_max_queries):
+    """Test that component data is cached until its settings change or an analysis of its campaigns is written."""
+    campaign = Campaign(name="Campaign 1", active=True, short_code="CACHE1")
+    db_session.add(campaign)
+    db_session.commit()
+    component = Component(name="Pie", type="PIE_CHART", settings={"x_axis": "gender", "y_axis": "count"})
+    dashboard = Dashboard(name="Cached Dashboard", campaigns=[campaign], components=[component])
+    db_session.add(dashboard)
+    db_session.commit()
+    url = f"/api/dashboard/{dashboard.id}/component/{component.id}/data"
+
+    def analyze(gender):
+        feedback = Feedback(campaign_id=campaign.id, message="Cached", age_range="18-24", gender=gender,
+                            education_level="bachelor", country="brazil", state="SP")
+        db_session.add(feedback)
+        db_session.commit()
+        db_session.add(FeedbackAnalysis(feedback_id=feedback.id, detected_language="en", word_count=1, feedback_length=6,
+                                        sentiment=0.5, sentiment_category=SentimentCategory.POSITIVE, star_rating=4))
+        db_session.commit()
+
+    analyze("male")
+    first = client.get(url).get_json()["data"]
+    assert first == {"labels": ["male"], "values": [1.0]}
+
+    # Unchanged data: served from the cache, without the chart query
+    with assert_max_queries(3):
+        assert client.get(url).get_json()["data"] == first
+    stats = client.get("/api/dashboards/component-cache").get_json()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+    # A new analysis bumps the campaign's data version
+    analyze("female")
+    db_session.refresh(campaign)
+    assert campaign.data_version == 2
+    data = client.get(url).get_json()["data"]
+    assert dict(zip(data["labels"], data["values"])) == {"male": 1.0, "female": 1.0}
+
+    # New settings get their own entry
+    component.settings = {"x_axis": "gender", "y_axis": "sentiment"}
+    db_session.commit()
+    data = client.get(url).get_json()["data"]
+    assert dict(zip(data["labels"], data["values"])) == {"male": 0.5, "female": 0.5}
+    assert component_data_cache.stats()["misses"] == 3
+
+
+def test_count_words_normalization():
+    """Test that words are normalized and the stopwords of the detected language dropped."""
+    assert count_words("Ótimo curso, ÓTIMO professor! Não é 10/10", "pt") == {"ótimo": 2, "curso": 1, "professor": 1}
+    assert count_words("It’s the best course: the BEST.", "en") == {"best": 2, "course": 1}
+    assert count_words("Muito bom, the course", "xx") == {"bom": 1, "course": 1}
+
+
+def test_word_cloud_top_words(client, db_session):
+    """Test that the word cloud merges the campaigns' word counts, keeps the top words and follows deletes."""
+    campaign1 = Campaign(name="Campaign 1", active=True, short_code="WORDS1")
+    campaign2 = Campaign(name="Campaign 2", active=True, short_code="WORDS2")
+    db_session.add_all([campaign1, campaign2])
+    db_session.commit()
+    component = Component(name="Words", type="WORD_CLOUD", settings={"limit": 2})
+    dashboard = Dashboard(name="Words Dashboard", campaigns=[campaign1, campaign2], components=[component])
+    db_session.add(dashboard)
+    db_session.commit()
+
+    feedbacks = []
+    for campaign, message, created_at in [
+        (campaign1, "Great course, great teacher", "2025-01-10 10:00:00"),
+        (campaign2, "Great content and a great course", "2025-01-10 11:00:00"),
+        (campaign2, "Boring course", "2025-02-01 09:00:00"),
+    ]:
+        feedback = Feedback(campaign_id=campaign.id, message=message, age_range="18-24", gender="male",
+                            education_level="bachelor", country="brazil", state="SP")
+        db_session.add(feedback)
+        db_session.commit()
+        db_session.execute(text("UPDATE feedbacks SET created_at = :created_at WHERE id = :id"),
+                           {"created_at": created_at, "id": feedback.id})
+        db_session.add(FeedbackAnalysis(feedback_id=feedback.id, detected_language="en", word_count=4, feedback_length=20,
+                                        sentiment=0.5, sentiment_category=SentimentCategory.POSITIVE, star_rating=4))
+        db_session.commit()
+        feedbacks.append(feedback)
+
+    url = f"/api/dashboard/{dashboard.id}/component/{component.id}/data"
+    assert client.get(url).get_json()["data"] == {"words": [["great", 4], ["course", 3]]}
+
+    # Date range: only January
+    component.settings = {"limit": 10, "end_date": "2025-01-31"}
+    db_session.commit()
+    words = dict(client.get(url).get_json()["data"]["words"])
+    assert words == {"great": 4, "course": 2, "teacher": 1, "content": 1}
+
+    # Deleting a feedback removes its words
+    db_session.delete(feedbacks[0])
+    db_session.commit()
+    words = dict(client.get(url).get_json()["data"]["words"])
+    assert words == {"great": 2, "course": 1, "content": 1}
+    counts = db_session.execute(text("SELECT campaign_id, word, day, count FROM word_frequency ORDER BY 1, 2, 3")).all()
+    rebuild_word_frequencies(db_session)
+    assert db_session.execute(text("SELECT campaign_id, word, day, count FROM word_frequency ORDER BY 1, 2, 3")).all() == counts
+
+    component.settings = {"limit": "many"}
+    db_session.commit()
+    assert "message" in client.get(url).get_json()["data"]["data"]
+
+
+def test_sentiment_analysis_breakdowns(client, db_session, assert_max_queries):
+    """Test that the sentiment summary and its breakdowns are aggregated in the database."""
+    campaign = Campaign(name="Campaign 1", active=True, short_code="SENTI1")
+    db_session.add(campaign)
+    db_session.commit()
+    component = Component(name="Sentiment", type="SENTIMENT_ANALYSIS", settings={"breakdowns": ["gender", "confidence"]})
+    dashboard = Dashboard(name="Sentiment Dashboard", campaigns=[campaign], components=[component])
+    db_session.add(dashboard)
+    db_session.commit()
+
+    for gender, sentiment, category in [
+        ("male", 0.8, SentimentCategory.POSITIVE),
+        ("male", 0.4, SentimentCategory.POSITIVE),
+        ("female", -0.7, SentimentCategory.NEGATIVE),
+        ("female", 0.0, SentimentCategory.NEUTRAL),
+    ]:
+        feedback = Feedback(campaign_id=campaign.id, message="Feedback", age_range="18-24", gender=gender,
+                            education_level="bachelor", country="brazil", state="SP")
+        db_session.add(feedback)
+        db_session.commit()
+        db_session.add(FeedbackAnalysis(feedback_id=feedback.id, detected_language="en", word_count=1, feedback_length=8,
+                                        sentiment=sentiment, sentiment_category=category, star_rating=3))
+        db_session.commit()
+
+    url = f"/api/dashboard/{dashboard.id}/component/{component.id}/data"
+    with assert_max_queries(6):
+        data = client.get(url).get_json()["data"]
+    assert abs(data["sentiment"] - 0.125) < 1e-9
+    assert (data["positive_score"], data["neutral_score"], data["negative_score"]) == (0.5, 0.25, 0.25)
+
+    by_gender = {entry["label"]: entry for entry in data["breakdowns"]["gender"]}
+    assert by_gender["male"]["count"] == 2 and by_gender["male"]["positive_score"] == 1.0
+    assert abs(by_gender["female"]["sentiment"] + 0.35) < 1e-9
+    assert by_gender["female"]["negative_score"] == 0.5
+
+    confidence = data["breakdowns"]["confidence"]
+    assert [(entry["label"], entry["count"]) for entry in confidence] == [("high", 2), ("medium", 1), ("low", 1)]
+
+    component.settings = {"breakdowns": ["shoe_size"]}
+    db_session.commit()
+    assert "shoe_size" in client.get(url).get_json()["data"]["data"]["message"]
+
+
+
+def test_trend_analysis_granularity(client, db_session):
+    """Test that trends are bucketed from the hourly statistics by granularity and timezone, with gaps filled."""
+    campaign = Campaign(name="Campaign 1", active=True, short_code="TREND1")
+    db_session.add(campaign)
+    db_session.commit()
+    component = Component(name="Trend", type="TREND_ANALYSIS", settings={})
+    dashboard = Dashboard(name="Trend Dashboard", campaigns=[campaign], components=[component])
+    db_session.add(dashboard)
+    db_session.commit()
+
+    for created_at, sentiment, category in [
+        (datetime(2025, 1, 6, 1, 30), 0.8, SentimentCategory.POSITIVE),
+        (datetime(2025, 1, 6, 14, 0), -0.4, SentimentCategory.NEGATIVE),
+        (datetime(2025, 1, 9, 10, 0), 0.6, SentimentCategory.POSITIVE),
+    ]:
+        feedback = Feedback(campaign_id=campaign.id, message="Feedback", created_at=created_at)
+        db_session.add(feedback)
+        db_session.commit()
+        db_session.add(FeedbackAnalysis(feedback_id=feedback.id, detected_language="en", word_count=1, feedback_length=8,
+                                        sentiment=sentiment, sentiment_category=category, star_rating=3))
+        db_session.commit()
+
+    url = f"/api/dashboard/{dashboard.id}/component/{component.id}/data"
+    data = client.get(url).get_json()["data"]
+    assert data["labels"] == ["2025-01-06", "2025-01-09"]
+    assert data["total_feedbacks"] == [2, 1]
+    assert abs(data["sentiment_scores"][0] - 0.2) < 1e-9
+    # 50% then 100% on a single feedback: alpha = 0.3 * 0.1 + 0.9 * 0.1 = 0.12
+    assert data["satisfaction_trend"] == [50.0, 56.0]
+
+    # In Sao Paulo (UTC-3) the first feedback falls on January 5; empty days carry the trend
+    component.settings = {"timezone": "America/Sao_Paulo", "fill_gaps": True}
+    db_session.commit()
+    data = client.get(url).get_json()["data"]
+    assert data["labels"] == ["2025-01-05", "2025-01-06", "2025-01-07", "2025-01-08", "2025-01-09"]
+    assert data["total_feedbacks"] == [1, 1, 0, 0, 1]
+    assert data["sentiment_scores"][2] is None
+    assert data["satisfaction_trend"][:4] == [100.0, 88.0, 88.0, 88.0]
+
+    component.settings = {"granularity": "week"}
+    db_session.commit()
+    assert client.get(url).get_json()["data"]["labels"] == ["2025-01-06"]
+
+    component.settings = {"granularity": "hour", "window": 2, "start_date": "2025-01-06", "end_date": "2025-01-06"}
+    db_session.commit()
+    data = client.get(url).get_json()["data"]
+    assert data["labels"] == ["2025-01-06T01:00", "2025-01-06T14:00"]
+
+    # The hourly statistics follow deletes and match a rebuild
+    db_session.delete(db_session.query(Feedback).filter(Feedback.created_at == datetime(2025, 1, 9, 10, 0)).one())
+    db_session.commit()
+    hours_query = text("SELECT hour, analysis_count, positive_count, negative_count FROM campaign_hourly_stats ORDER BY 1")
+    hours = db_session.execute(hours_query).all()
+    assert [tuple(hour)[1:] for hour in hours] == [(1, 1, 0), (1, 0, 1)]
+    assert rebuild_campaign_hourly_stats(db_session) == 2
+    assert db_session.execute(hours_query).all() == hours
+
+    for settings in ({"granularity": "fortnight"}, {"timezone": "Mars/Olympus"}, {"window": "last"}):
+        component.settings = settings
+        db_session.commit()
+        assert "Invalid trend settings" in client.get(url).get_json()["data"]["data"]["message"]
+
+
+def test_get_dashboard_data(client, db_session, assert_max_queries):
+    """Test that a whole dashboard is computed in one request, matching the per-component payloads."""
+    campaign1 = Campaign(name="Campaign 1", active=True, short_code="WHOLE1")
+    campaign2 = Campaign(name="Campaign 2", active=True, short_code="WHOLE2")
+    db_session.add_all([campaign1, campaign2])
+    db_session.commit()
+    components = [
+        Component(name="Count", type="BAR_CHART", settings={"x_axis": "gender", "y_axis": "count"}),
+        Component(name="Sentiment", type="LINE_CHART", settings={"x_axis": "gender", "y_axis": "sentiment"}),
+        Component(name="Same count", type="BAR_CHART", settings={"x_axis": "gender", "y_axis": "count"}),
+        Component(name="Stars", type="PIE_CHART", settings={"x_axis": "star_rating", "y_axis": "word_count"}),
+        Component(name="Lengths", type="BAR_CHART", settings={"x_axis": "word_count", "y_axis": "count"}),
+        Component(name="Words", type="WORD_CLOUD", settings={"limit": 5}),
+        Component(name="Summary", type="SENTIMENT_ANALYSIS", settings={}),
+        Component(name="Trend", type="TREND_ANALYSIS", settings={"granularity": "month"}),
+    ]
+    dashboard = Dashboard(name="Whole Dashboard", campaigns=[campaign1, campaign2], components=components)
+    db_session.add(dashboard)
+    db_session.commit()
+
+    for campaign, gender, sentiment, category, stars in [
+        (campaign1, "male", 0.8, SentimentCategory.POSITIVE, 5),
+        (campaign1, "female", -0.6, SentimentCategory.NEGATIVE, 1),
+        (campaign2, "female", 0.3, SentimentCategory.POSITIVE, 4),
+    ]:
+        feedback = Feedback(campaign_id=campaign.id, message="Great course content", gender=gender)
+        db_session.add(feedback)
+        db_session.commit()
+        db_session.add(FeedbackAnalysis(feedback_id=feedback.id, detected_language="en", word_count=stars,
+                                        feedback_length=20, sentiment=sentiment, sentiment_category=category,
+                                        star_rating=stars))
+        db_session.commit()
+
+    # Dashboard, campaigns and components, one shared query per cube dimension, and the other components
+    with assert_max_queries(12):
+        response = client.get(f"/api/dashboard/{dashboard.id}/data")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["id"] == dashboard.id
+    payloads = {component["id"]: component["data"] for component in data["components"]}
+    assert [component["name"] for component in data["components"]] == [component.name for component in components]
+    assert payloads[components[0].id] == payloads[components[2].id] == {"labels": ["female", "male"], "values": [2.0, 1.0]}
+
+    # Same payloads as the per-component endpoint computes on its own
+    component_data_cache.clear()
+    for component in components:
+        url = f"/api/dashboard/{dashboard.id}/component/{component.id}/data"
+        assert client.get(url).get_json()["data"] == payloads[component.id]
+
+    # Served from the component data cache on the next request
+    with assert_max_queries(3):
+        assert client.get(f"/api/dashboard/{dashboard.id}/data").get_json() == data
+
+    assert client.get("/api/dashboard/999/data").status_code == 404
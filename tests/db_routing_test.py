@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from config import SessionLocal, ReadSessionLocal, session_for
+from model import Campaign
+
+
+def test_session_for_routed_blueprint():
+    """Test that read-routed blueprints use the read session factory."""
+    assert session_for("dashboard") is ReadSessionLocal
+    assert session_for("feedback") is SessionLocal
+
+
+def test_read_session_sees_committed_data(db_session):
+    """Test that the read engine sees rows committed on the primary engine."""
+    db_session.add(Campaign(name="Routed Campaign", short_code="ROUTE"))
+    db_session.commit()
+
+    with ReadSessionLocal() as db:
+        assert db.query(Campaign).filter(Campaign.short_code == "ROUTE").count() == 1
+
+
+def test_read_session_rejects_writes(db_session):
+    """Test that the read engine cannot write to the database."""
+    with ReadSessionLocal() as db:
+        with pytest.raises(OperationalError):
+            db.execute(text("DELETE FROM campaign"))
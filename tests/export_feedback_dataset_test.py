@@ -0,0 +1,50 @@
+import json
+from model import Campaign, Feedback, FeedbackAnalysis, SentimentCategory
+from ml_training.export_feedback_dataset import (
+    export_feedback_dataset_incremental,
+    load_feedback_dataset,
+    read_watermark,
+)
+
+
+def _add_analyzed_feedback(db_session, campaign_id, message, sentiment=0.5):
+    """Add a feedback with its analysis."""
+    feedback = Feedback(campaign_id=campaign_id, message=message)
+    feedback.analysis = FeedbackAnalysis(
+        sentiment=sentiment, sentiment_category=SentimentCategory.POSITIVE, star_rating=4,
+        detected_language="en", word_count=1, feedback_length=len(message)
+    )
+    db_session.add(feedback)
+    db_session.commit()
+
+
+def test_incremental_export_appends_new_rows(db_session, tmp_path):
+    """Test that incremental exports only append rows analyzed since the last run."""
+    campaign = Campaign(name="Dataset Campaign", short_code="DATA1")
+    db_session.add(campaign)
+    db_session.commit()
+    _add_analyzed_feedback(db_session, campaign.id, "First")
+    _add_analyzed_feedback(db_session, campaign.id, "Second")
+    db_session.add(Feedback(campaign_id=campaign.id, message="Not analyzed"))
+    db_session.commit()
+
+    assert export_feedback_dataset_incremental(str(tmp_path)) == 2
+    assert export_feedback_dataset_incremental(str(tmp_path)) == 0
+
+    _add_analyzed_feedback(db_session, campaign.id, "Third", sentiment=-0.5)
+    assert export_feedback_dataset_incremental(str(tmp_path)) == 1
+
+    partitions = sorted(path.name for path in tmp_path.glob("part-*.csv"))
+    assert len(partitions) == 2
+    watermark = read_watermark(str(tmp_path))
+    assert watermark["rows"] == 3
+    assert watermark == json.loads((tmp_path / "_watermark.json").read_text())
+
+    df = load_feedback_dataset(str(tmp_path), str(tmp_path / "missing.csv"))
+    assert list(df["message"]) == ["First", "Second", "Third"]
+    assert list(df["sentiment_score"]) == [0.5, 0.5, -0.5]
+
+
+def test_load_feedback_dataset_without_exports(tmp_path):
+    """Test loading when no dataset was exported yet."""
+    assert load_feedback_dataset(str(tmp_path / "dataset"), str(tmp_path / "dataset.csv")) is None
@@ -1,4 +1,12 @@
-from model import Feedback, Campaign
+import csv
+import gzip
+import io
+import json
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+from model import Feedback, Campaign, FeedbackAnalysis, SentimentCategory
 
 
 def test_create_feedback(client, db_session):
@@ -200,4 +208,622 @@ def test_delete_feedback(client, db_session):
     assert data["message"] == "Feedback was removed"
 
     response = client.get(f"/api/feedback/{feedback.id}")
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+def _bulk_item(campaign_id, message="Bulk feedback", **overrides):
+    """Build a valid bulk feedback item."""
+    item = {
+        "message": message,
+        "campaign_id": campaign_id,
+        "age_range": "25-34",
+        "gender": "female",
+        "education_level": "bachelor",
+        "country": "Brazil",
+        "state": "SP"
+    }
+    item.update(overrides)
+    return item
+
+
+def test_create_feedbacks_bulk(client, db_session):
+    """Test bulk creation reports per-item status and enforces campaign rules across the batch."""
+    open_campaign = Campaign(name="Open Campaign", active=True, short_code="OPEN")
+    limited_campaign = Campaign(name="Limited Campaign", active=True, max_answers=2, short_code="LIMIT")
+    single_campaign = Campaign(name="Single Campaign", active=True, multiple_answers_from_user=False, short_code="SINGLE")
+    inactive_campaign = Campaign(name="Inactive Campaign", active=False, short_code="OFF")
+    db_session.add_all([open_campaign, limited_campaign, single_campaign, inactive_campaign])
+    db_session.commit()
+
+    payload = [
+        _bulk_item(open_campaign.id),
+        _bulk_item(limited_campaign.id),
+        _bulk_item(limited_campaign.id),
+        _bulk_item(limited_campaign.id),
+        _bulk_item(single_campaign.id),
+        _bulk_item(single_campaign.id),
+        _bulk_item(single_campaign.id, user_ip="10.0.0.2"),  # Ignored: items are submitted from the request's IP
+        _bulk_item(inactive_campaign.id),
+        _bulk_item(9999),
+        {"message": "Missing fields"},
+    ]
+
+    response = client.post("/api/feedbacks/bulk", json=payload)
+    assert response.status_code == 200
+    data = response.get_json()
+    statuses = [item["status"] for item in data["items"]]
+    assert statuses == [
+        "created", "created", "created", "rejected",
+        "created", "rejected", "rejected",
+        "rejected", "rejected", "invalid",
+    ]
+    assert data["created"] == 4
+    assert data["rejected"] == 6
+    assert data["items"][3]["message"] == "Campaign has reached the maximum number of answers"
+    assert data["items"][5]["message"] == "Campaign does not allow multiple answers from the same user"
+    assert data["items"][7]["message"] == "Campaign is not active"
+    assert data["items"][8]["message"] == "Campaign not found"
+
+    created_ids = [item["id"] for item in data["items"] if item["status"] == "created"]
+    assert db_session.query(Feedback).filter(Feedback.id.in_(created_ids)).count() == 4
+
+
+def test_create_feedbacks_bulk_ndjson(client, db_session, assert_max_queries):
+    """Test bulk creation from an NDJSON stream uses a constant number of queries."""
+    campaign = Campaign(name="Kiosk Campaign", active=True, max_answers=100, short_code="KIOSK")
+    db_session.add(campaign)
+    db_session.commit()
+
+    lines = [json.dumps(_bulk_item(campaign.id, message=f"Kiosk {i}")) for i in range(50)]
+    with assert_max_queries(5):
+        response = client.post(
+            "/api/feedbacks/bulk",
+            data="\n".join(lines) + "\n",
+            content_type="application/x-ndjson",
+        )
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["created"] == 50
+    created = db_session.query(Feedback).filter(Feedback.campaign_id == campaign.id).order_by(Feedback.id).all()
+    assert [f.message for f in created] == [f"Kiosk {i}" for i in range(50)]
+    assert [f.id for f in created] == [item["id"] for item in data["items"]]
+
+
+def test_create_feedbacks_bulk_invalid_body(client, db_session):
+    """Test that a bulk request must be a JSON array."""
+    response = client.post("/api/feedbacks/bulk", json={"message": "Not a list"})
+    assert response.status_code == 400
+
+
+def test_create_feedbacks_bulk_max_items(client, db_session, monkeypatch):
+    """Test that an oversized array writes nothing and a stream stops ingesting at the limit."""
+    monkeypatch.setattr("routes.feedback.BULK_INGEST_MAX_ITEMS", 3)
+    campaign = Campaign(name="Capped Campaign", active=True, short_code="CAPPED")
+    db_session.add(campaign)
+    db_session.commit()
+
+    response = client.post("/api/feedbacks/bulk", json=[_bulk_item(campaign.id) for _ in range(4)])
+    assert response.status_code == 400
+    assert db_session.query(Feedback).filter(Feedback.campaign_id == campaign.id).count() == 0
+
+    lines = [json.dumps(_bulk_item(campaign.id, message=f"Line {i}")) for i in range(5)]
+    response = client.post("/api/feedbacks/bulk", data="\n".join(lines), content_type="application/x-ndjson")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [item["status"] for item in data["items"]] == ["created"] * 3 + ["invalid"] * 2
+    assert "limit of 3 items" in data["items"][3]["message"]
+    assert db_session.query(Feedback).filter(Feedback.campaign_id == campaign.id).count() == 3
+
+
+def test_create_feedbacks_bulk_retries_exhausted(client, db_session):
+    """Test that a chunk the database keeps rejecting is reported as rejected instead of failing the request."""
+    campaign = Campaign(name="Stubborn Campaign", active=True, short_code="STUBBORN")
+    db_session.add(campaign)
+    db_session.commit()
+    db_session.execute(text(
+        "CREATE TRIGGER trg_test_reject BEFORE INSERT ON feedbacks WHEN NEW.message = 'Refused' "
+        "BEGIN SELECT RAISE(ABORT, 'Refused by a test constraint'); END"
+    ))
+    db_session.commit()
+
+    payload = [_bulk_item(campaign.id), _bulk_item(campaign.id, message="Refused")]
+    response = client.post("/api/feedbacks/bulk", json=payload)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [item["status"] for item in data["items"]] == ["rejected", "rejected"]
+    assert data["items"][0]["message"] == "Feedback was rejected by a database constraint"
+    assert db_session.query(Feedback).filter(Feedback.campaign_id == campaign.id).count() == 0
+
+
+def _submit_concurrently(app, payloads):
+    """Submit payloads from parallel threads and return the response status codes."""
+    barrier = threading.Barrier(len(payloads))
+
+    def submit(payload):
+        client = app.test_client()
+        barrier.wait()
+        return client.post("/api/feedback", json=payload).status_code
+
+    with ThreadPoolExecutor(max_workers=len(payloads)) as executor:
+        return list(executor.map(submit, payloads))
+
+
+def test_create_feedback_concurrent_max_answers(app, db_session):
+    """Test that concurrent submissions cannot overshoot max_answers."""
+    campaign = Campaign(name="Race Campaign", active=True, max_answers=5, short_code="RACE")
+    db_session.add(campaign)
+    db_session.commit()
+
+    statuses = _submit_concurrently(app, [_bulk_item(campaign.id, message=f"Race {i}") for i in range(20)])
+
+    assert statuses.count(201) == 5
+    assert statuses.count(400) == 15
+    assert db_session.query(Feedback).filter(Feedback.campaign_id == campaign.id).count() == 5
+
+
+def test_create_feedback_concurrent_single_answer(app, db_session):
+    """Test that concurrent submissions from the same IP store a single answer."""
+    campaign = Campaign(name="Single Race", active=True, multiple_answers_from_user=False, short_code="SRACE")
+    db_session.add(campaign)
+    db_session.commit()
+
+    statuses = _submit_concurrently(app, [_bulk_item(campaign.id, message=f"Race {i}") for i in range(20)])
+
+    assert statuses.count(201) == 1
+    assert db_session.query(Feedback).filter(Feedback.campaign_id == campaign.id).count() == 1
+
+
+def test_update_campaign_to_single_answer(client, db_session):
+    """Test that switching a campaign to a single answer applies to IPs that already answered."""
+    campaign = Campaign(name="Switch Campaign", active=True, short_code="SWITCH")
+    db_session.add(campaign)
+    db_session.commit()
+
+    assert client.post("/api/feedback", json=_bulk_item(campaign.id)).status_code == 201
+    client.put(f"/api/campaign/{campaign.id}", json={
+        "name": "Switch Campaign",
+        "active": True,
+        "multiple_answers_from_user": False,
+        "max_answers": 0
+    })
+
+    response = client.post("/api/feedback", json=_bulk_item(campaign.id))
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Campaign does not allow multiple answers from the same user"
+
+
+def test_get_feedbacks_cursor_pagination(client, db_session):
+    """Test walking all feedbacks of a campaign with cursors, newest first, without duplicates."""
+    campaign = Campaign(name="Paged Campaign", active=True, short_code="PAGED")
+    db_session.add(campaign)
+    db_session.commit()
+    client.post("/api/feedbacks/bulk", json=[_bulk_item(campaign.id, message=f"Page {i}") for i in range(7)])
+
+    seen = []
+    cursor = None
+    while True:
+        url = f"/api/feedbacks?campaign_id={campaign.id}&limit=3&total=none"
+        if cursor:
+            url += f"&cursor={cursor}"
+        data = client.get(url).get_json()
+        assert data["total"] is None
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_get_feedbacks_invalid_cursor(client, db_session):
+    """Test that a malformed cursor is rejected."""
+    response = client.get("/api/feedbacks?cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Invalid cursor"
+
+
+def test_get_feedbacks_estimated_total(client, db_session, assert_max_queries):
+    """Test estimated totals come from campaign counters or a cached count per filter set."""
+    campaign = Campaign(name="Estimated Campaign", active=True, short_code="EST")
+    db_session.add(campaign)
+    db_session.commit()
+    client.post("/api/feedbacks/bulk", json=[
+        _bulk_item(campaign.id, gender="female"),
+        _bulk_item(campaign.id, gender="female"),
+        _bulk_item(campaign.id, gender="male"),
+    ])
+
+    data = client.get(f"/api/feedbacks?campaign_id={campaign.id}&total=estimate").get_json()
+    assert data["total"] == 3
+
+    url = f"/api/feedbacks?campaign_id={campaign.id}&gender=female&total=estimate"
+    assert client.get(url).get_json()["total"] == 2
+    with assert_max_queries(1):
+        assert client.get(url).get_json()["total"] == 2
+
+
+def test_get_feedbacks_estimated_total_skips_archived(client, db_session, tmp_path):
+    """Test that estimated totals leave out archived campaigns, like the exact count."""
+    from services import archive_campaign
+
+    live = Campaign(name="Live Campaign", active=True, short_code="EST2")
+    closed = Campaign(name="Closed Campaign", active=True, short_code="EST3")
+    db_session.add_all([live, closed])
+    db_session.commit()
+    client.post("/api/feedbacks/bulk", json=[_bulk_item(live.id), _bulk_item(closed.id), _bulk_item(closed.id)])
+    closed.active = False
+    db_session.commit()
+    archive_campaign(db_session, closed.id, archive_dir=str(tmp_path))
+
+    exact = client.get("/api/feedbacks?total=exact").get_json()["total"]
+    assert client.get("/api/feedbacks?total=estimate").get_json()["total"] == exact == 1
+    assert client.get(f"/api/feedbacks?campaign_id={closed.id}&total=estimate").get_json()["total"] == 0
+
+
+def test_search_feedbacks(client, db_session):
+    """Test full-text search ranking, snippets, filters and cursor pagination."""
+    campaign = Campaign(name="Search Campaign", active=True, short_code="SRCH1")
+    other = Campaign(name="Other Search Campaign", active=True, short_code="SRCH2")
+    db_session.add_all([campaign, other])
+    db_session.commit()
+    messages = [
+        "Atendimento excelente, atendimento rápido e atendimento cordial",
+        "O atendimento foi bom",
+        "Produto chegou quebrado",
+        "Entrega rápida",
+    ]
+    client.post("/api/feedbacks/bulk", json=[_bulk_item(campaign.id, message=m) for m in messages])
+    client.post("/api/feedbacks/bulk", json=[_bulk_item(other.id, message="Atendimento ruim")])
+
+    response = client.get(f"/api/feedbacks/search?q=atendimento&campaign_id={campaign.id}")
+    assert response.status_code == 200
+    items = response.get_json()["items"]
+    assert [item["message"] for item in items] == messages[:2]
+    snippet = items[0]["snippet"]
+    assert snippet == messages[0]
+    assert [snippet[start:end] for start, end in items[0]["highlights"]] == ["Atendimento", "atendimento", "atendimento"]
+    assert items[0]["rank"] <= items[1]["rank"]
+
+    # Accents are ignored and a trailing * matches prefixes
+    response = client.get(f"/api/feedbacks/search?q=rapid*&campaign_id={campaign.id}")
+    assert {item["message"] for item in response.get_json()["items"]} == {messages[0], messages[3]}
+
+    # Cursor pagination walks every match once
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/feedbacks/search?q=atendimento&limit=1"
+        if cursor:
+            url += f"&cursor={cursor}"
+        data = client.get(url).get_json()
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) >= 3
+
+
+def test_search_feedbacks_snippets_are_plain_text(client, db_session):
+    """Test that user content in snippets is returned as is, with highlights as offsets instead of markup."""
+    campaign = Campaign(name="Search Markup Campaign", active=True, short_code="SRCH4")
+    db_session.add(campaign)
+    db_session.commit()
+    message = "<script>alert(1)</script> Quokka <mark>"
+    client.post("/api/feedbacks/bulk", json=[_bulk_item(campaign.id, message=message)])
+
+    item = client.get("/api/feedbacks/search?q=quokka").get_json()["items"][0]
+    assert item["snippet"] == message
+    assert [item["snippet"][start:end] for start, end in item["highlights"]] == ["Quokka"]
+
+
+def test_search_feedbacks_follows_deletes(client, db_session):
+    """Test that deleted feedbacks disappear from the search index."""
+    campaign = Campaign(name="Search Delete Campaign", active=True, short_code="SRCH3")
+    db_session.add(campaign)
+    db_session.commit()
+    created = client.post("/api/feedbacks/bulk", json=[_bulk_item(campaign.id, message="Zebraword único")]).get_json()
+
+    assert len(client.get("/api/feedbacks/search?q=zebraword").get_json()["items"]) == 1
+    client.delete(f"/api/feedback/{created['items'][0]['id']}")
+    assert client.get("/api/feedbacks/search?q=zebraword").get_json()["items"] == []
+
+
+def test_search_feedbacks_invalid_query(client, db_session):
+    """Test that searches without words are rejected and FTS5 syntax is treated as text."""
+    assert client.get("/api/feedbacks/search?q=***").status_code == 400
+    response = client.get('/api/feedbacks/search?q="NEAR(AND OR')
+    assert response.status_code == 200
+
+
+def _analyzed_campaign(db_session):
+    """Create a campaign with three analyzed feedbacks and one not analyzed yet."""
+    campaign = Campaign(name="Analyzed Campaign", active=True, short_code="ANLZD")
+    db_session.add(campaign)
+    db_session.commit()
+    scores = [
+        (0.8, SentimentCategory.POSITIVE, 5),
+        (-0.6, SentimentCategory.NEGATIVE, 1),
+        (0.1, SentimentCategory.NEUTRAL, 3),
+    ]
+    for sentiment, category, stars in scores:
+        feedback = Feedback(campaign_id=campaign.id, message=f"Scored {sentiment}")
+        feedback.analysis = FeedbackAnalysis(
+            sentiment=sentiment, sentiment_category=category, star_rating=stars,
+            detected_language="en", word_count=2, feedback_length=10
+        )
+        db_session.add(feedback)
+    db_session.add(Feedback(campaign_id=campaign.id, message="Not analyzed"))
+    db_session.commit()
+    return campaign
+
+
+def test_get_feedbacks_include_analysis(client, db_session, assert_max_queries):
+    """Test embedding analyses in the listing without one query per feedback."""
+    campaign_id = _analyzed_campaign(db_session).id
+
+    with assert_max_queries(2):
+        response = client.get(f"/api/feedbacks?campaign_id={campaign_id}&include=analysis")
+    assert response.status_code == 200
+    items = response.get_json()["items"]
+    assert len(items) == 4
+    by_message = {item["message"]: item for item in items}
+    assert by_message["Not analyzed"]["analysis"] is None
+    assert by_message["Scored 0.8"]["analysis"]["sentiment_category"] == "positive"
+    assert by_message["Scored 0.8"]["analysis"]["star_rating"] == 5
+
+    # Without include the response is unchanged
+    assert "analysis" not in client.get("/api/feedbacks").get_json()["items"][0]
+
+
+def test_get_feedbacks_filter_and_sort_by_analysis(client, db_session):
+    """Test filtering and sorting feedbacks by their analysis, with cursors."""
+    campaign = _analyzed_campaign(db_session)
+
+    response = client.get("/api/feedbacks?sentiment_category=negative&include=analysis")
+    data = response.get_json()
+    assert data["total"] == 1
+    assert data["items"][0]["analysis"]["sentiment"] == -0.6
+
+    response = client.get("/api/feedbacks?min_sentiment=0&max_sentiment=0.5")
+    assert [item["message"] for item in response.get_json()["items"]] == ["Scored 0.1"]
+
+    response = client.get("/api/feedbacks?star_rating=5&total=estimate")
+    assert response.get_json()["total"] == 1
+
+    # Sorting by an analysis field lists analyzed feedbacks only
+    first = client.get(f"/api/feedbacks?campaign_id={campaign.id}&sort=sentiment&order=asc&limit=2").get_json()
+    assert first["total"] == 3
+    assert [item["message"] for item in first["items"]] == ["Scored -0.6", "Scored 0.1"]
+    second = client.get(f"/api/feedbacks?campaign_id={campaign.id}&sort=sentiment&order=asc&limit=2&cursor={first['next_cursor']}").get_json()
+    assert [item["message"] for item in second["items"]] == ["Scored 0.8"]
+    assert second["next_cursor"] is None
+
+    response = client.get("/api/feedbacks?sort=star_rating&include=analysis")
+    assert [item["analysis"]["star_rating"] for item in response.get_json()["items"]] == [5, 3, 1]
+
+
+def test_get_feedback_include_analysis(client, db_session):
+    """Test embedding the analysis in a single feedback."""
+    _analyzed_campaign(db_session)
+    feedback = db_session.query(Feedback).filter(Feedback.message == "Scored 0.8").first()
+
+    data = client.get(f"/api/feedback/{feedback.id}?include=analysis").get_json()
+    assert data["analysis"]["feedback_id"] == feedback.id
+    assert data["analysis"]["sentiment"] == 0.8
+    assert "analysis" not in client.get(f"/api/feedback/{feedback.id}").get_json()
+
+
+def test_export_feedbacks_csv(client, db_session):
+    """Test exporting feedbacks with their analyses as CSV, filtered by campaign."""
+    campaign = _analyzed_campaign(db_session)
+    other = Campaign(name="Other Export Campaign", short_code="EXPRT")
+    db_session.add(other)
+    db_session.commit()
+    db_session.add(Feedback(campaign_id=other.id, message="Other campaign"))
+    db_session.commit()
+
+    response = client.get(f"/api/feedbacks/export?campaign_id={campaign.id}")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert "feedbacks.csv" in response.headers["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["message"] for row in rows] == ["Scored 0.8", "Scored -0.6", "Scored 0.1", "Not analyzed"]
+    assert rows[0]["sentiment_category"] == "positive"
+    assert rows[0]["star_rating"] == "5"
+    assert rows[3]["sentiment_score"] == ""
+
+
+def test_export_feedbacks_ndjson_gzip(client, db_session):
+    """Test a gzipped NDJSON export filtered by creation date."""
+    _analyzed_campaign(db_session)
+
+    response = client.get("/api/feedbacks/export?format=ndjson&gzip=true")
+    assert response.mimetype == "application/gzip"
+    assert "feedbacks.ndjson.gz" in response.headers["Content-Disposition"]
+    records = [json.loads(line) for line in gzip.decompress(response.data).decode().splitlines()]
+    assert len(records) == 4
+    assert records[1]["sentiment_score"] == -0.6
+
+    response = client.get("/api/feedbacks/export?format=ndjson&created_from=2999-01-01T00:00:00")
+    assert response.data == b""
+
+
+def test_export_feedbacks_parquet(client, db_session):
+    """Test a Parquet export."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    _analyzed_campaign(db_session)
+
+    response = client.get("/api/feedbacks/export?format=parquet")
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.data))
+    assert table.num_rows == 4
+    assert table.column("star_rating").to_pylist() == [5, 1, 3, None]
+
+
+def _buffered_payload(campaign_id, message="Buffered"):
+    """Build a valid feedback submission."""
+    return {
+        "message": message,
+        "campaign_id": campaign_id,
+        "age_range": "25-34",
+        "gender": "female",
+        "education_level": "bachelor",
+        "country": "Brazil",
+        "state": "SP"
+    }
+
+
+@pytest.fixture
+def buffer_mode(monkeypatch, tmp_path):
+    """Route feedback submissions through a write-behind buffer flushed by the test."""
+    import routes.feedback
+    from services import FeedbackBuffer
+
+    buffer = FeedbackBuffer(str(tmp_path / "feedback_buffer.log"), batch_size=10, max_latency_ms=60000)
+    monkeypatch.setattr(routes.feedback, "FEEDBACK_BUFFER_ENABLED", True)
+    monkeypatch.setattr(routes.feedback, "feedback_buffer", buffer)
+    return buffer
+
+
+def test_create_feedback_buffered(client, db_session, buffer_mode):
+    """Test that buffered submissions are acknowledged, then written and checked in one group commit."""
+    campaign = Campaign(name="Buffered Campaign", active=True, short_code="BUFF1", max_answers=2)
+    db_session.add(campaign)
+    db_session.commit()
+
+    responses = [client.post("/api/feedback", json=_buffered_payload(campaign.id, f"Buffered {i}")) for i in range(3)]
+    assert [response.status_code for response in responses] == [202, 202, 202]
+    ids = [response.get_json()["provisional_id"] for response in responses]
+    assert client.get(f"/api/feedback/pending/{ids[0]}").get_json()["status"] == "pending"
+    assert db_session.query(Feedback).count() == 0
+    assert client.get("/api/feedbacks/buffer").get_json()["pending"] == 3
+
+    assert buffer_mode.flush() == 3
+
+    statuses = [client.get(f"/api/feedback/pending/{pid}").get_json() for pid in ids]
+    assert [status["status"] for status in statuses] == ["created", "created", "rejected"]
+    assert statuses[2]["message"] == "Campaign has reached the maximum number of answers"
+    feedback = client.get(f"/api/feedback/{statuses[0]['id']}").get_json()
+    assert feedback["message"] == "Buffered 0"
+    stats = client.get("/api/feedbacks/buffer").get_json()
+    assert stats["pending"] == 0
+    assert stats["flushed"] == 2
+    assert stats["rejected"] == 1
+    assert open(buffer_mode.log_path).read() == ""
+
+    # Campaign status is still checked before acknowledging
+    assert client.post("/api/feedback", json=_buffered_payload(9999)).status_code == 404
+    assert client.get("/api/feedback/pending/unknown").status_code == 404
+
+
+def test_create_feedback_buffered_keeps_ip(client, db_session, buffer_mode):
+    """Test that buffered submissions keep their IP, so the one-answer-per-IP rule applies per submitter."""
+    campaign = Campaign(name="Buffered Single Answer", active=True, short_code="BUFF5", multiple_answers_from_user=False)
+    db_session.add(campaign)
+    db_session.commit()
+
+    ips = ["1.1.1.1", "2.2.2.2", "1.1.1.1"]
+    ids = [
+        client.post("/api/feedback", json=_buffered_payload(campaign.id), environ_base={"REMOTE_ADDR": ip})
+        .get_json()["provisional_id"]
+        for ip in ips
+    ]
+    assert buffer_mode.flush() == 3
+
+    statuses = [client.get(f"/api/feedback/pending/{pid}").get_json() for pid in ids]
+    assert [status["status"] for status in statuses] == ["created", "created", "rejected"]
+    assert statuses[2]["message"] == "Campaign does not allow multiple answers from the same user"
+    stored = db_session.query(Feedback.user_ip).order_by(Feedback.id).all()
+    assert [row.user_ip for row in stored] == ["1.1.1.1", "2.2.2.2"]
+
+
+def test_feedback_buffer_recovers_from_log(db_session, tmp_path):
+    """Test that unflushed submissions are replayed after a restart, exactly once."""
+    from services import FeedbackBuffer
+
+    campaign = Campaign(name="Recovered Campaign", active=True, short_code="BUFF2")
+    db_session.add(campaign)
+    db_session.commit()
+    log_path = str(tmp_path / "feedback_buffer.log")
+
+    # A process acknowledges two submissions and dies before flushing
+    crashed = FeedbackBuffer(log_path, max_latency_ms=60000)
+    crashed.submit(_buffered_payload(campaign.id, "Before crash 1"))
+    crashed.submit(_buffered_payload(campaign.id, "Before crash 2"))
+    stale_log = open(log_path).read()
+
+    restarted = FeedbackBuffer(log_path)
+    assert restarted.recover() == 2
+    assert restarted.flush() == 2
+    assert db_session.query(Feedback).count() == 2
+
+    # A crash between the commit and the log truncation does not insert them again
+    with open(log_path, "w") as log:
+        log.write(stale_log + '{"seq": 3, "id": "torn')
+    again = FeedbackBuffer(log_path)
+    assert again.recover() == 0
+    assert db_session.query(Feedback).count() == 2
+
+
+def test_feedback_buffer_background_writer(db_session, tmp_path):
+    """Test that the background writer flushes a partial batch after the latency bound."""
+    import time
+    from services import FeedbackBuffer
+
+    campaign = Campaign(name="Background Campaign", active=True, short_code="BUFF3")
+    db_session.add(campaign)
+    db_session.commit()
+
+    buffer = FeedbackBuffer(str(tmp_path / "feedback_buffer.log"), batch_size=100, max_latency_ms=20)
+    buffer.start()
+    provisional_id = buffer.submit(_buffered_payload(campaign.id))
+
+    deadline = time.monotonic() + 5
+    while buffer.status(provisional_id)["status"] == "pending" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert buffer.status(provisional_id)["status"] == "created"
+    assert buffer.stats()["last_flush_lag_ms"] >= 20
+
+
+def test_feedback_buffer_writer_survives_errors(db_session, tmp_path, monkeypatch):
+    """Test that an unexpected flush error is retried instead of stopping the background writer."""
+    import sys
+    import time
+    from services import FeedbackBuffer
+
+    campaign = Campaign(name="Resilient Campaign", active=True, short_code="BUFF4")
+    db_session.add(campaign)
+    db_session.commit()
+    monkeypatch.setattr(sys.modules["services.feedback_buffer"], "FLUSH_RETRY_DELAY", 0.01)
+
+    buffer = FeedbackBuffer(str(tmp_path / "feedback_buffer.log"), max_latency_ms=1)
+    flush_batch = buffer.flush_batch
+    failures = []
+    def failing_flush_batch(batch):
+        if not failures:
+            failures.append(batch)
+            raise OSError("disk full")
+        return flush_batch(batch)
+    monkeypatch.setattr(buffer, "flush_batch", failing_flush_batch)
+    buffer.start()
+    provisional_id = buffer.submit(_buffered_payload(campaign.id))
+
+    deadline = time.monotonic() + 5
+    while buffer.status(provisional_id)["status"] == "pending" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert failures
+    assert buffer.status(provisional_id)["status"] == "created"
+    assert buffer.stats()["writer_alive"] is True
+
+
+def test_feedback_buffer_log_per_process(db_session, tmp_path):
+    """Test that buffers sharing a log path each lock a slot of their own."""
+    from services import FeedbackBuffer
+
+    log_path = str(tmp_path / "feedback_buffer.log")
+    first = FeedbackBuffer(log_path)
+    second = FeedbackBuffer(log_path)
+    first.start()
+    second.start()
+    assert first.log_path == log_path
+    assert second.log_path == log_path + ".1"
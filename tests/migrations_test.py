@@ -0,0 +1,128 @@
+from sqlalchemy import create_engine, inspect, text
+from config.migrations import MIGRATIONS, run_migrations, get_schema_version
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# Schema of a database created before migrations were introduced
+LEGACY_SCHEMA = [
+    """CREATE TABLE campaign (
+        id INTEGER NOT NULL, name VARCHAR NOT NULL, description VARCHAR, active BOOLEAN,
+        multiple_answers_from_user BOOLEAN, max_answers INTEGER, short_code VARCHAR NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY (id), UNIQUE (short_code))""",
+    """CREATE TABLE dashboards (
+        id INTEGER NOT NULL, description VARCHAR, name VARCHAR NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY (id))""",
+    """CREATE TABLE feedbacks (
+        id INTEGER NOT NULL, age_range VARCHAR(11) NOT NULL, gender VARCHAR(17) NOT NULL,
+        education_level VARCHAR(10) NOT NULL, country VARCHAR(14) NOT NULL, state VARCHAR(5) NOT NULL,
+        message VARCHAR(4000) NOT NULL, campaign_id INTEGER NOT NULL, user_ip VARCHAR(45),
+        user_agent VARCHAR(255), created_at DATETIME DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY (id),
+        FOREIGN KEY(campaign_id) REFERENCES campaign (id) ON DELETE CASCADE)""",
+    """CREATE TABLE dashboard_campaign (
+        dashboard_id INTEGER NOT NULL, campaign_id INTEGER NOT NULL, PRIMARY KEY (dashboard_id, campaign_id),
+        FOREIGN KEY(dashboard_id) REFERENCES dashboards (id) ON DELETE CASCADE,
+        FOREIGN KEY(campaign_id) REFERENCES campaign (id) ON DELETE CASCADE)""",
+    """CREATE TABLE component (
+        id INTEGER NOT NULL, name VARCHAR NOT NULL, description VARCHAR, type VARCHAR(18) NOT NULL,
+        settings JSON, dashboard_id INTEGER NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id), FOREIGN KEY(dashboard_id) REFERENCES dashboards (id) ON DELETE CASCADE)""",
+    """CREATE TABLE feedback_analysis (
+        id INTEGER NOT NULL, feedback_id INTEGER NOT NULL, detected_language VARCHAR(5) NOT NULL,
+        word_count INTEGER NOT NULL, feedback_length INTEGER NOT NULL, sentiment FLOAT NOT NULL,
+        sentiment_category VARCHAR(8) NOT NULL, star_rating INTEGER NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY (id), UNIQUE (feedback_id),
+        FOREIGN KEY(feedback_id) REFERENCES feedbacks (id) ON DELETE CASCADE)""",
+]
+
+
+def _index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_run_migrations_fresh_database(tmp_path):
+    """Test that a fresh database is created from the models and stamped with the latest version."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.sqlite'}")
+
+    applied = run_migrations(engine)
+
+    assert applied == [version for version, _, _ in MIGRATIONS]
+    assert inspect(engine).has_table("feedbacks")
+    assert "ix_feedbacks_campaign_user_ip" in _index_names(engine, "feedbacks")
+    with engine.connect() as connection:
+        assert get_schema_version(connection) == LATEST_VERSION
+    engine.dispose()
+
+
+def test_run_migrations_legacy_database(tmp_path):
+    """Test that a database created before migrations gets the hot-path indexes."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.sqlite'}")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+
+    applied = run_migrations(engine)
+
+    assert applied == [version for version, _, _ in MIGRATIONS]
+    assert {
+        "ix_feedbacks_campaign_user_ip",
+        "ix_feedbacks_campaign_created_at",
+        "ix_feedbacks_campaign_id_id",
+    } <= _index_names(engine, "feedbacks")
+    assert "ix_feedback_analysis_sentiment_category" in _index_names(engine, "feedback_analysis")
+    assert inspect(engine).has_table("campaign_stats")
+    engine.dispose()
+
+
+def test_run_migrations_backfills_campaign_stats(tmp_path):
+    """Test that existing analyses are summed into campaign_stats and analytics_cube, which then follow new analyses."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.sqlite'}")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO campaign (id, name, short_code) VALUES (1, 'Legacy', 'LEGACY')"))
+        for feedback_id in (1, 2):
+            connection.execute(text(
+                "INSERT INTO feedbacks (id, age_range, gender, education_level, country, state, message, campaign_id) "
+                "VALUES (:id, 'other', 'other', 'other', 'other', 'other', 'Legacy', 1)"
+            ), {"id": feedback_id})
+        connection.execute(text(
+            "INSERT INTO feedback_analysis (feedback_id, detected_language, word_count, feedback_length, "
+            "sentiment, sentiment_category, star_rating) VALUES (1, 'en', 1, 6, 0.5, 'POSITIVE', 4)"
+        ))
+
+    run_migrations(engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO feedback_analysis (feedback_id, detected_language, word_count, feedback_length, "
+            "sentiment, sentiment_category, star_rating) VALUES (2, 'en', 1, 6, -0.5, 'NEGATIVE', 2)"
+        ))
+        stats = connection.execute(text(
+            "SELECT analyzed_count, sentiment_sum, positive_count, negative_count, star_2_count, star_4_count "
+            "FROM campaign_stats WHERE campaign_id = 1"
+        )).one()
+    assert tuple(stats) == (2, 0.0, 1, 1, 1, 1)
+    with engine.connect() as connection:
+        cells = connection.execute(text(
+            "SELECT sentiment_category, analysis_count, sentiment_sum FROM analytics_cube "
+            "WHERE campaign_id = 1 ORDER BY sentiment_category"
+        )).all()
+    assert [tuple(cell) for cell in cells] == [("NEGATIVE", 1, -0.5), ("POSITIVE", 1, 0.5)]
+    with engine.connect() as connection:
+        # Word counts are backfilled from the analyzed feedbacks (later ones are counted by the ORM hooks)
+        words = connection.execute(text("SELECT campaign_id, word, count FROM word_frequency")).all()
+    assert [tuple(word) for word in words] == [(1, "legacy", 1)]
+    with engine.connect() as connection:
+        hours = connection.execute(text(
+            "SELECT analysis_count, sentiment_sum, positive_count, negative_count FROM campaign_hourly_stats"
+        )).all()
+    assert [tuple(hour) for hour in hours] == [(2, 0.0, 1, 1)]
+    engine.dispose()
+
+
+def test_run_migrations_up_to_date(tmp_path):
+    """Test that running migrations twice applies nothing the second time."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'current.sqlite'}")
+    run_migrations(engine)
+
+    assert run_migrations(engine) == []
+    engine.dispose()
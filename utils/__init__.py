@@ -1,3 +1,5 @@
-from .common import generate_short_code
+from .common import generate_short_code, decode_short_code, SHORT_CODE_SPACE
 from .sentiment_analysis import analyze_sentiment, get_star_rating
-from .demographic_model import predict_sentiment, predict_sentiment_demographic
\ No newline at end of file
+from .demographic_model import predict_sentiment, predict_sentiment_demographic
+from .pagination import encode_cursor, decode_cursor, paginate
+from .cache import TTLCache
\ No newline at end of file
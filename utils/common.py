@@ -1,15 +1,97 @@
-import random
+import hashlib
 import string
+from config import SHORT_CODE_KEY
 
-def generate_short_code(length: int = 6) -> str:
+# Short codes are fixed-width base62 numbers
+SHORT_CODE_ALPHABET = string.ascii_letters + string.digits
+SHORT_CODE_LENGTH = 7
+
+# Number of distinct short codes; campaign ids must stay below it
+SHORT_CODE_SPACE = len(SHORT_CODE_ALPHABET) ** SHORT_CODE_LENGTH
+
+# The permutation works on 42-bit blocks (2**42 >= 62**7), split in two 21-bit halves
+_HALF_BITS = 21
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+
+
+def _round_value(key: bytes, round_index: int, half: int) -> int:
+    """Keyed round function of the Feistel network."""
+    digest = hashlib.blake2b(half.to_bytes(3, "big") + bytes([round_index]), key=key, digest_size=4).digest()
+    return int.from_bytes(digest, "big") & _HALF_MASK
+
+
+def _permute(value: int, key: bytes) -> int:
+    """Apply the keyed permutation of the 42-bit block space once."""
+    left, right = value >> _HALF_BITS, value & _HALF_MASK
+    for round_index in range(_ROUNDS):
+        left, right = right, left ^ _round_value(key, round_index, right)
+    return (left << _HALF_BITS) | right
+
+
+def _unpermute(value: int, key: bytes) -> int:
+    """Invert `_permute`."""
+    left, right = value >> _HALF_BITS, value & _HALF_MASK
+    for round_index in reversed(range(_ROUNDS)):
+        left, right = right ^ _round_value(key, round_index, left), left
+    return (left << _HALF_BITS) | right
+
+
+def generate_short_code(campaign_id: int, key: str = SHORT_CODE_KEY) -> str:
+    """
+    Derive the short code of a campaign from its ID.
+
+    The ID goes through a keyed permutation of [0, 62**7) (a Feistel network,
+    cycle-walked back into range), so distinct IDs always get distinct codes
+    and consecutive IDs do not get guessable ones. No collision check is needed.
+
+    Args:
+        campaign_id (int): The campaign ID.
+        key (str, optional): The permutation key. Changing it changes every code. Defaults to SHORT_CODE_KEY.
+
+    Returns:
+        str: A 7-character base62 short code.
+
+    Raises:
+        ValueError: If the ID is outside the short code space.
     """
-    Generate a random alphanumeric short code.
+    if not 0 < campaign_id < SHORT_CODE_SPACE:
+        raise ValueError(f"Campaign ID {campaign_id} is outside the short code space")
+    key_bytes = key.encode()
+    value = _permute(campaign_id, key_bytes)
+    while value >= SHORT_CODE_SPACE:
+        value = _permute(value, key_bytes)
+
+    characters = []
+    for _ in range(SHORT_CODE_LENGTH):
+        value, digit = divmod(value, len(SHORT_CODE_ALPHABET))
+        characters.append(SHORT_CODE_ALPHABET[digit])
+    return "".join(reversed(characters))
+
+
+def decode_short_code(short_code: str, key: str = SHORT_CODE_KEY) -> int | None:
+    """
+    Recover the campaign ID a short code was generated from, without any lookup.
 
     Args:
-        length (int, optional): The length of the generated short code. Defaults to 6.
+        short_code (str): The short code.
+        key (str, optional): The permutation key. Defaults to SHORT_CODE_KEY.
 
     Returns:
-        str: A randomly generated alphanumeric string of the specified length.
+        int | None: The campaign ID, or None if the string is not a code produced by
+        `generate_short_code` (e.g. a legacy random code).
     """
-    """Generate a random alphanumeric short code."""
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
\ No newline at end of file
+    if len(short_code) != SHORT_CODE_LENGTH:
+        return None
+    value = 0
+    for character in short_code:
+        digit = SHORT_CODE_ALPHABET.find(character)
+        if digit < 0:
+            return None
+        value = value * len(SHORT_CODE_ALPHABET) + digit
+
+    key_bytes = key.encode()
+    value = _unpermute(value, key_bytes)
+    while value >= SHORT_CODE_SPACE:
+        value = _unpermute(value, key_bytes)
+    return value or None
@@ -0,0 +1,87 @@
+import base64
+import json
+from sqlalchemy import tuple_
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+
+    Args:
+        values (list): The JSON-serializable sort key values (e.g. raw created_at and id).
+
+    Returns:
+        str: A URL-safe cursor string.
+    """
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor string.
+
+    Returns:
+        list: The sort key values.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(payload)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def paginate(query, keys: list, cursor: str | None = None, offset: int = 0, limit: int = 10, descending: bool = True):
+    """
+    Fetch one page of an ORM query ordered by a unique sort key.
+
+    With a cursor the page starts right after the row the cursor points to
+    (keyset pagination, `offset` is ignored); otherwise `offset` rows are skipped.
+    Either way the response carries a cursor for the next page, so clients can
+    switch to keyset pagination after the first page.
+
+    Args:
+        query: The ORM query; pages hold its entity, or a tuple of its columns when it selects several.
+        keys (list): Column expressions forming a unique sort key, ideally backed by an index.
+        cursor (str | None, optional): The cursor returned for the previous page.
+        offset (int, optional): Rows to skip when no cursor is given. Defaults to 0.
+        limit (int, optional): Page size. Defaults to 10.
+        descending (bool, optional): Sort direction. Defaults to True (newest first).
+
+    Returns:
+        tuple: The items of the page and the cursor of the next page (None on the last page).
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(keys):
+            raise ValueError("Invalid cursor")
+        if descending:
+            query = query.filter(tuple_(*keys) < tuple_(*values))
+        else:
+            query = query.filter(tuple_(*keys) > tuple_(*values))
+        offset = 0
+
+    order = [key.desc() if descending else key.asc() for key in keys]
+    rows = query.add_columns(*keys).order_by(*order).offset(offset).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(list(rows[-1][-len(keys):]))
+
+    # Strip the sort key columns added above
+    width = len(query.column_descriptions)
+    items = [row[0] if width == 1 else tuple(row[:width]) for row in rows]
+    return items, next_cursor
@@ -0,0 +1,68 @@
+import re
+import unicodedata
+from collections import Counter
+
+# Words left out of word counts, per detected language (see detect_language)
+STOPWORDS = {
+    "pt": {
+        "a", "o", "as", "os", "e", "de", "do", "da", "das", "dos", "em", "um", "uma", "uns", "umas", "para", "pra",
+        "por", "com", "no", "na", "nos", "nas", "ao", "à", "aos", "às", "que", "se", "é", "não", "sim", "mas", "ou",
+        "como", "eu", "ele", "ela", "eles", "elas", "me", "meu", "minha", "seu", "sua", "isso", "isto", "esse",
+        "essa", "este", "esta", "foi", "ser", "são", "está", "estava", "muito", "mais", "já", "também", "lhe", "ter",
+        "tem", "tinha", "pelo", "pela", "num", "numa",
+    },
+    "en": {
+        "a", "an", "the", "and", "of", "to", "in", "for", "on", "with", "at", "by", "be", "is", "are", "was", "were",
+        "it", "its", "it's", "this", "that", "from", "as", "or", "if", "so", "do", "does", "did", "not", "i", "me",
+        "my", "we", "our", "you", "your", "he", "she", "they", "them", "their", "have", "has", "had", "but", "very",
+        "too", "also", "just", "all", "there", "been", "will", "would", "can", "could", "about",
+    },
+    "es": {
+        "a", "el", "la", "los", "las", "lo", "un", "una", "unos", "unas", "y", "o", "de", "del", "en", "para", "por",
+        "con", "que", "se", "es", "no", "sí", "pero", "como", "al", "me", "mi", "su", "sus", "yo", "fue", "muy",
+        "más", "ya", "también", "este", "esta", "esto", "ese", "esa", "eso", "hay", "ha", "era", "son", "está",
+    },
+    "fr": {
+        "a", "à", "le", "la", "les", "l", "un", "une", "des", "du", "de", "d", "et", "ou", "en", "dans", "pour", "par",
+        "avec", "que", "qui", "se", "ce", "c", "est", "ne", "pas", "mais", "comme", "au", "aux", "je", "j", "il",
+        "elle", "nous", "vous", "ils", "mon", "ma", "mes", "son", "sa", "ses", "été", "très", "plus", "sur", "était",
+    },
+    "de": {
+        "der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einem", "und", "oder", "zu", "in", "im",
+        "für", "mit", "auf", "von", "vom", "an", "am", "ist", "war", "sind", "nicht", "aber", "wie", "ich", "es",
+        "er", "sie", "wir", "ihr", "mein", "sehr", "auch", "so", "dass", "hat", "habe", "zum", "zur",
+    },
+}
+
+# Fallback for languages without their own list
+ALL_STOPWORDS = set().union(*STOPWORDS.values())
+
+# Words: runs of letters, with inner apostrophes or hyphens ("it's", "bem-vindo"); digits are left out
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+
+# Longest word kept (matches the word_frequency column)
+MAX_WORD_LENGTH = 64
+
+
+def count_words(message: str, language: str | None = None) -> Counter:
+    """
+    Count the words of a message for word clouds.
+
+    The message is NFKC-normalized and case-folded, split into words (digits
+    and punctuation dropped, typographic apostrophes unified), and the
+    stopwords of its language are removed, along with one-letter words.
+
+    Args:
+        message (str): The feedback message.
+        language (str | None, optional): Its detected language; unknown languages
+            use every stopword list. Defaults to None.
+
+    Returns:
+        Counter: Occurrences per normalized word.
+    """
+    stopwords = STOPWORDS.get(language, ALL_STOPWORDS)
+    text = unicodedata.normalize("NFKC", message).casefold().replace("’", "'")
+    return Counter(
+        word for word in WORD_PATTERN.findall(text)
+        if len(word) > 1 and len(word) <= MAX_WORD_LENGTH and word not in stopwords
+    )